@@ -1,4 +1,5 @@
 import sys
+import logging
 from pathlib import Path
 import streamlit as st
 
@@ -7,11 +8,16 @@ APP_DIR = Path(__file__).resolve().parent
 
 sys.path.append(str(ROOT_DIR))
 
-from core.config import load_config
-from core.question_bank import load_qbank
+logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(name)s] %(levelname)s %(message)s")
+
+from core.config import load_config_cached
+from core.question_bank import load_qbank_cached
 from components.multi_question_form import render_multi_question_form
-from components.evaluation_runner import process_all_answers
+from components.evaluation_runner import iter_answers
+from components.multi_results import render_question_result
 from core.storage import save_candidate_answers
+from core.warmup import start_background_warmup
+from core.lifecycle import start_lifecycle_scheduler
 
 st.set_page_config(page_title="Assespro AI ", layout="wide")
 
@@ -21,11 +27,16 @@ if logo_path.exists():
 else:
     st.warning(f"Logo not found: {logo_path}")
 
-cfg = load_config(str(ROOT_DIR / "config.yaml"))
+cfg = load_config_cached(str(ROOT_DIR / "config.yaml"))
+
+runtime_cfg = cfg.get("runtime", {}) or {}
+if runtime_cfg.get("background_warmup", False):
+    start_background_warmup(cfg, load_model=runtime_cfg.get("warmup_load_model", True))
+start_lifecycle_scheduler(cfg)
 
 def get_qbank():
     yaml_path = ROOT_DIR / "data" / "question_bank.yaml"
-    return load_qbank(str(yaml_path))
+    return load_qbank_cached(str(yaml_path))
 
 if "processing" not in st.session_state:
     st.session_state.processing = False
@@ -57,13 +68,45 @@ with tab_main:
         st.info(" Processing your submission, please wait...")
 
     if st.session_state.processing:
-        with st.spinner(" Uploading and processing your answers..."):
-            results_all = process_all_answers(videos_input, candidate_id, cfg)
+        # hasil ditampilkan per pertanyaan begitu selesai (dan sudah tersimpan)
+        results_all = []
+        status = st.empty()
+        live = st.empty()
+        partial = []
+        stage_labels = {
+            "download": "downloading video",
+            "stream": "downloading and transcribing",
+            "extract": "extracting audio",
+            "asr": "transcribing",
+            "evaluate": "evaluating answer",
+        }
+        try:
+            for ev in iter_answers(videos_input, candidate_id, cfg):
+                if ev["type"] == "question":
+                    partial = []
+                    status.info(f" Processing question {ev['index']} of {ev['total']}...")
+                elif ev["type"] == "stage":
+                    status.info(f" Question {ev['index']}: {stage_labels.get(ev['stage'], ev['stage'])}...")
+                elif ev["type"] == "segment":
+                    partial.append(ev["segment"]["text"])
+                    live.caption(" ".join(partial))
+                elif ev["type"] == "result":
+                    live.empty()
+                    results_all.append(ev["result"])
+                    render_question_result(ev["result"], ev["index"])
+                elif ev["type"] == "error":
+                    live.empty()
+                    results_all.append(ev["result"])
+                    st.error(f"Question {ev['index']} failed: {ev['result']['error']['message']}. Submit again to retry it.")
+        except Exception as e:
+            # hasil yang sudah selesai tetap disimpan di bawah
+            st.error(f"Processing stopped: {e}")
+        status.empty()
 
         if not results_all:
             st.warning("No answers have been successfully saved.")
         else:
-            out_path = save_candidate_answers(candidate_id, results_all)
+            out_path = save_candidate_answers(candidate_id, results_all, cfg=cfg)
             st.success(" Candidate answers successfully saved.")
             # st.caption(f"File: {out_path}")
 
@@ -1,72 +1,300 @@
 # app/components/evaluation_runner.py
 
+import hashlib
+import logging
+import queue
+import threading
+from datetime import datetime
 from pathlib import Path
-import json
 import streamlit as st
 
-from core.downloader import fetch_video_to_local
+from core.downloader import fetch_video_to_local, video_suffix
 from core.media import extract_wav16k
-from core.stt import load_whisper_model, transcribe
+from core.stt import load_whisper_model, transcribe, get_transcription_pool, TranscriptionPool
 from core.evaluator import evaluate_answer
 from core.serializer import compose_hr_json
-from core.storage import save_candidate_metadata
+from core.storage import save_candidate_metadata, append_candidate_answer
+from core.metrics import REGISTRY
+from core.transcript_store import get_transcript_store
+from core.utils import file_sha1, file_fingerprint
+from core.workspace import new_workspace, safe_filename
+from core.checkpoint import get_checkpoint_store, run_stage, hash_value, StageFailed
+from core.profiling import get_stage_profiler, profile_stage
+from core.jobqueue import distributed_enabled, run_remote, get_artifact_store
+from core.streaming import can_stream, stream_transcribe
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+def _run_streaming(fn, *args):
+    # jalankan fn di thread terpisah; event yang dikirim lewat on_event diteruskan
+    # ke pemanggil saat itu juga. Nilai balik fn menjadi nilai `yield from`.
+    events = queue.Queue()
+    box = {}
+
+    def target():
+        try:
+            box["result"] = fn(*args, on_event=events.put)
+        except BaseException as e:
+            box["error"] = e
+        finally:
+            events.put(_DONE)
+
+    threading.Thread(target=target, name="assespro-question", daemon=True).start()
+    while True:
+        ev = events.get()
+        if ev is _DONE:
+            break
+        yield ev
+    if "error" in box:
+        raise box["error"]
+    return box["result"]
+
+
+def iter_answers(videos_input, candidate_id: str, cfg: dict):
+    # event per pertanyaan: question → stage/segment (parsial) → result.
+    # Setiap result langsung disimpan ke data/candidate_answers/<ID>.json.
+    entries = [
+        e for e in videos_input
+        if e.get("video_path") or e.get("source_url") or e.get("upload_file") is not None
+    ]
+
+    if distributed_enabled(cfg):
+        # asr / evaluate dikerjakan worker lewat broker (core.worker); host tidak memuat model
+        from core.worker import start_local_workers
+
+        start_local_workers(cfg)
+        whisper_model = None
+    else:
+        # pool multi-proses (runtime.stt_pool) memuat model di tiap worker
+        pool = get_transcription_pool(cfg)
+        whisper_model = pool if pool is not None else load_whisper_model(cfg)
+
+    # artefak submission ini (upload, unduhan, WAV) di folder job sendiri
+    workspace = new_workspace(cfg, candidate_id)
+
+    for idx, entry in enumerate(entries, start=1):
+        qspec = entry["qspec"]
+        qid = qspec.get("qid")
+        yield {"type": "question", "index": idx, "total": len(entries), "qid": qid}
+
+        try:
+            with REGISTRY.span("question", qid=qid):
+                out = yield from _run_streaming(
+                    _process_one,
+                    idx, qspec, entry.get("source_url"), entry.get("upload_file"), entry.get("video_path"),
+                    workspace, candidate_id, cfg, whisper_model,
+                )
+        except Exception as e:
+            # pertanyaan lain tetap diproses; stage yang sudah selesai ada di checkpoint
+            logger.exception("Pertanyaan %s gagal", qid)
+            entry_err = _error_entry(qspec, e)
+            append_candidate_answer(candidate_id, entry_err)
+            yield {"type": "error", "index": idx, "total": len(entries), "qid": qid, "result": entry_err}
+            continue
+        append_candidate_answer(candidate_id, out)
+        yield {"type": "result", "index": idx, "total": len(entries), "qid": qid, "result": out}
+
 
 def process_all_answers(videos_input, candidate_id: str, cfg: dict):
     results_all = []
+    for ev in iter_answers(videos_input, candidate_id, cfg):
+        if ev["type"] == "result":
+            results_all.append(ev["result"])
+            st.success(f"Question {ev['index']} saved")
+        elif ev["type"] == "error":
+            results_all.append(ev["result"])
+            st.error(f"Question {ev['index']} failed: {ev['result']['error']['message']}")
+    return results_all
 
-    whisper_model = load_whisper_model(cfg)
 
-    video_dir = Path("data/videos")
-    video_dir.mkdir(parents=True, exist_ok=True)
+def _artifact_ok(output) -> bool:
+    # artefak checkpoint masih ada dan belum ditimpa (mtime_ns, size sama)
+    path = Path(output["path"])
+    return path.exists() and list(file_fingerprint(path)) == list(output["fingerprint"])
 
-    for idx, entry in enumerate(videos_input, start=1):
-        qspec = entry["qspec"]
-        source_url = entry.get("source_url")
-        upload_file = entry.get("upload_file")
-        video_path = entry.get("video_path")
 
-        if upload_file is not None and video_path is None:
-            saved_video = video_dir / upload_file.name
-            saved_video.write_bytes(upload_file.read())
-            video_path = saved_video
+def _artifact(path) -> dict:
+    return {"path": str(path), "fingerprint": list(file_fingerprint(path))}
 
-        if not video_path and not source_url:
-            continue
 
-        if source_url and not video_path:
-            video_path = fetch_video_to_local(source_url, cfg)
+def _has_checkpoint(store, candidate_id, qid, stage, input_hash, cfg) -> bool:
+    # stage sudah pernah selesai dengan input yang sama → jalur biasa memakai checkpoint
+    from core.checkpoint import config_hash
 
-        wav = extract_wav16k(video_path, cfg)
+    if store is None:
+        return False
+    rec = store.lookup(candidate_id, qid, stage, input_hash, config_hash(cfg, stage))
+    return rec is not None and _artifact_ok(rec["output"])
 
-        text, segments, meta = transcribe(wav, cfg, whisper_model)
 
-        whisper_folder = Path("data/whisper_metadata")
-        whisper_folder.mkdir(parents=True, exist_ok=True)
-        whisper_file = whisper_folder / f"{candidate_id}_q{idx}.json"
+def _has_asr_checkpoint(checkpoints, store, candidate_id, qid, video_hash, languages, cfg) -> bool:
+    # upload yang sama pernah ditranskripsi: extract → WAV → asr checkpoint + transkrip masih ada
+    from core.checkpoint import config_hash
 
-        whisper_data = {
-            "candidate_id": candidate_id,
-            "question_id": idx,
-            "question": qspec["question_text"]["en"],
-            "transcript": text,
-            "segments": segments,
-            "meta": meta,
-        }
+    if checkpoints is None or not _has_checkpoint(checkpoints, candidate_id, qid, "extract", video_hash, cfg):
+        return False
+    extract = checkpoints.get(candidate_id, qid, "extract")
+    asr_input = hash_value([file_sha1(extract["output"]["path"]), languages])
+    rec = checkpoints.lookup(candidate_id, qid, "asr", asr_input, config_hash(cfg, "asr"))
+    return rec is not None and store.get(candidate_id, qid, rec["output"]["source_hash"]) is not None
 
-        with open(whisper_file, "w", encoding="utf-8") as f:
-            json.dump(whisper_data, f, indent=2)
 
-        result = evaluate_answer(text, qspec, meta, cfg)
-        out = compose_hr_json(qspec, text, result, meta, source_url, video_path)
-        results_all.append(out)
+def _already_ingested(checkpoints, store, candidate_id, qid, source_url, upload_file, languages, cfg) -> bool:
+    # submission ulang: jalur biasa memakai checkpoint, streaming tidak perlu diulang
+    if source_url:
+        return _has_checkpoint(checkpoints, candidate_id, qid, "download", hash_value(source_url), cfg)
+    video_hash = hashlib.sha1(upload_file.getvalue()).hexdigest()
+    return _has_asr_checkpoint(checkpoints, store, candidate_id, qid, video_hash, languages, cfg)
 
-        save_candidate_metadata(
-            candidate_id=candidate_id,
-            question=qspec["question_text"]["en"],
-            recorded_video_url=source_url if source_url else str(video_path),
-            is_video_exist=True,
+
+def _process_one(idx, qspec, source_url, upload_file, video_path, workspace, candidate_id, cfg, whisper_model, on_event=None):
+    emit = on_event or (lambda ev: None)
+    qid = qspec.get("qid")
+    checkpoints = get_checkpoint_store(cfg)
+    store = get_transcript_store(cfg)
+    # profiling.enabled / ASSESPRO_PROFILE=1 → cProfile + tracemalloc per stage
+    profiler = get_stage_profiler(cfg, candidate_id, qid)
+
+    def on_segment(seg):
+        emit({
+            "type": "segment",
+            "index": idx,
+            "qid": qid,
+            "segment": {"start": float(seg.get("start", 0.0)), "end": float(seg.get("end", 0.0)), "text": str(seg.get("text", "")).strip()},
+        })
+
+    streamed = None
+    if (
+        video_path is None
+        and not distributed_enabled(cfg)
+        and can_stream(cfg, whisper_model, source_url, upload_file)
+        and not _already_ingested(
+            checkpoints, store, candidate_id, qid, source_url, upload_file, qspec.get("languages_supported"), cfg
         )
+    ):
+        # ingest.streaming: unduh/upload → ffmpeg → Whisper per window, bersamaan
+        emit({"type": "stage", "index": idx, "qid": qid, "stage": "stream"})
+        if source_url:
+            from core.downloader import direct_url
 
-        st.success(f"Question {idx} saved")
+            source = direct_url(source_url)
+            video_out = workspace.path("tmp_videos", f"{safe_filename(qid)}{video_suffix(source)}")
+        else:
+            source = upload_file
+            video_out = workspace.path("videos", f"{safe_filename(qid)}_{upload_file.name}")
+        with profile_stage(profiler, "stream"):
+            streamed = stream_transcribe(
+                source, video_out, workspace.path("audio", video_out.stem + ".16k.wav"), cfg, whisper_model,
+                languages=qspec.get("languages_supported"), on_segment=on_segment,
+            )
+        video_path = streamed["video_path"]
 
-    return results_all
+    if upload_file is not None and video_path is None:
+        with REGISTRY.span("storage", kind="upload"):
+            saved_video = workspace.path("videos", f"{safe_filename(qid)}_{upload_file.name}")
+            saved_video.write_bytes(upload_file.read())
+        video_path = saved_video
+
+    if source_url and streamed is not None:
+        # checkpoint stage yang dikerjakan ingest streaming → submission ulang memakainya
+        run_stage(
+            checkpoints, candidate_id, qid, "download", hash_value(source_url), cfg,
+            lambda: _artifact(video_path), validate=_artifact_ok,
+        )
+
+    if source_url and not video_path:
+        emit({"type": "stage", "index": idx, "qid": qid, "stage": "download"})
+        with profile_stage(profiler, "download"):
+            video_path = Path(run_stage(
+                checkpoints, candidate_id, qid, "download", hash_value(source_url), cfg,
+                lambda: _artifact(fetch_video_to_local(source_url, cfg, workspace, name=safe_filename(qid))),
+                validate=_artifact_ok,
+            )["path"])
+
+    if streamed is None:
+        emit({"type": "stage", "index": idx, "qid": qid, "stage": "extract"})
+    with profile_stage(profiler, "extract"):
+        wav = Path(run_stage(
+            checkpoints, candidate_id, qid, "extract", file_sha1(video_path), cfg,
+            lambda: _artifact(streamed["wav_path"] if streamed is not None else extract_wav16k(video_path, cfg, workspace)),
+            validate=_artifact_ok,
+        )["path"])
+
+    def run_asr():
+        if distributed_enabled(cfg):
+            # WAV diserahkan lewat artifact store bersama; segmen tidak di-stream dari worker
+            out = run_remote(cfg, "asr", {
+                "artifact": get_artifact_store(cfg).put(wav),
+                "languages": qspec.get("languages_supported"),
+                "candidate_id": candidate_id,
+                "qid": qid,
+            })
+            text, segments, meta = out["text"], out["segments"], out["meta"]
+        elif streamed is not None and Path(streamed["wav_path"]) == wav:
+            text, segments, meta = streamed["text"], streamed["segments"], streamed["meta"]
+        elif isinstance(whisper_model, TranscriptionPool):
+            text, segments, meta = whisper_model.transcribe(wav, languages=qspec.get("languages_supported"))
+        else:
+            text, segments, meta = transcribe(wav, cfg, whisper_model, languages=qspec.get("languages_supported"), on_segment=on_segment)
+        store.put(
+            candidate_id,
+            qspec["qid"],
+            wav_hash,
+            text,
+            segments,
+            meta,
+            extra={"question_index": idx, "question": qspec["question_text"]["en"]},
+        )
+        return {"source_hash": wav_hash}
+
+    if streamed is None:
+        emit({"type": "stage", "index": idx, "qid": qid, "stage": "asr"})
+    wav_hash = file_sha1(wav)
+    asr_input = hash_value([wav_hash, qspec.get("languages_supported")])
+    # transkrip sendiri ada di transcript store; checkpoint hanya menyimpan kuncinya
+    with profile_stage(profiler, "asr"):
+        asr_out = run_stage(
+            checkpoints, candidate_id, qid, "asr", asr_input, cfg, run_asr,
+            validate=lambda out: store.get(candidate_id, qspec["qid"], out["source_hash"]) is not None,
+        )
+    record = store.get(candidate_id, qspec["qid"], asr_out["source_hash"])
+    text, meta = record.text, record.meta
+
+    def run_evaluate():
+        if distributed_enabled(cfg):
+            return run_remote(cfg, "evaluate", {"text": text, "qspec": qspec, "meta": meta})
+        return evaluate_answer(text, qspec, meta, cfg)
+
+    emit({"type": "stage", "index": idx, "qid": qid, "stage": "evaluate"})
+    with profile_stage(profiler, "evaluate"):
+        result = run_stage(
+            checkpoints, candidate_id, qid, "evaluate", hash_value([text, meta.get("language"), qspec]), cfg,
+            run_evaluate,
+        )
+    out = compose_hr_json(qspec, text, result, meta, source_url, video_path)
+
+    save_candidate_metadata(
+        candidate_id=candidate_id,
+        question=qspec["question_text"]["en"],
+        recorded_video_url=source_url if source_url else str(video_path),
+        is_video_exist=True,
+        qid=qid,
+    )
+
+    return out
+
+
+def _error_entry(qspec, error: BaseException) -> dict:
+    # entri pengganti di aggregate untuk pertanyaan yang gagal; di-retry pada submission berikutnya.
+    # Hasil sukses dari submission sebelumnya tidak ditimpa (merge_results), kegagalan hanya di event.
+    stage = error.stage if isinstance(error, StageFailed) else None
+    cause = error.error if isinstance(error, StageFailed) else error
+    return {
+        "qid": qspec.get("qid"),
+        "question_text": qspec.get("question_text", {}).get("id") or next(iter(qspec.get("question_text", {}).values()), ""),
+        "error": {"stage": stage, "type": type(cause).__name__, "message": str(cause)},
+        "timestamp": datetime.now().astimezone().isoformat(),
+    }
@@ -1,11 +1,12 @@
 # app/components/multi_results.py
 import io
-import json
 from typing import List, Dict
 
 import pandas as pd
 import streamlit as st
 
+from core.serializer import dumps_compact
+
 
 def build_summary_table(results_all: List[Dict]) -> pd.DataFrame:
 
@@ -30,6 +31,20 @@ def build_summary_table(results_all: List[Dict]) -> pd.DataFrame:
     return df
 
 
+def render_question_result(item: Dict, idx: int, expanded: bool = False):
+    rubric = item.get("rubric", {})
+    with st.expander(f"Q{idx:02d} – {item.get('question_text','')[:70]}", expanded=expanded):
+        if item.get("error"):
+            st.error(f"Failed at stage `{item['error'].get('stage')}`: {item['error'].get('message')}")
+            return
+        st.write(f"Score (0–4): **{rubric.get('predicted_point')}**")
+        reason = rubric.get("reason") or "There is no explanation"
+        st.write("Reason:")
+        st.write(reason)
+        st.write("transcript:")
+        st.write(item.get("transcript", ""))
+
+
 def show_summary_and_download(results_all: List[Dict], candidate_id: str):
     if not results_all:
         st.info("No evaluation results available to display.")
@@ -42,14 +57,7 @@ def show_summary_and_download(results_all: List[Dict], candidate_id: str):
 
     st.markdown("#### Detailed Assessment per Question")
     for idx, item in enumerate(results_all, start=1):
-        rubric = item.get("rubric", {})
-        with st.expander(f"Q{idx:02d} – {item.get('question_text','')[:70]}"):
-            st.write(f"Score (0–4): **{rubric.get('predicted_point')}**")
-            reason = rubric.get("reason") or "There is no explanation"
-            st.write("Reason:")
-            st.write(reason)
-            st.write("transcript:")
-            st.write(item.get("transcript", ""))
+        render_question_result(item, idx)
 
     st.markdown("#### Complete JSON ")
 
@@ -58,9 +66,11 @@ def show_summary_and_download(results_all: List[Dict], candidate_id: str):
         "totalQuestions": len(results_all),
         "results": results_all,
     }
-    st.json(all_json)
+    payload = dumps_compact(all_json)
+    if len(payload) <= 256 * 1024:
+        st.json(all_json)
 
-    buf = io.BytesIO(json.dumps(all_json, ensure_ascii=False, indent=2).encode("utf-8"))
+    buf = io.BytesIO(payload)
     st.download_button(
         "Download All Evaluation Results (JSON)",
         data=buf,
@@ -0,0 +1,85 @@
+# app/components/pipeline_health.py
+import pandas as pd
+import streamlit as st
+
+from core.metrics import REGISTRY, STAGES
+from core.answer_gate import gate_hit_rate
+
+
+def _cache_hit_rate(snapshot) -> str:
+    hits = sum(c["value"] for c in snapshot["counters"] if c["name"] == "cache_hits_total")
+    misses = sum(c["value"] for c in snapshot["counters"] if c["name"] == "cache_misses_total")
+    if hits + misses == 0:
+        return "-"
+    return f"{hits / (hits + misses):.0%}"
+
+
+def _fmt(v, ndigits=3):
+    return None if v is None else round(v, ndigits)
+
+
+def show_pipeline_health(registry=REGISTRY):
+    st.caption(f"Metrics collected in this server process since {registry.started_at}")
+
+    summary = registry.stage_summary()
+    if not summary:
+        st.info("No pipeline activity recorded yet.")
+        return
+
+    snapshot = registry.snapshot()
+    ordered = [s for s in STAGES if s in summary] + sorted(s for s in summary if s not in STAGES)
+    rows = []
+    for stage in ordered:
+        s = summary[stage]
+        rows.append({
+            "Stage": stage,
+            "Runs": s.get("runs", 0),
+            "Errors": s.get("errors", 0),
+            "Mean (s)": _fmt(s.get("mean_s")),
+            "p50 (s)": _fmt(s.get("p50_s")),
+            "p95 (s)": _fmt(s.get("p95_s")),
+            "Max (s)": _fmt(s.get("max_s")),
+            "Total (s)": _fmt(s.get("total_s"), 1),
+        })
+    st.dataframe(pd.DataFrame(rows), use_container_width=True)
+
+    audio = registry.histogram("audio_seconds_processed")
+    rtf = registry.histogram("asr_realtime_factor")
+    retries = sum(c["value"] for c in snapshot["counters"] if c["name"] == "retries_total")
+
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Audio processed (min)", f"{(audio.sum if audio else 0) / 60:.1f}")
+    c2.metric("ASR real-time factor (p50)", f"{rtf.quantile(0.5):.2f}" if rtf else "-")
+    c3.metric("Cache hit rate", _cache_hit_rate(snapshot))
+    c4.metric("Retries", f"{int(retries)}")
+
+    gate = gate_hit_rate(registry)
+    if gate["total"]:
+        st.caption(
+            f"Answer gate: {gate['gated']}/{gate['total']} answers scored without LLM ({gate['rate']:.0%}) — "
+            + ", ".join(f"{k}: {int(v)}" for k, v in sorted(gate["by_rule"].items()))
+        )
+
+    failed = [t for t in registry.recent_traces(200) if t["status"] == "error"]
+    if failed:
+        with st.expander(f"Recent stage errors ({len(failed)})"):
+            st.dataframe(pd.DataFrame([
+                {"Start": t["start"], "Stage": t["stage"], "Error": t.get("error", "")}
+                for t in reversed(failed)
+            ]), use_container_width=True)
+
+    d1, d2 = st.columns(2)
+    with d1:
+        st.download_button(
+            "Download metrics (Prometheus text)",
+            data=registry.to_prometheus(),
+            file_name="assespro_metrics.prom",
+            mime="text/plain",
+        )
+    with d2:
+        st.download_button(
+            "Download metrics (JSON)",
+            data=registry.to_json(),
+            file_name="assespro_metrics.json",
+            mime="application/json",
+        )
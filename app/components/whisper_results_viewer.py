@@ -1,39 +1,38 @@
 import streamlit as st
-import json
-from pathlib import Path
 import pandas as pd
 
-def show_whisper_accuracy_results(folder_path="data/whisper_metadata"):
-    folder = Path(folder_path)
-    folder.mkdir(parents=True, exist_ok=True)
+from core.transcript_store import TranscriptStore
 
-    st.markdown("###  Rekapitulasi Akurasi Whisper")
-    files = sorted(folder.glob("*.json"))
+def show_whisper_accuracy_results(folder_path="data/transcripts"):
+    store = TranscriptStore(folder_path)
 
-    if not files:
-        st.info("📂 Belum ada hasil whisper yang tersimpan di folder .")
-        return
+    st.markdown("###  Rekapitulasi Akurasi Whisper")
 
     all_data = []
-    for f in files:
+    for rec in store.iter_records():
         try:
-            with open(f, "r", encoding="utf-8") as j:
-                data = json.load(j)
-                adv = data.get("advanced_metrics", {})
-                acc = adv.get("accuracy", {})
-                sp = adv.get("speech_analysis", {})
-                lf = adv.get("linguistic_features", {})
-
-                all_data.append({
-                    "File": f.name,
-                    "WER": round(acc.get("WER", 0), 4),
-                    "CER": round(acc.get("CER", 0), 4),
-                    "Word Accuracy (%)": acc.get("word_accuracy", 0)*100,
-                    "Speech Rate (WPM)": sp.get("speech_rate_wpm", 0),
-                    "Unique Word Ratio": lf.get("unique_word_ratio", 0),
-                })
+            adv = rec.meta.get("advanced_metrics", {})
+            acc = adv.get("accuracy")
+            if not acc:
+                continue
+            sp = adv.get("speech_analysis", {})
+            lf = adv.get("linguistic_features", {})
+
+            all_data.append({
+                "Candidate": rec.candidate_id,
+                "QID": rec.qid,
+                "WER": round(acc.get("WER", 0), 4),
+                "CER": round(acc.get("CER", 0), 4),
+                "Word Accuracy (%)": acc.get("word_accuracy", 0)*100,
+                "Speech Rate (WPM)": sp.get("speech_rate_wpm", 0),
+                "Unique Word Ratio": lf.get("unique_word_ratio", 0),
+            })
         except Exception as e:
-            st.error(f"Gagal membaca {f.name}: {e}")
+            st.error(f"Gagal membaca {rec.candidate_id}/{rec.qid}: {e}")
+
+    if not all_data:
+        st.info("📂 Belum ada transkrip dengan data akurasi (jalankan `python -m benchmarks.asr_accuracy --annotate-store`).")
+        return
 
     df = pd.DataFrame(all_data)
     st.dataframe(df, use_container_width=True)
@@ -1,6 +1,6 @@
 import io
+import sys
 import yaml
-import json
 import streamlit as st
 from pathlib import Path
 import pandas as pd
@@ -11,70 +11,34 @@ st.set_page_config(page_title="HR Dashboard", layout="wide")
 ROOT_DIR = Path(__file__).resolve().parents[2]  
 QBANK_PATH = ROOT_DIR / "data" / "question_bank.yaml"
 
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+from components.pipeline_health import show_pipeline_health
+from core.question_bank import (
+    QBankIndex,
+    load_qbank_cached,
+    normalize_qbank,
+    invalidate_qbank_cache,
+    save_qbank as core_save_qbank,
+)
+from core.storage import read_candidate_answers_cached
+from core.config import load_config_cached
+
+CFG = load_config_cached(str(ROOT_DIR / "config.yaml"))
+RAW_JSON_PREVIEW_KB = 256
+
 # Helper functions kali butuh
 def ensure_data_folder():
     (ROOT_DIR / "data").mkdir(parents=True, exist_ok=True)
 
 def load_qbank() -> List[Dict[str, Any]]:
     ensure_data_folder()
-    if not QBANK_PATH.exists():
-        return []
-    raw = yaml.safe_load(QBANK_PATH.read_text(encoding="utf-8"))
-    if raw is None:
-        return []
-    return normalize_qbank(raw)
+    return load_qbank_cached(str(QBANK_PATH), normalize=True)
 
 def save_qbank(qbank: List[Dict[str, Any]]):
     ensure_data_folder()
-    QBANK_PATH.write_text(yaml.safe_dump(qbank, sort_keys=False, allow_unicode=True), encoding="utf-8")
-
-def normalize_qbank(raw: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    out = []
-    for item in raw:
-        q = dict(item)  # shallow copy
-        q["qid"] = str(q.get("qid", "")).strip()
-
-        qt = q.get("question_text") or {}
-        if isinstance(qt, str):
-            qt = {"en": qt}
-        q["question_text"] = {"en": str(qt.get("en", "")).strip()}
-
-        ls = q.get("languages_supported")
-        if not isinstance(ls, list):
-            ls = ["en"]
-        if "en" not in ls:
-            ls.insert(0, "en")
-        q["languages_supported"] = ls
-
-        if "answers" not in q:
-            q["answers"] = {"en": {"ideal": "", "keywords": {"must": [], "nice": []}}}
-
-        raw_rubric = q.get("rubric", {}) or {}
-        rubric = {}
-        for i in range(5):
-            v = None
-            if i in raw_rubric:
-                v = raw_rubric[i]
-            elif str(i) in raw_rubric:
-                v = raw_rubric[str(i)]
-            else:
-                v = raw_rubric.get(i, "")
-            rubric[i] = "" if v is None else str(v).strip()
-        q["rubric"] = rubric
-
-        if "weights" not in q:
-            q["weights"] = {"similarity": 0.55, "keyword_must": 0.3, "keyword_nice": 0.1, "structure": 0.05}
-
-        q["pass_threshold"] = q.get("pass_threshold", 0.7)
-
-        llm = q.get("llm") or {}
-        q["llm"] = {
-            "context": str(llm.get("context", "") or "").strip(),
-            "hard_constraints": str(llm.get("hard_constraints", "") or "").strip()
-        }
-
-        out.append(q)
-    return out
+    core_save_qbank(qbank, str(QBANK_PATH))
 
 def qbank_to_table(qbank: List[Dict[str, Any]]) -> pd.DataFrame:
     rows = []
@@ -100,6 +64,7 @@ qbank = load_qbank()
 
 with col_top_right:
     if st.button("🔄 Reload question_bank.yaml"):
+        invalidate_qbank_cache(str(QBANK_PATH))
         st.rerun()
 
     st.download_button(
@@ -182,9 +147,9 @@ st.header(" Edit / Delete Question")
 if not qbank:
     st.info("No questions to edit or delete.")
 else:
-    qids = [q.get("qid", "") for q in qbank]
-    sel_qid = st.selectbox("Select a QID to edit/delete", qids, index=0)
-    sel_idx = qids.index(sel_qid)
+    qindex = QBankIndex(qbank)
+    sel_qid = st.selectbox("Select a QID to edit/delete", qindex.qids, index=0)
+    sel_idx = qindex.index_of(sel_qid)
     sel_q = qbank[sel_idx]
 
     # ---------- EDIT FORM ----------
@@ -254,6 +219,70 @@ st.markdown("---")
 st.header("Candidate Answer Results")
 
 
+def show_similar_answers(qid: str, candidate_id: str):
+    # vektor sudah tersimpan di answer index → query tanpa memuat model SBERT
+    from core.answer_index import get_answer_index
+
+    icfg = CFG.get("answer_index", {}) or {}
+    index = get_answer_index(CFG)
+    if index is None:
+        return
+    try:
+        similar = index.most_similar(qid, candidate_id, k=int(icfg.get("top_k", 3)))
+    except Exception as e:
+        st.caption(f"Similarity index unavailable: {e}")
+        return
+    if not similar:
+        return
+    threshold = float(icfg.get("copy_threshold", 0.92))
+    st.markdown("**Most Similar Prior Answers:**")
+    st.dataframe(pd.DataFrame([
+        {
+            "Candidate": s["candidate_id"],
+            "Similarity": s["similarity"],
+            "Possible copy": "⚠" if s["similarity"] >= threshold else "",
+        }
+        for s in similar
+    ]), use_container_width=True, hide_index=True)
+
+
+def show_stage_profiles(candidate_id: str):
+    # hanya tampil jika ada profil (profiling.enabled / ASSESPRO_PROFILE=1 saat submission)
+    from core.profiling import list_profiles
+
+    rows = list_profiles(CFG, candidate_id)
+    if not rows:
+        return
+    top_n = int((CFG.get("profiling", {}) or {}).get("top_n", 25))
+    with st.expander(f"Stage Profiles ({len(rows)} questions)"):
+        st.dataframe(pd.DataFrame([
+            {"QID": r["qid"], "Total (s)": r["wall_s"], "Slowest stage": r["slowest_stage"]} for r in rows
+        ]), use_container_width=True, hide_index=True)
+
+        pick = st.selectbox("Question", [r["qid"] for r in rows], key=f"profile_qid_{candidate_id}")
+        row = next(r for r in rows if r["qid"] == pick)
+        stages = row["stages"]
+        st.dataframe(pd.DataFrame([
+            {
+                "Stage": name,
+                "Wall (s)": s.get("wall_s"),
+                "CPU (s)": s.get("cpu_s"),
+                "Peak alloc (MB)": s.get("tracemalloc_peak_mb"),
+            }
+            for name, s in sorted(stages.items(), key=lambda kv: -kv[1].get("wall_s", 0.0))
+        ]), use_container_width=True, hide_index=True)
+
+        stage = st.selectbox("Stage", list(stages), index=list(stages).index(row["slowest_stage"]), key=f"profile_stage_{candidate_id}")
+        top = stages[stage].get("top") or []
+        if top:
+            st.markdown(f"**Top {min(top_n, len(top))} functions by cumulative time**")
+            st.dataframe(pd.DataFrame(top[:top_n]), use_container_width=True, hide_index=True)
+        else:
+            st.caption("No cProfile data for this stage (another stage was being profiled at the same time).")
+        files = [stages[stage].get(k) for k in ("prof", "folded") if stages[stage].get(k)]
+        st.caption("Files: " + ", ".join(f"`{Path(row['folder']) / f}`" for f in files))
+
+
 def show_candidate_answers_for_hr(
     candidate_id: str,
     base_folder: str = "data/candidate_answers",
@@ -271,8 +300,7 @@ def show_candidate_answers_for_hr(
 
     # load JSON
     try:
-        with open(answers_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = read_candidate_answers_cached(answers_path)
     except Exception as e:
         st.error(f"Failed to read the candidate answer file.: {e}")
         return
@@ -307,6 +335,10 @@ def show_candidate_answers_for_hr(
             )
 
             with st.expander(f"{qid} – {qtext[:80]}", expanded=False):
+                if item.get("error"):
+                    err = item["error"]
+                    st.error(f"Not scored — failed at stage `{err.get('stage')}`: {err.get('message')}")
+                    continue
                 st.markdown(f"**Score (0-4):** `{score}`")
                 st.markdown("**Rubric Explanation / Justification:**")
                 st.write(reason)
@@ -326,13 +358,29 @@ def show_candidate_answers_for_hr(
                 st.markdown("**Candidate Answer Transcript from video:**")
                 st.write(transcript)
 
+                show_similar_answers(qid, candidate_id)
+
                 vid_meta = item.get("video_meta", {})
                 if vid_meta:
                     st.markdown("**Video Metadata:**")
                     st.json(vid_meta)
 
     with st.expander("View Raw JSON (Raw Candidate Answers)"):
-        st.json(data)
+        # file dikirim apa adanya; st.json hanya untuk file kecil agar browser tidak berat
+        size_kb = answers_path.stat().st_size / 1024
+        st.download_button(
+            "Download raw JSON",
+            data=answers_path.read_bytes(),
+            file_name=answers_path.name,
+            mime="application/json",
+            key=f"raw_json_{candidate_id}",
+        )
+        if size_kb <= RAW_JSON_PREVIEW_KB:
+            st.json(data)
+        else:
+            st.caption(f"File is {size_kb:.0f} KB; preview skipped, download it instead.")
+
+    show_stage_profiles(candidate_id)
 
 #remove candidate 
     st.markdown("---")
@@ -357,8 +405,25 @@ def show_candidate_answers_for_hr(
 
         if confirm_yes:
             try:
-                if answers_path.exists():
-                    answers_path.unlink()
+                from core.locks import file_lock
+
+                with file_lock(answers_path):
+                    answers_path.unlink(missing_ok=True)
+                from core.analytics import get_analytics_store
+
+                analytics = get_analytics_store(CFG)
+                if analytics is not None:
+                    analytics.delete_candidate(candidate_id)
+                from core.search_index import get_search_index
+
+                search = get_search_index(CFG)
+                if search is not None:
+                    search.delete_candidate(candidate_id)
+                from core.answer_index import get_answer_index
+
+                answer_index = get_answer_index(CFG)
+                if answer_index is not None:
+                    answer_index.delete_candidate(candidate_id)
                 st.success(f"Candidate answer file{candidate_id} sudah dihapus.")
             except Exception as e:
                 st.error(f"Failed to delete the file.: {e}")
@@ -379,20 +444,107 @@ files = sorted(ANS_FOLDER.glob("*.json"))
 if not files:
     st.info("No candidate answer file available.")
 else:
-    options = []
+    options = {}
     for f in files:
         try:
-            j = json.loads(f.read_text(encoding="utf-8"))
+            j = read_candidate_answers_cached(f)
             cid = str(j.get("candidateId", f.stem))
             saved_at = j.get("savedAt", "-")
             total = j.get("totalQuestions", len(j.get("results", [])))
             label = f"{cid}  |  {total} Question |  {saved_at}"
-            options.append({"id": cid, "label": label})
+            options[label] = cid
         except Exception:
-            options.append({"id": f.stem, "label": f"{f.stem} (invalid json)"})
+            options[f"{f.stem} (invalid json)"] = f.stem
+
+    selected_label = st.selectbox("Select a candidate to review:", list(options))
+    show_candidate_answers_for_hr(options[selected_label])
 
-    labels = [o["label"] for o in options]
-    selected_label = st.selectbox("Select a candidate to review:", labels)
 
-    selected = next(o for o in options if o["label"] == selected_label)
-    show_candidate_answers_for_hr(selected["id"])
+st.markdown("---")
+
+st.header("Transcript Search")
+
+
+def _fmt_ts(seconds) -> str:
+    seconds = int(seconds or 0)
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+
+def show_transcript_search():
+    import time
+
+    from core.search_index import get_search_index
+
+    index = get_search_index(CFG)
+    if index is None:
+        st.info("Transcript search is disabled (search.enabled: false).")
+        return
+    col_q, col_f = st.columns([3, 1])
+    with col_q:
+        query = st.text_input("Search transcripts and rubric reasons", key="search_query")
+    with col_f:
+        qid = st.selectbox("Question", ["All"] + index.qids(), key="search_qid")
+    st.caption('Words are ANDed; use "exact phrase" and prefix* (e.g. `"transfer learning" augment*`).')
+    if not query.strip():
+        return
+
+    t0 = time.perf_counter()
+    try:
+        hits = index.search(query, qid=None if qid == "All" else qid, limit=int((CFG.get("search", {}) or {}).get("limit", 50)))
+    except Exception as e:
+        st.error(f"Search failed: {e}")
+        return
+    st.caption(f"{len(hits)} result(s) in {(time.perf_counter() - t0) * 1000:.1f} ms")
+    for h in hits:
+        st.markdown(f"**{h['candidate_id']} · {h['qid']}** — point {h.get('rubric_point', '-')}")
+        st.markdown(h["transcript_snippet"] or h["reason_snippet"] or "")
+        for s in h["segments"]:
+            st.markdown(f"- `[{_fmt_ts(s['start'])}]` {s['text']}")
+
+
+show_transcript_search()
+
+st.markdown("---")
+
+st.header("Bulk Export")
+
+
+def show_bulk_export(candidate_ids: List[str]):
+    from datetime import datetime
+
+    from core.export import FORMATS, export_answers
+
+    ecfg = CFG.get("export", {}) or {}
+    selected = st.multiselect("Candidates (empty = all)", candidate_ids, key="export_candidates")
+    fmt = st.selectbox("Format", FORMATS, key="export_format")
+
+    if st.button("Export", key="export_btn"):
+        out_dir = ROOT_DIR / ecfg.get("folder", "data/exports")
+        out = out_dir / f"candidate_answers_{datetime.now():%Y%m%d_%H%M%S}.{fmt}"
+        try:
+            with st.spinner("Exporting..."):
+                n = export_answers(out, fmt, ANS_FOLDER, selected or None)
+        except Exception as e:
+            st.error(f"Export failed: {e}")
+            return
+        st.session_state["export_file"] = str(out)
+        st.success(f"{n} rows exported to `{out.relative_to(ROOT_DIR)}`")
+
+    out = st.session_state.get("export_file")
+    if out and Path(out).exists():
+        out = Path(out)
+        size_mb = out.stat().st_size / (1024 * 1024)
+        if size_mb <= float(ecfg.get("max_download_mb", 100)):
+            with open(out, "rb") as f:
+                st.download_button(f"Download {out.name} ({size_mb:.1f} MB)", data=f, file_name=out.name)
+        else:
+            st.info(f"{out.name} is {size_mb:.0f} MB; fetch it from the server at `{out}`.")
+
+
+show_bulk_export(sorted(set(options.values())) if files else [])
+
+
+st.markdown("---")
+
+st.header("Pipeline Health")
+show_pipeline_health()
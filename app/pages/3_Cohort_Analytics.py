@@ -0,0 +1,84 @@
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+import streamlit as st
+
+st.set_page_config(page_title="Cohort Analytics", layout="wide")
+ROOT_DIR = Path(__file__).resolve().parents[2]
+
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+from core.config import load_config_cached
+from core.analytics import get_analytics_store
+
+CFG = load_config_cached(str(ROOT_DIR / "config.yaml"))
+
+st.title("Cohort Analytics")
+
+store = get_analytics_store(CFG)
+if store is None:
+    st.info("Analytics store is disabled (`analytics.enabled: false`).")
+    st.stop()
+
+t0 = time.perf_counter()
+questions = pd.DataFrame(store.question_rollups())
+asr_quality = pd.DataFrame(store.asr_quality_rollups())
+load_ms = (time.perf_counter() - t0) * 1000
+
+if questions.empty:
+    st.info("No evaluations materialized yet. Run `python -m core.analytics --rebuild` to load existing candidate answers.")
+    st.stop()
+
+st.caption(f"Loaded from pre-aggregated rollups in {load_ms:.0f} ms · `{store.path.relative_to(ROOT_DIR) if store.path.is_absolute() else store.path}`")
+
+# ---------- ringkasan cohort ----------
+points = ["p0", "p1", "p2", "p3", "p4"]
+total_answers = int(questions["n"].sum())
+total_scored = int(questions["n_scored"].sum())
+overall_mean = (
+    sum(questions[p].sum() * i for i, p in enumerate(points)) / total_scored if total_scored else None
+)
+
+c1, c2, c3, c4 = st.columns(4)
+c1.metric("Answers", f"{total_answers}")
+c2.metric("Mean score (0–4)", f"{overall_mean:.2f}" if overall_mean is not None else "-")
+c3.metric("Scored without LLM (gate)", f"{int(questions['n_gated'].sum())}")
+c4.metric("Failed answers", f"{int(questions['n_errors'].sum())}")
+
+# ---------- distribusi skor ----------
+st.subheader("Score Distribution")
+dist = pd.DataFrame({"Score": list(range(5)), "Answers": [int(questions[p].sum()) for p in points]}).set_index("Score")
+st.bar_chart(dist)
+
+# ---------- tingkat kesulitan per pertanyaan ----------
+st.subheader("Per-Question Difficulty")
+difficulty = questions.assign(
+    difficulty=lambda d: 1 - d["mean_point"] / 4,
+    low_score_rate=lambda d: (d["p0"] + d["p1"]) / d["n_scored"].where(d["n_scored"] > 0),
+)[[
+    "qid", "n", "mean_point", "std_point", "difficulty", "low_score_rate",
+    "mean_keyword_must_coverage", "mean_duration_sec", "mean_speech_rate_wpm",
+]].sort_values("difficulty", ascending=False)
+st.dataframe(difficulty.round(3), use_container_width=True, hide_index=True)
+
+st.bar_chart(questions.set_index("qid")[points])
+
+# ---------- kualitas ASR ----------
+st.subheader("ASR Quality Breakdown")
+st.caption("Buckets by mean segment avg_logprob: good ≥ -0.5, fair ≥ -1.0, poor below.")
+asr_cols = ["qid", "mean_avg_logprob", "mean_no_speech_prob", "mean_asr_s"]
+st.dataframe(questions[asr_cols].round(3), use_container_width=True, hide_index=True)
+
+if not asr_quality.empty:
+    pivot_n = asr_quality.pivot(index="qid", columns="asr_quality", values="n").fillna(0).astype(int)
+    pivot_score = asr_quality.pivot(index="qid", columns="asr_quality", values="mean_point").round(2)
+    a1, a2 = st.columns(2)
+    with a1:
+        st.markdown("**Answers per ASR quality**")
+        st.dataframe(pivot_n, use_container_width=True)
+    with a2:
+        st.markdown("**Mean score per ASR quality**")
+        st.dataframe(pivot_score, use_container_width=True)
@@ -0,0 +1,248 @@
+# benchmarks/asr_accuracy.py
+# Harness akurasi vs kecepatan ASR: jalankan set referensi (audio, transkrip benar)
+# melalui setiap kombinasi backend × ukuran model × beam dari config.yaml
+# (asr_benchmark.*), lalu laporkan WER/CER, real-time factor dan peak memory
+# sebagai tabel Pareto, plus rekomendasi konfigurasi termurah yang masih
+# memenuhi wer_target_accuracy.
+#
+#   python -m benchmarks.asr_accuracy --manifest data/asr_reference/manifest.jsonl
+#   python -m benchmarks.asr_accuracy --sizes tiny base --beam-sizes 1 5 --annotate-store
+#
+# Manifest JSONL, satu item per baris:
+#   {"audio": "q1.wav", "reference": "teks benar ...", "candidate_id": "C001", "qid": "Q01"}
+# candidate_id/qid opsional; jika ada, --annotate-store menulis akurasi transkrip
+# yang tersimpan ke meta.advanced_metrics di transcript store.
+import argparse
+import copy
+import itertools
+import json
+import multiprocessing as mp
+import sys
+import wave
+from pathlib import Path
+from typing import List, Dict, Any
+
+from benchmarks.common import ROOT_DIR, peak_rss_mb, host_info, write_results, print_table
+
+from core.config import load_config
+from core.asr_metrics import compute_accuracy, corpus_accuracy
+
+
+def load_manifest(path: Path) -> List[Dict[str, Any]]:
+    path = Path(path)
+    items = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            item = json.loads(line)
+            audio = Path(item["audio"])
+            if not audio.is_absolute():
+                audio = (path.parent / audio).resolve()
+            item["audio"] = str(audio)
+            items.append(item)
+    return items
+
+
+def fixture_manifest() -> List[Dict[str, Any]]:
+    from benchmarks.fixtures import SCRIPTS, ensure_fixtures, _tts_binary
+
+    if not _tts_binary():
+        raise SystemExit("Tidak ada --manifest dan espeak tidak tersedia untuk membuat referensi sintetis.")
+    kinds = [k for k, v in SCRIPTS.items() if v]
+    fixtures = ensure_fixtures(ROOT_DIR / "benchmarks" / "fixtures_data", kinds=kinds)
+    return [{"audio": str(fixtures[k]["wav"]), "reference": SCRIPTS[k], "id": k} for k in kinds]
+
+
+def _wav_duration(path: str):
+    try:
+        with wave.open(path, "rb") as w:
+            return w.getnframes() / float(w.getframerate())
+    except Exception:
+        return None
+
+
+def _run_config(base_cfg: dict, combo: Dict[str, Any], items: List[Dict[str, Any]]) -> Dict[str, Any]:
+    import time
+
+    from core import stt
+
+    cfg = copy.deepcopy(base_cfg)
+    cfg["models"]["whisper_backend"] = combo["backend"]
+    cfg["models"]["whisper_size"] = combo["size"]
+    whisper_cfg = cfg.setdefault("whisper", {})
+    whisper_cfg["beam_size"] = combo["beam_size"]
+    whisper_cfg["best_of"] = combo["beam_size"]
+    whisper_cfg["decode_mode"] = combo["decode_mode"]
+
+    t0 = time.perf_counter()
+    model = stt.load_whisper_model(cfg)
+    load_s = time.perf_counter() - t0
+
+    per_item = []
+    for item in items:
+        text, _segments, meta = stt.transcribe(item["audio"], cfg, model)
+        decode = meta.get("decode", {})
+        asr_s = meta["timings"]["asr_s"]
+        duration = _wav_duration(item["audio"]) or meta.get("duration_sec") or 0.0
+        per_item.append({
+            "id": item.get("id") or Path(item["audio"]).name,
+            "candidate_id": item.get("candidate_id"),
+            "qid": item.get("qid"),
+            "hypothesis": text,
+            "reference": item["reference"],
+            "accuracy": compute_accuracy(item["reference"], text),
+            "audio_s": round(duration, 3),
+            "asr_s": round(asr_s, 3),
+            "segments_total": decode.get("segments_total", 0),
+            "segments_redecoded": decode.get("segments_redecoded", 0),
+        })
+
+    audio_total = sum(r["audio_s"] for r in per_item)
+    asr_total = sum(r["asr_s"] for r in per_item)
+    return {
+        **combo,
+        "corpus": corpus_accuracy(per_item),
+        "rtf": round(asr_total / audio_total, 4) if audio_total else None,
+        "segments_redecoded": sum(r["segments_redecoded"] for r in per_item),
+        "segments_total": sum(r["segments_total"] for r in per_item),
+        "model_load_s": round(load_s, 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "items": per_item,
+    }
+
+
+def _run_isolated(base_cfg, combo, items) -> Dict[str, Any]:
+    # proses baru per konfigurasi → peak RSS tidak tercampur antar model
+    ctx = mp.get_context("spawn")
+    with ctx.Pool(1) as pool:
+        return pool.apply(_run_config, (base_cfg, combo, items))
+
+
+def _cost(r) -> float:
+    return r["rtf"] if r["rtf"] is not None else float("inf")
+
+
+def pareto_front(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # minimalkan (rtf, WER): baris tidak didominasi oleh baris lain
+    for r in rows:
+        r["pareto"] = not any(
+            o is not r
+            and _cost(o) <= _cost(r)
+            and o["corpus"]["WER"] <= r["corpus"]["WER"]
+            and (_cost(o) < _cost(r) or o["corpus"]["WER"] < r["corpus"]["WER"])
+            for o in rows
+        )
+    return rows
+
+
+def recommend(rows: List[Dict[str, Any]], target_accuracy: float):
+    ok = [r for r in rows if r["corpus"]["word_accuracy"] >= target_accuracy]
+    if not ok:
+        return None
+    return min(ok, key=lambda r: (_cost(r), r["peak_rss_mb"]))
+
+
+def annotate_store(cfg: dict, items: List[Dict[str, Any]]) -> int:
+    # akurasi transkrip produksi yang tersimpan (bukan hasil sweep) → advanced_metrics
+    from core.transcript_store import get_transcript_store
+
+    store = get_transcript_store(cfg)
+    n = 0
+    for item in items:
+        if not item.get("candidate_id") or not item.get("qid"):
+            continue
+        record = store.get(item["candidate_id"], item["qid"])
+        if record is None:
+            continue
+        advanced = dict(record.meta.get("advanced_metrics", {}))
+        advanced["accuracy"] = compute_accuracy(item["reference"], record.text)
+        advanced["speech_analysis"] = record.meta.get("speech_analysis", {})
+        advanced["linguistic_features"] = record.meta.get("linguistic_features", {})
+        store.update_meta(record, {"advanced_metrics": advanced})
+        n += 1
+    return n
+
+
+def main(argv=None):
+    cfg = load_config(str(ROOT_DIR / "config.yaml"))
+    bench_cfg = cfg.get("asr_benchmark", {}) or {}
+
+    ap = argparse.ArgumentParser(description="ASR speed/accuracy benchmark")
+    ap.add_argument("--manifest", default=bench_cfg.get("reference_manifest"))
+    ap.add_argument("--backends", nargs="+", default=bench_cfg.get("backends") or [cfg["models"].get("whisper_backend", "whisper")])
+    ap.add_argument("--sizes", nargs="+", default=bench_cfg.get("sizes") or [cfg["models"]["whisper_size"]])
+    ap.add_argument("--beam-sizes", nargs="+", type=int, default=bench_cfg.get("beam_sizes") or [1])
+    ap.add_argument("--decode-modes", nargs="+", default=bench_cfg.get("decode_modes") or ["fixed"])
+    ap.add_argument("--target", type=float, default=float(cfg.get("wer_target_accuracy", 0.90)))
+    ap.add_argument("--in-process", action="store_true", help="tanpa subprocess per konfigurasi (peak RSS jadi kumulatif)")
+    ap.add_argument("--annotate-store", action="store_true")
+    ap.add_argument("--out", default=str(ROOT_DIR / "benchmarks" / "results" / "latest_asr.json"))
+    args = ap.parse_args(argv)
+
+    manifest = Path(args.manifest) if args.manifest else None
+    if manifest and not manifest.is_absolute():
+        manifest = ROOT_DIR / manifest
+    items = load_manifest(manifest) if manifest and manifest.exists() else fixture_manifest()
+
+    combos = [
+        {"backend": b, "size": s, "beam_size": k, "decode_mode": m}
+        for b, s, k, m in itertools.product(args.backends, args.sizes, args.beam_sizes, args.decode_modes)
+    ]
+    rows = []
+    for combo in combos:
+        print(f"[asr-bench] {combo} ...", flush=True)
+        try:
+            run = _run_config if args.in_process else _run_isolated
+            rows.append(run(cfg, combo, items))
+        except Exception as e:
+            print(f"[asr-bench] gagal untuk {combo}: {e}")
+
+    pareto_front(rows)
+    best = recommend(rows, args.target)
+
+    table = [
+        {
+            "backend": r["backend"],
+            "size": r["size"],
+            "beam": r["beam_size"],
+            "mode": r["decode_mode"],
+            "redecoded": f"{r['segments_redecoded']}/{r['segments_total']}",
+            "WER": r["corpus"]["WER"],
+            "CER": r["corpus"]["CER"],
+            "word_acc": r["corpus"]["word_accuracy"],
+            "rtf": r["rtf"],
+            "peak_rss_mb": r["peak_rss_mb"],
+            "load_s": r["model_load_s"],
+            "pareto": "*" if r["pareto"] else "",
+        }
+        for r in sorted(rows, key=lambda r: (_cost(r), r["corpus"]["WER"]))
+    ]
+    print_table(table, ["backend", "size", "beam", "mode", "redecoded", "WER", "CER", "word_acc", "rtf", "peak_rss_mb", "load_s", "pareto"])
+
+    if best:
+        print(
+            f"\n[asr-bench] rekomendasi (word accuracy ≥ {args.target:.0%}, RTF terendah): "
+            f"backend={best['backend']} size={best['size']} beam={best['beam_size']} mode={best['decode_mode']} "
+            f"(WER={best['corpus']['WER']}, RTF={best['rtf']})"
+        )
+    else:
+        print(f"\n[asr-bench] tidak ada konfigurasi yang mencapai word accuracy {args.target:.0%}")
+
+    write_results({
+        "host": host_info(),
+        "target_word_accuracy": args.target,
+        "n_items": len(items),
+        "recommended": {k: best[k] for k in ("backend", "size", "beam_size", "decode_mode")} if best else None,
+        "configs": rows,
+    }, Path(args.out))
+
+    if args.annotate_store:
+        n = annotate_store(cfg, items)
+        print(f"[asr-bench] advanced_metrics.accuracy ditulis untuk {n} jawaban tersimpan")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+# benchmarks/common.py
+import json
+import os
+import platform
+import statistics
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+if str(ROOT_DIR) not in sys.path:
+    sys.path.append(str(ROOT_DIR))
+
+
+def peak_rss_mb() -> float:
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux melaporkan KB, macOS melaporkan byte
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def current_rss_mb() -> float:
+    # RSS saat ini (bukan high-water mark seumur proses seperti ru_maxrss)
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        return peak_rss_mb()
+
+
+class RssSampler:
+    # thread yang mencatat RSS maksimum selama satu stage
+    def __init__(self, interval_s: float = 0.01):
+        self.interval_s = interval_s
+        self.start_mb = current_rss_mb()
+        self.peak_mb = self.start_mb
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="bench-rss", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            self.peak_mb = max(self.peak_mb, current_rss_mb())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak_mb = max(self.peak_mb, current_rss_mb())
+
+
+def _children_cpu() -> float:
+    if resource is None:
+        return 0.0
+    ru = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return ru.ru_utime + ru.ru_stime
+
+
+@contextmanager
+def measure(sample: Dict[str, Any]):
+    # wall + CPU (proses ini + subprocess seperti ffmpeg) + RSS per stage:
+    # peak_rss_mb = RSS tertinggi selama stage, rss_delta_mb = kenaikan terhadap awal stage
+    t0 = time.perf_counter()
+    c0 = time.process_time()
+    ch0 = _children_cpu()
+    sampler = RssSampler()
+    try:
+        with sampler:
+            yield sample
+    finally:
+        sample["wall_s"] = time.perf_counter() - t0
+        sample["cpu_s"] = (time.process_time() - c0) + (_children_cpu() - ch0)
+        sample["peak_rss_mb"] = sampler.peak_mb
+        sample["rss_delta_mb"] = max(0.0, sampler.peak_mb - sampler.start_mb)
+
+
+def summarize(samples: List[Dict[str, Any]]) -> Dict[str, Any]:
+    if not samples:
+        return {"n": 0}
+    walls = [s["wall_s"] for s in samples]
+    cpus = [s["cpu_s"] for s in samples]
+    return {
+        "n": len(samples),
+        "wall_s": round(statistics.median(walls), 6),
+        "wall_min_s": round(min(walls), 6),
+        "wall_max_s": round(max(walls), 6),
+        "cpu_s": round(statistics.median(cpus), 6),
+        "peak_rss_mb": round(max(s["peak_rss_mb"] for s in samples), 1),
+        "rss_delta_mb": round(max(s.get("rss_delta_mb", 0.0) for s in samples), 1),
+    }
+
+
+def host_info() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": datetime.now().astimezone().isoformat(),
+    }
+
+
+def write_results(results: Dict[str, Any], path: Path) -> Path:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    return path
+
+
+def compare_to_baseline(
+    current: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    tolerance: float = 0.20,
+    metrics=("wall_s", "cpu_s", "peak_rss_mb", "rss_delta_mb"),
+    min_abs: Optional[Dict[str, float]] = None,
+) -> List[Dict[str, Any]]:
+    # regresi = nilai sekarang > baseline * (1 + tolerance) dan selisihnya bukan noise
+    min_abs = min_abs or {"wall_s": 0.005, "cpu_s": 0.005, "peak_rss_mb": 16.0, "rss_delta_mb": 16.0}
+    rows = []
+    for name, cur in current.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for m in metrics:
+            if m not in cur or m not in base or not base[m]:
+                continue
+            ratio = cur[m] / base[m]
+            regressed = ratio > 1.0 + tolerance and (cur[m] - base[m]) > min_abs.get(m, 0.0)
+            rows.append({
+                "stage": name,
+                "metric": m,
+                "baseline": base[m],
+                "current": cur[m],
+                "ratio": round(ratio, 3),
+                "regressed": regressed,
+            })
+    return rows
+
+
+def print_table(rows: List[Dict[str, Any]], columns: List[str]):
+    if not rows:
+        print("(no rows)")
+        return
+    widths = {c: max(len(c), *(len(str(r.get(c, ""))) for r in rows)) for c in columns}
+    print("  ".join(c.ljust(widths[c]) for c in columns))
+    print("  ".join("-" * widths[c] for c in columns))
+    for r in rows:
+        print("  ".join(str(r.get(c, "")).ljust(widths[c]) for c in columns))
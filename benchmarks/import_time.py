@@ -0,0 +1,114 @@
+# benchmarks/import_time.py
+# Ukur biaya import saat cold start memakai `python -X importtime`, dan pastikan
+# modul berat (torch/whisper/librosa/moviepy/sentence_transformers) tidak ikut
+# ter-import oleh modul yang dimuat saat halaman Streamlit pertama kali dibuka.
+#
+#   python -m benchmarks.import_time
+#   python -m benchmarks.import_time --budget-ms 1500 --out benchmarks/results/latest_import_time.json
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from benchmarks.common import ROOT_DIR, host_info, write_results, print_table
+
+DEFAULT_TARGETS = [
+    "core.stt",
+    "core.media",
+    "core.rubric",
+    "core.evaluator",
+    "components.evaluation_runner",
+]
+
+HEAVY_MODULES = (
+    "torch",
+    "whisper",
+    "faster_whisper",
+    "librosa",
+    "moviepy",
+    "sentence_transformers",
+    "transformers",
+)
+
+
+def parse_importtime(stderr: str):
+    # format: "import time: self [us] | cumulative | imported package"
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        try:
+            _, rest = line.split(":", 1)
+            self_us, cum_us, name = rest.split("|", 2)
+            rows.append({
+                "module": name.strip(),
+                "depth": (len(name) - len(name.lstrip())) // 2,
+                "self_ms": int(self_us) / 1000,
+                "cumulative_ms": int(cum_us) / 1000,
+            })
+        except ValueError:
+            continue
+    return rows
+
+
+def measure_target(target: str, python: str = sys.executable):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([str(ROOT_DIR), str(ROOT_DIR / "app"), env.get("PYTHONPATH", "")])
+    proc = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {target}"],
+        cwd=str(ROOT_DIR),
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    rows = parse_importtime(proc.stderr)
+    top = next((r for r in reversed(rows) if r["module"] == target), None)
+    imported = {r["module"] for r in rows}
+    heavy = sorted(m for m in imported if m.split(".")[0] in HEAVY_MODULES and "." not in m)
+    error = None
+    if proc.returncode != 0:
+        error = proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"exit {proc.returncode}"
+    return {
+        "target": target,
+        "ok": proc.returncode == 0,
+        "error": error,
+        "total_ms": round(top["cumulative_ms"], 1) if top else None,
+        "modules_imported": len(rows),
+        "heavy_imported": heavy,
+        "slowest": sorted(rows, key=lambda r: r["self_ms"], reverse=True)[:15],
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Import-time benchmark (python -X importtime)")
+    ap.add_argument("targets", nargs="*", default=DEFAULT_TARGETS)
+    ap.add_argument("--budget-ms", type=float, default=None, help="gagal jika total import > budget")
+    ap.add_argument("--allow-heavy", action="store_true", help="jangan gagal jika modul berat ter-import")
+    ap.add_argument("--out", default=str(ROOT_DIR / "benchmarks" / "results" / "latest_import_time.json"))
+    args = ap.parse_args(argv)
+
+    results = [measure_target(t) for t in args.targets]
+    write_results({"host": host_info(), "targets": results}, Path(args.out))
+
+    print_table(
+        [{**r, "heavy_imported": ",".join(r["heavy_imported"]) or "-", "error": r["error"] or ""} for r in results],
+        ["target", "ok", "total_ms", "modules_imported", "heavy_imported", "error"],
+    )
+
+    failed = False
+    for r in results:
+        if not r["ok"]:
+            print(f"[import-time] {r['target']} gagal di-import: {r['error']}")
+            failed = True
+        if r["heavy_imported"] and not args.allow_heavy:
+            print(f"[import-time] {r['target']} meng-import modul berat saat load: {r['heavy_imported']}")
+            failed = True
+        if args.budget_ms is not None and r["total_ms"] is not None and r["total_ms"] > args.budget_ms:
+            print(f"[import-time] {r['target']} {r['total_ms']:.0f} ms > budget {args.budget_ms:.0f} ms")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
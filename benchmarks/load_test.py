@@ -0,0 +1,440 @@
+# benchmarks/load_test.py
+# Load test: N kandidat sintetis mengirim jawaban bersamaan lewat iter_answers
+# (jalur yang sama dengan halaman kandidat), atau lewat broker + worker
+# (--mode distributed). Video fixture disajikan server HTTP lokal (jalur URL,
+# termasuk download), LLM diganti server mock OpenAI-compatible dengan latency
+# dan rasio 429 yang bisa diatur. Tidak butuh API key / jaringan.
+#
+# Per level konkurensi dilaporkan: throughput, latency kandidat p50/p95/p99,
+# percentile per stage, retry LLM, kedalaman antrian, CPU/RSS dari waktu ke waktu,
+# dan titik knee (level terakhir sebelum latency memburuk / throughput berhenti naik).
+#
+#   python -m benchmarks.load_test --whisper-size tiny --levels 1 2 4 8
+#   python -m benchmarks.load_test --llm-latency-ms 800 --llm-429-rate 0.2 --questions 3
+#   python -m benchmarks.load_test --mode distributed --workers 4 --levels 2 4 8
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from benchmarks.common import ROOT_DIR, host_info, write_results, print_table, resource
+from benchmarks.fixtures import ensure_fixtures
+from benchmarks.pipeline_bench import build_cfg
+
+MOCK_KEY_ENV = "ASSESPRO_LOADTEST_LLM_KEY"
+STAGES = ("question", "download", "extract", "asr", "evaluate", "llm", "remote_task", "storage")
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class BackgroundServer:
+    def __init__(self, handler):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="loadtest-http", daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def fixture_server(directory: Path) -> BackgroundServer:
+    return BackgroundServer(partial(_QuietHandler, directory=str(directory)))
+
+
+class MockLLMState:
+    def __init__(self, latency_ms: float, jitter_ms: float, rate_429: float, retry_after_s: Optional[float], seed: int = 7):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_429 = rate_429
+        self.retry_after_s = retry_after_s
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {"requests": 0, "ok": 0, "429": 0}
+        self.inflight = 0
+        self.max_inflight = 0
+
+
+def mock_llm_server(state: MockLLMState) -> BackgroundServer:
+    # POST /v1/chat/completions → {"choices": [{"message": {"content": "{score, reason}"}}], "usage": ...}
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)) or 0)
+            with state.lock:
+                state.counts["requests"] += 1
+                throttled = state.rng.random() < state.rate_429
+                delay = max(0.0, state.rng.gauss(state.latency_ms, state.jitter_ms)) / 1000
+                state.inflight += 1
+                state.max_inflight = max(state.max_inflight, state.inflight)
+            try:
+                if throttled:
+                    with state.lock:
+                        state.counts["429"] += 1
+                    self.send_response(429)
+                    if state.retry_after_s is not None:
+                        self.send_header("Retry-After", str(state.retry_after_s))
+                    self.send_header("Content-Type", "application/json")
+                    self.end_headers()
+                    self.wfile.write(b'{"error": {"message": "rate limited (mock)"}}')
+                    return
+                time.sleep(delay)
+                try:
+                    prompt = json.loads(body)["messages"][-1]["content"]
+                except Exception:
+                    prompt = ""
+                answer = prompt.split("Candidate's Answer:", 1)[-1].split("Guidelines:", 1)[0]
+                n_words = len(answer.split())
+                content = json.dumps({"score": min(4, n_words // 25), "reason": f"Mock evaluator: {n_words} words."})
+                out = json.dumps({
+                    "model": "mock",
+                    "choices": [{"message": {"role": "assistant", "content": content}}],
+                    "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": 20},
+                }).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(out)))
+                self.end_headers()
+                self.wfile.write(out)
+                with state.lock:
+                    state.counts["ok"] += 1
+            finally:
+                with state.lock:
+                    state.inflight -= 1
+
+    return BackgroundServer(Handler)
+
+
+def _rss_mb() -> float:
+    # RSS saat ini (bukan peak) dari /proc; fallback ke peak getrusage
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        if resource is None:
+            return 0.0
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _cpu_s() -> float:
+    # proses ini + anak yang sudah selesai (ffmpeg)
+    if resource is None:
+        return time.process_time()
+    self_ru = resource.getrusage(resource.RUSAGE_SELF)
+    child_ru = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return self_ru.ru_utime + self_ru.ru_stime + child_ru.ru_utime + child_ru.ru_stime
+
+
+class ResourceSampler:
+    def __init__(self, interval_s: float = 0.5, queue_depth=None, inflight=None):
+        self.interval_s = interval_s
+        self.queue_depth = queue_depth
+        self.inflight = inflight
+        self.samples: List[Dict[str, Any]] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="loadtest-sampler", daemon=True)
+
+    def _run(self):
+        t0 = time.perf_counter()
+        last_t, last_cpu = t0, _cpu_s()
+        while not self._stop.wait(self.interval_s):
+            now, cpu = time.perf_counter(), _cpu_s()
+            sample = {
+                "t_s": round(now - t0, 2),
+                "cpu_pct": round(100 * (cpu - last_cpu) / max(now - last_t, 1e-9), 1),
+                "rss_mb": round(_rss_mb(), 1),
+                "candidates_inflight": self.inflight() if self.inflight else None,
+            }
+            if self.queue_depth is not None:
+                sample["queue_depth"] = self.queue_depth()
+            self.samples.append(sample)
+            last_t, last_cpu = now, cpu
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def _pct(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    idx = min(len(values) - 1, max(0, int(round(q * (len(values) - 1)))))
+    return round(values[idx], 3)
+
+
+def stage_percentiles(registry) -> Dict[str, Dict[str, Any]]:
+    out = {}
+    for stage in STAGES:
+        hist = registry.histogram("stage_latency_seconds", stage=stage)
+        if hist is None or not hist.count:
+            continue
+        out[stage] = {
+            "n": hist.count,
+            "p50_s": round(hist.quantile(0.5), 3),
+            "p95_s": round(hist.quantile(0.95), 3),
+            "p99_s": round(hist.quantile(0.99), 3),
+        }
+    return out
+
+
+def find_knee(levels: List[Dict[str, Any]], latency_factor: float = 1.5, min_gain: float = 0.10) -> Optional[int]:
+    # knee = level tertinggi yang masih "sehat": p95 ≤ factor × p95 level pertama
+    # dan throughput masih naik ≥ min_gain dibanding level sebelumnya
+    if not levels:
+        return None
+    base_p95 = levels[0]["latency_p95_s"] or 0.0
+    knee = levels[0]["concurrency"]
+    for prev, cur in zip(levels, levels[1:]):
+        degraded = base_p95 and cur["latency_p95_s"] > latency_factor * base_p95
+        flat = prev["throughput_answers_per_min"] and (
+            cur["throughput_answers_per_min"] < prev["throughput_answers_per_min"] * (1 + min_gain)
+        )
+        if degraded or flat:
+            break
+        knee = cur["concurrency"]
+    return knee
+
+
+def _candidate_inputs(qbank, fixtures_url: str, fixture_names: List[str], n_questions: int, seed: int):
+    rng = random.Random(seed)
+    return [
+        {"qspec": qbank[i % len(qbank)], "source_url": f"{fixtures_url}/{rng.choice(fixture_names)}"}
+        for i in range(n_questions)
+    ]
+
+
+def run_candidate(candidate_id: str, videos_input, cfg) -> Dict[str, Any]:
+    from app.components.evaluation_runner import iter_answers
+
+    t0 = time.perf_counter()
+    n_ok = n_err = 0
+    first_result_s = None
+    for ev in iter_answers(videos_input, candidate_id, cfg):
+        if ev["type"] == "result":
+            n_ok += 1
+            first_result_s = first_result_s or time.perf_counter() - t0
+        elif ev["type"] == "error":
+            n_err += 1
+    return {"candidate_id": candidate_id, "wall_s": time.perf_counter() - t0, "ok": n_ok, "errors": n_err,
+            "first_result_s": first_result_s}
+
+
+def run_level(concurrency: int, n_candidates: int, cfg, qbank, fixtures_url, fixture_names, args, llm_state, level_idx) -> Dict[str, Any]:
+    from core.metrics import REGISTRY
+
+    REGISTRY.reset()
+    llm0 = dict(llm_state.counts)
+    inflight = {"n": 0}
+    inflight_lock = threading.Lock()
+
+    queue_depth = None
+    if args.mode == "distributed":
+        from core.jobqueue import get_broker, queue_stats
+
+        broker = get_broker(cfg)
+        queue_depth = lambda: sum(r["n"] for r in queue_stats(broker) if r["status"] == "queued")
+
+    def one(i):
+        with inflight_lock:
+            inflight["n"] += 1
+        try:
+            cid = f"load_c{concurrency}_{i:04d}_{os.getpid()}"
+            inputs = _candidate_inputs(qbank, fixtures_url, fixture_names, args.questions, seed=level_idx * 10000 + i)
+            return run_candidate(cid, inputs, cfg)
+        finally:
+            with inflight_lock:
+                inflight["n"] -= 1
+
+    with ResourceSampler(args.sample_interval, queue_depth=queue_depth, inflight=lambda: inflight["n"]) as sampler:
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="loadtest-candidate") as ex:
+            candidates = list(ex.map(one, range(n_candidates)))
+        wall_s = time.perf_counter() - t0
+
+    latencies = [c["wall_s"] for c in candidates]
+    answers = sum(c["ok"] for c in candidates)
+    retries = sum(c["value"] for c in REGISTRY.snapshot()["counters"] if c["name"] == "retries_total")
+    cpu = [s["cpu_pct"] for s in sampler.samples]
+    rss = [s["rss_mb"] for s in sampler.samples]
+    depth = [s.get("queue_depth") or 0 for s in sampler.samples]
+    return {
+        "concurrency": concurrency,
+        "candidates": n_candidates,
+        "answers_ok": answers,
+        "answers_failed": sum(c["errors"] for c in candidates),
+        "wall_s": round(wall_s, 3),
+        "throughput_candidates_per_min": round(60 * n_candidates / wall_s, 2),
+        "throughput_answers_per_min": round(60 * answers / wall_s, 2),
+        "latency_p50_s": _pct(latencies, 0.50),
+        "latency_p95_s": _pct(latencies, 0.95),
+        "latency_p99_s": _pct(latencies, 0.99),
+        "first_result_p50_s": _pct([c["first_result_s"] for c in candidates if c["first_result_s"]], 0.50),
+        "stages": stage_percentiles(REGISTRY),
+        "llm": {
+            "requests": llm_state.counts["requests"] - llm0["requests"],
+            "throttled_429": llm_state.counts["429"] - llm0["429"],
+            "max_inflight": llm_state.max_inflight,
+        },
+        "retries": int(retries),
+        "cpu_pct_mean": round(statistics.mean(cpu), 1) if cpu else None,
+        "cpu_pct_max": max(cpu) if cpu else None,
+        "rss_mb_max": max(rss) if rss else None,
+        "queue_depth_max": max(depth) if depth else None,
+        "timeline": sampler.samples,
+    }
+
+
+def run(args) -> Dict[str, Any]:
+    from core.question_bank import load_qbank
+    from core.stt import load_whisper_model
+
+    fixtures_dir = Path(args.fixtures).resolve()
+    fixtures = ensure_fixtures(fixtures_dir, kinds=args.kinds, seconds=args.seconds)
+    fixture_names = [fx["video"].name for fx in fixtures.values() if "video" in fx]
+    if not fixture_names:
+        raise SystemExit("Load test butuh fixture video (ffmpeg tidak ditemukan)")
+    qbank = load_qbank(str(ROOT_DIR / "data" / "question_bank.yaml"))
+
+    workdir = Path(tempfile.mkdtemp(prefix="assespro_load_"))
+    cfg = build_cfg(args, workdir)
+    cfg.setdefault("checkpoints", {})["enabled"] = False
+    cfg.setdefault("profiling", {})["enabled"] = False
+    cfg.setdefault("lifecycle", {})["enabled"] = False
+    cfg.setdefault("runtime", {}).setdefault("stt_pool", {})["enabled"] = False
+
+    llm_state = MockLLMState(args.llm_latency_ms, args.llm_jitter_ms, args.llm_429_rate, args.llm_retry_after)
+    os.environ[MOCK_KEY_ENV] = "mock"
+
+    with fixture_server(fixtures_dir) as fx_srv, mock_llm_server(llm_state) as llm_srv:
+        cfg["evaluator"] = {
+            "backend": "groq",
+            "model": "mock",
+            "api_url": f"{llm_srv.url}/v1/chat/completions",
+            "api_key_env": MOCK_KEY_ENV,
+            "max_retries": args.llm_max_retries,
+            "backoff_base_s": args.llm_backoff_s,
+            "backoff_max_s": 5.0,
+        }
+        if args.mode == "distributed":
+            cfg["distributed"] = {
+                "enabled": True,
+                "broker": "sqlite",
+                "sqlite_path": str(workdir / "queue.sqlite"),
+                "artifact_root": str(workdir / "shared_artifacts"),
+                "lease_seconds": 30,
+                "poll_seconds": 0.05,
+                "local_workers": args.workers,
+            }
+        else:
+            # model dimuat sekali di luar pengukuran
+            load_whisper_model(cfg)
+
+        levels = []
+        for i, c in enumerate(args.levels):
+            n = max(c, int(args.candidates_per_level or c * args.rounds))
+            print(f"[load] concurrency={c}, candidates={n} ...", flush=True)
+            level = run_level(c, n, cfg, qbank, fx_srv.url, fixture_names, args, llm_state, i)
+            levels.append(level)
+            print(
+                f"[load]   {level['throughput_answers_per_min']:.1f} answers/min, "
+                f"p95 {level['latency_p95_s']}s, cpu {level['cpu_pct_mean']}%, rss {level['rss_mb_max']} MB",
+                flush=True,
+            )
+
+    knee = find_knee(levels, args.knee_latency_factor, args.knee_min_gain)
+    return {
+        "host": host_info(),
+        "config": {
+            "mode": args.mode,
+            "workers": args.workers if args.mode == "distributed" else None,
+            "whisper_backend": cfg["models"].get("whisper_backend"),
+            "whisper_size": cfg["models"].get("whisper_size"),
+            "questions_per_candidate": args.questions,
+            "fixtures": fixture_names,
+            "llm_latency_ms": args.llm_latency_ms,
+            "llm_429_rate": args.llm_429_rate,
+        },
+        "levels": levels,
+        "knee_concurrency": knee,
+        "workdir": str(workdir),
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Assespro load test (kandidat bersamaan)")
+    ap.add_argument("--fixtures", default=str(ROOT_DIR / "benchmarks" / "fixtures_data"))
+    ap.add_argument("--kinds", nargs="+", default=["short", "medium"])
+    ap.add_argument("--seconds", type=float, default=20.0)
+    ap.add_argument("--whisper-size", default="tiny")
+    ap.add_argument("--backend", default=None)
+    ap.add_argument("--beam-size", type=int, default=None)
+    ap.add_argument("--decode-mode", default=None)
+    ap.add_argument("--mode", choices=["inline", "distributed"], default="inline",
+                    help="inline: iter_answers di proses ini; distributed: broker SQLite + worker lokal")
+    ap.add_argument("--workers", type=int, default=2, help="worker lokal untuk --mode distributed")
+    ap.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8], help="kandidat bersamaan per level")
+    ap.add_argument("--rounds", type=int, default=2, help="kandidat per level = concurrency × rounds")
+    ap.add_argument("--candidates-per-level", type=int, default=None)
+    ap.add_argument("--questions", type=int, default=2, help="pertanyaan per kandidat")
+    ap.add_argument("--llm-latency-ms", type=float, default=400.0)
+    ap.add_argument("--llm-jitter-ms", type=float, default=100.0)
+    ap.add_argument("--llm-429-rate", type=float, default=0.0)
+    ap.add_argument("--llm-retry-after", type=float, default=None, help="header Retry-After (detik) pada 429")
+    ap.add_argument("--llm-max-retries", type=int, default=5)
+    ap.add_argument("--llm-backoff-s", type=float, default=0.2)
+    ap.add_argument("--sample-interval", type=float, default=0.5)
+    ap.add_argument("--knee-latency-factor", type=float, default=1.5)
+    ap.add_argument("--knee-min-gain", type=float, default=0.10)
+    ap.add_argument("--out", default=str(ROOT_DIR / "benchmarks" / "results" / "latest_load.json"))
+    args = ap.parse_args(argv)
+
+    results = run(args)
+    out = write_results(results, Path(args.out))
+    print(f"[load] hasil disimpan ke {out}")
+
+    print_table(
+        [{k: v for k, v in lvl.items() if not isinstance(v, (dict, list))} for lvl in results["levels"]],
+        ["concurrency", "candidates", "answers_ok", "answers_failed", "throughput_answers_per_min",
+         "latency_p50_s", "latency_p95_s", "retries", "cpu_pct_mean", "rss_mb_max", "queue_depth_max"],
+    )
+    print()
+    stage_rows = [
+        {"concurrency": lvl["concurrency"], "stage": stage, **pcts}
+        for lvl in results["levels"] for stage, pcts in lvl["stages"].items()
+    ]
+    print_table(stage_rows, ["concurrency", "stage", "n", "p50_s", "p95_s", "p99_s"])
+    print(f"\n[load] knee: {results['knee_concurrency']} kandidat bersamaan")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+# benchmarks/pipeline_bench.py
+# Benchmark end-to-end + per-stage untuk pipeline evaluasi:
+#   extract_wav16k → transcribe → analyze_* → evaluate_answer (LLM fake)
+#   → compose_hr_json → save_candidate_answers
+#
+# Contoh:
+#   python -m benchmarks.pipeline_bench --whisper-size tiny --out benchmarks/results/latest.json
+#   python -m benchmarks.pipeline_bench --baseline benchmarks/results/baseline.json
+#   python -m benchmarks.pipeline_bench --save-baseline
+import argparse
+import copy
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import (
+    ROOT_DIR,
+    measure,
+    summarize,
+    host_info,
+    write_results,
+    compare_to_baseline,
+    print_table,
+)
+from benchmarks.fixtures import ensure_fixtures
+
+from core.config import load_config
+from core.question_bank import load_qbank
+from core.metrics import REGISTRY
+
+DEFAULT_BASELINE = ROOT_DIR / "benchmarks" / "results" / "baseline.json"
+
+
+def build_cfg(args, workdir: Path) -> dict:
+    cfg = copy.deepcopy(load_config(str(ROOT_DIR / "config.yaml")))
+    for key in list(cfg.get("paths", {})):
+        cfg["paths"][key] = str(workdir / cfg["paths"][key])
+    cfg["paths"].setdefault("tmp_videos", str(workdir / "tmp_videos"))
+
+    models = cfg.setdefault("models", {})
+    if args.whisper_size:
+        models["whisper_size"] = args.whisper_size
+    if args.backend:
+        models["whisper_backend"] = args.backend
+
+    whisper_cfg = cfg.setdefault("whisper", {})
+    if args.beam_size is not None:
+        whisper_cfg["beam_size"] = args.beam_size
+        whisper_cfg["best_of"] = args.beam_size
+    if args.decode_mode:
+        whisper_cfg["decode_mode"] = args.decode_mode
+
+    cfg["evaluator"] = {"backend": "fake", "model": "fake"}
+    return cfg
+
+
+def run(args) -> dict:
+    from core.media import extract_wav16k
+    from core.stt import (
+        load_whisper_model,
+        transcribe,
+        analyze_segments,
+        analyze_linguistics,
+        analyze_audio_features,
+    )
+    from core.evaluator import evaluate_answer
+    from core.serializer import compose_hr_json
+    from core.storage import save_candidate_answers
+    from core.transcript_store import get_transcript_store
+    from core.utils import file_sha1
+
+    fixtures_dir = Path(args.fixtures).resolve()
+    fixtures = ensure_fixtures(fixtures_dir, kinds=args.kinds, seconds=args.seconds)
+    qbank = load_qbank(str(ROOT_DIR / "data" / "question_bank.yaml"))
+
+    workdir = Path(tempfile.mkdtemp(prefix="assespro_bench_"))
+    cfg = build_cfg(args, workdir)
+
+    store = get_transcript_store(cfg)
+
+    prev_cwd = os.getcwd()
+    # transkrip disimpan eksplisit lewat store (paths.* sudah di workdir); chdir hanya
+    # menjaga default path relatif lain (mis. data/...) agar tidak menulis ke repo
+    os.chdir(workdir)
+    stages = {}
+    try:
+        samples = {}
+
+        def record(name, fn):
+            sample = {}
+            with measure(sample):
+                out = fn()
+            samples.setdefault(name, []).append(sample)
+            return out
+
+        model = record("load_model", lambda: load_whisper_model(cfg))
+
+        for i, (kind, fx) in enumerate(fixtures.items()):
+            qspec = qbank[i % len(qbank)]
+            candidate_id = f"bench_{kind}"
+
+            # --- end-to-end (satu kali per fixture) ---
+            def chain():
+                wav = extract_wav16k(fx["video"], cfg) if "video" in fx else fx["wav"]
+                text, segments, meta = transcribe(wav, cfg, model)
+                store.put(candidate_id, qspec["qid"], file_sha1(wav), text, segments, meta)
+                result = evaluate_answer(text, qspec, meta, cfg)
+                out = compose_hr_json(qspec, text, result, meta, None, fx.get("video", fx["wav"]))
+                save_candidate_answers(candidate_id, [out], base_folder=cfg["paths"]["candidate_answers"])
+                return wav, text, segments, meta, result, out
+
+            wav, text, segments, meta, result, out = record(f"e2e[{kind}]", chain)
+
+            # --- micro-benchmark per stage ---
+            if "video" in fx:
+                for _ in range(args.repeat):
+                    record(f"extract[{kind}]", lambda: extract_wav16k(fx["video"], cfg))
+            for _ in range(args.asr_repeat):
+                record(f"asr[{kind}]", lambda: transcribe(wav, cfg, model))
+            for _ in range(args.repeat):
+                record(f"analyze_segments[{kind}]", lambda: analyze_segments(segments))
+                record(f"analyze_linguistics[{kind}]", lambda: analyze_linguistics(text))
+                record(f"analyze_audio_features[{kind}]", lambda: analyze_audio_features(wav))
+                record(f"evaluate_answer[{kind}]", lambda: evaluate_answer(text, qspec, meta, cfg))
+                record(
+                    f"compose_hr_json[{kind}]",
+                    lambda: compose_hr_json(qspec, text, result, meta, None, fx.get("video", fx["wav"])),
+                )
+                record(
+                    f"transcript_store[{kind}]",
+                    lambda: store.put(candidate_id, qspec["qid"], file_sha1(wav), text, segments, meta),
+                )
+                record(
+                    f"storage[{kind}]",
+                    lambda: save_candidate_answers(
+                        candidate_id, [out], base_folder=cfg["paths"]["candidate_answers"]
+                    ),
+                )
+
+        stages = {name: summarize(s) for name, s in samples.items()}
+    finally:
+        os.chdir(prev_cwd)
+
+    return {
+        "host": host_info(),
+        "config": {
+            "whisper_backend": cfg["models"].get("whisper_backend"),
+            "whisper_size": cfg["models"].get("whisper_size"),
+            "beam_size": cfg.get("whisper", {}).get("beam_size"),
+            "best_of": cfg.get("whisper", {}).get("best_of"),
+            "decode_mode": cfg.get("whisper", {}).get("decode_mode", "fixed"),
+            "fixtures": {k: {kk: str(vv) for kk, vv in v.items()} for k, v in fixtures.items()},
+            "repeat": args.repeat,
+            "asr_repeat": args.asr_repeat,
+        },
+        "stages": stages,
+        "metrics": REGISTRY.snapshot(),
+        "workdir": str(workdir),
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Assespro pipeline benchmark")
+    ap.add_argument("--fixtures", default=str(ROOT_DIR / "benchmarks" / "fixtures_data"))
+    ap.add_argument("--kinds", nargs="+", default=None, help="fixture kinds (short, medium, silence)")
+    ap.add_argument("--seconds", type=float, default=20.0, help="durasi audio sintetis tanpa TTS")
+    ap.add_argument("--whisper-size", default=None)
+    ap.add_argument("--backend", default=None, help="whisper | faster-whisper")
+    ap.add_argument("--beam-size", type=int, default=None)
+    ap.add_argument("--decode-mode", default=None, help="fixed | adaptive")
+    ap.add_argument("--repeat", type=int, default=5, help="ulangan micro-benchmark stage murah")
+    ap.add_argument("--asr-repeat", type=int, default=1, help="ulangan micro-benchmark ASR")
+    ap.add_argument("--out", default=str(ROOT_DIR / "benchmarks" / "results" / "latest.json"))
+    ap.add_argument("--baseline", default=None, help="bandingkan dengan file baseline JSON")
+    ap.add_argument("--save-baseline", action="store_true", help=f"simpan hasil sebagai {DEFAULT_BASELINE}")
+    ap.add_argument("--tolerance", type=float, default=0.20)
+    args = ap.parse_args(argv)
+
+    results = run(args)
+    out = write_results(results, Path(args.out))
+    print(f"[bench] hasil disimpan ke {out}")
+
+    rows = [{"stage": k, **v} for k, v in sorted(results["stages"].items())]
+    print_table(rows, ["stage", "n", "wall_s", "cpu_s", "peak_rss_mb", "rss_delta_mb"])
+
+    if args.save_baseline:
+        write_results(results, DEFAULT_BASELINE)
+        print(f"[bench] baseline disimpan ke {DEFAULT_BASELINE}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        cmp_rows = compare_to_baseline(results["stages"], baseline.get("stages", {}), tolerance=args.tolerance)
+        print()
+        print_table(cmp_rows, ["stage", "metric", "baseline", "current", "ratio", "regressed"])
+        regressions = [r for r in cmp_rows if r["regressed"]]
+        if regressions:
+            print(f"[bench] {len(regressions)} regresi melebihi toleransi {args.tolerance:.0%}")
+            return 1
+        print("[bench] tidak ada regresi")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+# benchmarks/streaming_bench.py
+# Ingest biasa (download → extract → transcribe) vs ingest streaming (core.streaming)
+# untuk video fixture yang disajikan server HTTP lokal dengan bandwidth dibatasi.
+# Streaming seharusnya mendekati max(download, ASR) + satu window, bukan jumlahnya.
+#
+#   python -m benchmarks.streaming_bench --whisper-size tiny --rates-kbps 32 128 1024
+#   python -m benchmarks.streaming_bench --seconds 90 --window-sec 15
+import argparse
+import sys
+import tempfile
+import time
+from functools import partial
+from http.server import BaseHTTPRequestHandler
+from pathlib import Path
+from typing import Dict, Any
+
+from benchmarks.common import ROOT_DIR, host_info, write_results, print_table
+from benchmarks.fixtures import ensure_fixtures
+from benchmarks.load_test import BackgroundServer
+from benchmarks.pipeline_bench import build_cfg
+
+
+class ThrottledHandler(BaseHTTPRequestHandler):
+    # GET /<file> dikirim per potongan dengan jeda → rate_kbps KB/s
+    def __init__(self, *args, directory: str, rate_kbps: float, chunk_kb: int = 16, **kwargs):
+        self.directory = Path(directory)
+        self.rate_kbps = rate_kbps
+        self.chunk = chunk_kb * 1024
+        super().__init__(*args, **kwargs)
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        path = (self.directory / self.path.lstrip("/").split("?", 1)[0]).resolve()
+        if self.directory.resolve() not in path.parents or not path.is_file():
+            self.send_error(404)
+            return
+        data = path.read_bytes()
+        self.send_response(200)
+        self.send_header("Content-Type", "video/mp4")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        delay = self.chunk / (self.rate_kbps * 1024)
+        try:
+            for i in range(0, len(data), self.chunk):
+                self.wfile.write(data[i:i + self.chunk])
+                self.wfile.flush()
+                time.sleep(delay)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+def throttled_server(directory: Path, rate_kbps: float, chunk_kb: int = 16) -> BackgroundServer:
+    return BackgroundServer(partial(ThrottledHandler, directory=str(directory), rate_kbps=rate_kbps, chunk_kb=chunk_kb))
+
+
+def run_sequential(url: str, cfg, model) -> Dict[str, Any]:
+    from core.downloader import fetch_video_to_local
+    from core.media import extract_wav16k
+    from core.stt import transcribe
+    from core.workspace import new_workspace
+
+    workspace = new_workspace(cfg, "bench_seq")
+    t0 = time.perf_counter()
+    video = fetch_video_to_local(url, cfg, workspace, name="seq")
+    t1 = time.perf_counter()
+    wav = extract_wav16k(video, cfg, workspace)
+    t2 = time.perf_counter()
+    text, _segments, _meta = transcribe(wav, cfg, model)
+    t3 = time.perf_counter()
+    return {
+        "download_s": round(t1 - t0, 3),
+        "extract_s": round(t2 - t1, 3),
+        "asr_s": round(t3 - t2, 3),
+        "total_s": round(t3 - t0, 3),
+        "words": len(text.split()),
+    }
+
+
+def run_streaming(url: str, cfg, model) -> Dict[str, Any]:
+    from core.streaming import stream_transcribe
+    from core.workspace import new_workspace
+
+    workspace = new_workspace(cfg, "bench_stream")
+    t0 = time.perf_counter()
+    out = stream_transcribe(
+        url, workspace.path("tmp_videos", "stream.mp4"), workspace.path("audio", "stream.16k.wav"), cfg, model
+    )
+    total = time.perf_counter() - t0
+    s = out["meta"]["streaming"]
+    return {
+        "download_s": s.get("download_s"),
+        "asr_s": s.get("asr_s"),
+        "first_pcm_s": s.get("first_pcm_s"),
+        "tail_s": s.get("tail_s"),
+        "windows": out["meta"]["decode"].get("windows"),
+        "fallback": s.get("fallback"),
+        "total_s": round(total, 3),
+        "words": len(out["text"].split()),
+    }
+
+
+def run(args) -> Dict[str, Any]:
+    from core.stt import load_whisper_model
+
+    fixtures_dir = Path(args.fixtures).resolve()
+    fixtures = ensure_fixtures(fixtures_dir, kinds=[args.kind], seconds=args.seconds)
+    fx = fixtures[args.kind]
+    if "video" not in fx:
+        raise SystemExit("Benchmark streaming butuh fixture video (ffmpeg tidak ditemukan)")
+    size_kb = fx["video"].stat().st_size / 1024
+
+    workdir = Path(tempfile.mkdtemp(prefix="assespro_stream_"))
+    # streaming hanya decode fixed; jalur biasa disamakan supaya sebanding
+    args.decode_mode = "fixed"
+    cfg = build_cfg(args, workdir)
+    cfg.setdefault("ingest", {})["streaming"] = {
+        "enabled": True,
+        "chunk_kb": args.chunk_kb,
+        "window_sec": args.window_sec,
+        "split_search_sec": min(5.0, args.window_sec / 4),
+    }
+    model = load_whisper_model(cfg)
+
+    rows = []
+    for rate in args.rates_kbps:
+        with throttled_server(fixtures_dir, rate) as srv:
+            url = f"{srv.url}/{fx['video'].name}"
+            print(f"[stream] {rate} KB/s ({size_kb / rate:.1f}s download) ...", flush=True)
+            for _ in range(args.repeat):
+                seq = run_sequential(url, cfg, model)
+                stream = run_streaming(url, cfg, model)
+                ideal = max(seq["download_s"], seq["asr_s"])
+                rows.append({
+                    "rate_kbps": rate,
+                    "sequential_s": seq["total_s"],
+                    "streaming_s": stream["total_s"],
+                    "download_s": seq["download_s"],
+                    "asr_s": seq["asr_s"],
+                    "max_download_asr_s": round(ideal, 3),
+                    "tail_s": stream["tail_s"],
+                    "speedup": round(seq["total_s"] / stream["total_s"], 2) if stream["total_s"] else None,
+                    "vs_max": round(stream["total_s"] / ideal, 2) if ideal else None,
+                    "fallback": stream["fallback"],
+                    "sequential": seq,
+                    "streaming": stream,
+                })
+
+    return {
+        "host": host_info(),
+        "config": {
+            "whisper_size": cfg["models"].get("whisper_size"),
+            "fixture": fx["video"].name,
+            "fixture_kb": round(size_kb, 1),
+            "audio_seconds": args.seconds,
+            "window_sec": args.window_sec,
+        },
+        "rows": rows,
+        "workdir": str(workdir),
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Ingest biasa vs streaming dengan server HTTP ber-throttle")
+    ap.add_argument("--fixtures", default=str(ROOT_DIR / "benchmarks" / "fixtures_data"))
+    ap.add_argument("--kind", default="medium")
+    ap.add_argument("--seconds", type=float, default=60.0)
+    ap.add_argument("--whisper-size", default="tiny")
+    ap.add_argument("--backend", default=None)
+    ap.add_argument("--beam-size", type=int, default=None)
+    ap.add_argument("--rates-kbps", type=float, nargs="+", default=[32, 128, 1024])
+    ap.add_argument("--chunk-kb", type=int, default=64)
+    ap.add_argument("--window-sec", type=float, default=30.0)
+    ap.add_argument("--repeat", type=int, default=1)
+    ap.add_argument("--out", default=str(ROOT_DIR / "benchmarks" / "results" / "latest_streaming.json"))
+    args = ap.parse_args(argv)
+
+    results = run(args)
+    out = write_results(results, Path(args.out))
+    print(f"[stream] hasil disimpan ke {out}")
+    print_table(
+        [{k: v for k, v in r.items() if not isinstance(v, dict)} for r in results["rows"]],
+        ["rate_kbps", "download_s", "asr_s", "sequential_s", "streaming_s", "max_download_asr_s",
+         "tail_s", "speedup", "vs_max", "fallback"],
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
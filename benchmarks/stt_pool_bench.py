@@ -0,0 +1,118 @@
+# benchmarks/stt_pool_bench.py
+# Cari pembagian proses × thread terbaik untuk TranscriptionPool di host ini.
+# Setiap bentuk (P proses × T thread, P*T ≤ jumlah core) menjalankan batch jawaban
+# yang sama; yang dilaporkan adalah throughput (detik audio per detik wall),
+# latency per jawaban dan waktu start pool (load model di tiap worker).
+#
+#   python -m benchmarks.stt_pool_bench --jobs 16 --whisper-size tiny
+#   python -m benchmarks.stt_pool_bench --shapes 1x8 2x4 4x2 8x1
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.common import ROOT_DIR, host_info, write_results, print_table
+from benchmarks.pipeline_bench import build_cfg
+
+
+def candidate_shapes(n_cpus: int):
+    shapes = []
+    t = 1
+    while t <= n_cpus:
+        shapes.append((max(1, n_cpus // t), t))
+        t *= 2
+    return shapes
+
+
+def _parse_shape(text: str):
+    p, t = text.lower().split("x")
+    return int(p), int(t)
+
+
+def bench_shape(cfg, wavs, processes, threads):
+    from core.stt import TranscriptionPool
+
+    t0 = time.perf_counter()
+    pool = TranscriptionPool(cfg, processes=processes, threads_per_process=threads)
+    # tunggu semua worker selesai memuat model: satu job kecil per proses
+    pool.map([(wavs[0], None)] * processes)
+    startup_s = time.perf_counter() - t0
+
+    latencies = []
+    audio_s = 0.0
+    t1 = time.perf_counter()
+    submitted = [(time.perf_counter(), pool.submit(w)) for w in wavs]
+    for started, res in submitted:
+        _text, _segments, meta = res.get()
+        latencies.append(time.perf_counter() - started)
+        audio_s += meta.get("duration_sec") or 0.0
+    wall_s = time.perf_counter() - t1
+    pool.close()
+
+    return {
+        "shape": f"{processes}x{threads}",
+        "processes": processes,
+        "threads": threads,
+        "jobs": len(wavs),
+        "startup_s": round(startup_s, 2),
+        "wall_s": round(wall_s, 3),
+        "audio_s": round(audio_s, 2),
+        "throughput": round(audio_s / wall_s, 3) if wall_s else None,
+        "latency_p50_s": round(statistics.median(latencies), 3),
+        "latency_max_s": round(max(latencies), 3),
+    }
+
+
+def main(argv=None):
+    from core.stt import available_cpus
+
+    ap = argparse.ArgumentParser(description="TranscriptionPool processes × threads sweep")
+    ap.add_argument("--jobs", type=int, default=0, help="jumlah jawaban per bentuk (default: 2 × jumlah core)")
+    ap.add_argument("--seconds", type=float, default=20.0)
+    ap.add_argument("--kinds", nargs="+", default=["short", "medium"])
+    ap.add_argument("--shapes", nargs="+", help="mis. 1x8 2x4 4x2; default: semua pangkat dua")
+    ap.add_argument("--whisper-size")
+    ap.add_argument("--backend")
+    ap.add_argument("--beam-size", type=int)
+    ap.add_argument("--decode-mode")
+    ap.add_argument("--out", default=str(ROOT_DIR / "benchmarks" / "results" / "latest_stt_pool.json"))
+    args = ap.parse_args(argv)
+
+    from benchmarks.fixtures import ensure_fixtures
+
+    n_cpus = len(available_cpus())
+    shapes = [_parse_shape(s) for s in args.shapes] if args.shapes else candidate_shapes(n_cpus)
+
+    fixtures = ensure_fixtures(ROOT_DIR / "benchmarks" / "fixtures_data", kinds=args.kinds, seconds=args.seconds)
+    base = [str(fixtures[k]["wav"]) for k in args.kinds]
+    n_jobs = args.jobs or 2 * n_cpus
+    wavs = [base[i % len(base)] for i in range(n_jobs)]
+
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="assespro-pool-") as tmp:
+        cfg = build_cfg(args, Path(tmp))
+        for processes, threads in shapes:
+            print(f"[stt-pool] {processes} proses × {threads} thread ...", flush=True)
+            try:
+                rows.append(bench_shape(cfg, wavs, processes, threads))
+            except Exception as e:
+                print(f"[stt-pool] gagal untuk {processes}x{threads}: {e}")
+
+    rows.sort(key=lambda r: -(r["throughput"] or 0))
+    print_table(rows, ["shape", "jobs", "startup_s", "wall_s", "throughput", "latency_p50_s", "latency_max_s"])
+
+    best = rows[0] if rows else None
+    if best:
+        print(
+            f"\n[stt-pool] terbaik untuk {n_cpus} core: {best['shape']} ({best['throughput']}× real-time)\n"
+            f"  runtime.stt_pool: {{enabled: true, processes: {best['processes']}, threads_per_process: {best['threads']}}}"
+        )
+
+    write_results({"host": host_info(), "cpus": n_cpus, "best": best, "shapes": rows}, Path(args.out))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
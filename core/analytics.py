@@ -0,0 +1,308 @@
+# core/analytics.py
+# Tabel analitik (SQLite) satu baris per (candidate, qid): skor, metrik ASR,
+# fitur bicara/linguistik/audio dan waktu proses. Diisi incremental saat
+# save_candidate_answers; rollup per pertanyaan dihitung ulang hanya untuk qid
+# yang berubah, sehingga halaman Cohort Analytics cukup membaca tabel rollup kecil.
+#
+#   python -m core.analytics --rebuild      # isi ulang dari data/candidate_answers
+import json
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional
+
+from core.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# kolom numerik: nama kolom → path di hasil HR JSON ("r.") atau meta transcript store ("m.")
+NUMERIC_COLUMNS = {
+    "rubric_point": "r.rubric.predicted_point",
+    "keyword_must_coverage": "r.keywords.must_coverage",
+    "keyword_nice_coverage": "r.keywords.nice_coverage",
+    "avg_logprob": "r.asr.avg_logprob",
+    "no_speech_prob": "r.asr.no_speech_prob",
+    "duration_sec": "r.asr.duration_sec",
+    "word_accuracy": "r.asr_advanced.accuracy.word_accuracy",
+    "language_confidence": "m.language.confidence",
+    "segments_redecoded": "m.decode.segments_redecoded",
+    "asr_s": "m.timings.asr_s",
+    "acoustic_features_s": "m.timings.acoustic_features_s",
+    "total_speech_time": "m.speech_analysis.total_speech_time",
+    "total_pause_time": "m.speech_analysis.total_pause_time",
+    "num_pauses": "m.speech_analysis.num_pauses",
+    "avg_pause_duration": "m.speech_analysis.avg_pause_duration",
+    "speech_rate_wpm": "m.speech_analysis.speech_rate_wpm",
+    "unique_word_ratio": "m.linguistic_features.unique_word_ratio",
+    "avg_sentence_length": "m.linguistic_features.avg_sentence_length",
+    "filler_word_ratio": "m.linguistic_features.filler_word_ratio",
+    "avg_pitch": "m.audio_features.avg_pitch",
+    "pitch_variance": "m.audio_features.pitch_variance",
+    "energy_mean": "m.audio_features.energy_mean",
+}
+TEXT_COLUMNS = {
+    "language": "r.language_selected",
+    "decode_mode": "m.decode.mode",
+    "gate_rule": "r.evaluator.gate.rule",
+    "error_stage": "r.error.stage",
+    "evaluated_at": "r.timestamp",
+}
+
+# kualitas ASR dari avg_logprob (batas bawah, inklusif)
+ASR_QUALITY_BUCKETS = (("good", -0.5), ("fair", -1.0), ("poor", float("-inf")))
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS answers (
+    candidate_id TEXT NOT NULL,
+    qid TEXT NOT NULL,
+    saved_at TEXT,
+    asr_quality TEXT,
+    {", ".join(f"{c} TEXT" for c in TEXT_COLUMNS)},
+    {", ".join(f"{c} REAL" for c in NUMERIC_COLUMNS)},
+    PRIMARY KEY (candidate_id, qid)
+);
+CREATE INDEX IF NOT EXISTS answers_qid ON answers (qid);
+
+CREATE TABLE IF NOT EXISTS rollup_question (
+    qid TEXT PRIMARY KEY,
+    n INTEGER, n_scored INTEGER, n_errors INTEGER, n_gated INTEGER,
+    mean_point REAL, std_point REAL,
+    p0 INTEGER, p1 INTEGER, p2 INTEGER, p3 INTEGER, p4 INTEGER,
+    mean_avg_logprob REAL, mean_no_speech_prob REAL, mean_duration_sec REAL,
+    mean_speech_rate_wpm REAL, mean_keyword_must_coverage REAL, mean_asr_s REAL,
+    updated_at TEXT
+);
+
+CREATE TABLE IF NOT EXISTS rollup_asr_quality (
+    qid TEXT NOT NULL,
+    asr_quality TEXT NOT NULL,
+    n INTEGER, mean_point REAL, mean_word_accuracy REAL,
+    PRIMARY KEY (qid, asr_quality)
+);
+"""
+
+_lock = threading.Lock()
+
+
+def _dig(obj, path: str):
+    for key in path.split("."):
+        if not isinstance(obj, dict):
+            return None
+        obj = obj.get(key)
+    return obj
+
+
+def _asr_quality(avg_logprob) -> Optional[str]:
+    if avg_logprob is None:
+        return None
+    for name, lower in ASR_QUALITY_BUCKETS:
+        if avg_logprob >= lower:
+            return name
+    return None
+
+
+def flatten_result(candidate_id: str, item: Dict[str, Any], meta: Optional[Dict[str, Any]] = None, saved_at=None) -> Dict[str, Any]:
+    sources = {"r": item, "m": meta or {}}
+    row = {"candidate_id": candidate_id, "qid": item.get("qid"), "saved_at": saved_at}
+    for col, path in TEXT_COLUMNS.items():
+        src, rest = path.split(".", 1)
+        val = _dig(sources[src], rest)
+        row[col] = None if val is None else str(val)
+    for col, path in NUMERIC_COLUMNS.items():
+        src, rest = path.split(".", 1)
+        val = _dig(sources[src], rest)
+        try:
+            row[col] = None if val is None else float(val)
+        except (TypeError, ValueError):
+            row[col] = None
+    row["asr_quality"] = _asr_quality(row["avg_logprob"])
+    return row
+
+
+class AnalyticsStore:
+    def __init__(self, path="data/analytics.sqlite"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.connect() as con:
+            con.executescript(_SCHEMA)
+
+    @contextmanager
+    def connect(self):
+        con = sqlite3.connect(str(self.path), timeout=30)
+        con.row_factory = sqlite3.Row
+        try:
+            con.execute("PRAGMA journal_mode=WAL")
+            yield con
+            con.commit()
+        finally:
+            con.close()
+
+    def upsert_rows(self, rows: List[Dict[str, Any]]) -> int:
+        # baris kandidat diganti seluruhnya dalam satu transaksi: qid yang tidak ada lagi
+        # di submission terbaru ikut terhapus dari answers dan rollup
+        if not rows:
+            return 0
+        cols = list(rows[0])
+        sql = (
+            f"INSERT OR REPLACE INTO answers ({', '.join(cols)}) "
+            f"VALUES ({', '.join('?' for _ in cols)})"
+        )
+        candidates = sorted({r["candidate_id"] for r in rows})
+        with _lock, REGISTRY.span("storage", kind="analytics"), self.connect() as con:
+            stale = set()
+            for cid in candidates:
+                stale.update(r[0] for r in con.execute("SELECT qid FROM answers WHERE candidate_id = ?", (cid,)))
+                con.execute("DELETE FROM answers WHERE candidate_id = ?", (cid,))
+            con.executemany(sql, [[r.get(c) for c in cols] for r in rows])
+            self._refresh_rollups(con, sorted(stale | {r["qid"] for r in rows}))
+        return len(rows)
+
+    def delete_candidate(self, candidate_id: str):
+        with _lock, self.connect() as con:
+            qids = [r[0] for r in con.execute("SELECT qid FROM answers WHERE candidate_id = ?", (candidate_id,))]
+            con.execute("DELETE FROM answers WHERE candidate_id = ?", (candidate_id,))
+            self._refresh_rollups(con, qids)
+
+    def _refresh_rollups(self, con, qids: Iterable[str]):
+        now = datetime.now().astimezone().isoformat()
+        for qid in qids:
+            r = con.execute(
+                """
+                SELECT COUNT(*) AS n,
+                       COUNT(rubric_point) AS n_scored,
+                       SUM(error_stage IS NOT NULL) AS n_errors,
+                       SUM(gate_rule IS NOT NULL) AS n_gated,
+                       AVG(rubric_point) AS mean_point,
+                       AVG(rubric_point * rubric_point) AS mean_sq,
+                       SUM(rubric_point = 0) AS p0, SUM(rubric_point = 1) AS p1,
+                       SUM(rubric_point = 2) AS p2, SUM(rubric_point = 3) AS p3,
+                       SUM(rubric_point = 4) AS p4,
+                       AVG(avg_logprob) AS mean_avg_logprob,
+                       AVG(no_speech_prob) AS mean_no_speech_prob,
+                       AVG(duration_sec) AS mean_duration_sec,
+                       AVG(speech_rate_wpm) AS mean_speech_rate_wpm,
+                       AVG(keyword_must_coverage) AS mean_keyword_must_coverage,
+                       AVG(asr_s) AS mean_asr_s
+                FROM answers WHERE qid = ?
+                """,
+                (qid,),
+            ).fetchone()
+            if not r["n"]:
+                con.execute("DELETE FROM rollup_question WHERE qid = ?", (qid,))
+                con.execute("DELETE FROM rollup_asr_quality WHERE qid = ?", (qid,))
+                continue
+            std = None
+            if r["mean_point"] is not None:
+                std = max(0.0, r["mean_sq"] - r["mean_point"] ** 2) ** 0.5
+            con.execute(
+                """
+                INSERT OR REPLACE INTO rollup_question VALUES
+                (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                (
+                    qid, r["n"], r["n_scored"], r["n_errors"] or 0, r["n_gated"] or 0,
+                    r["mean_point"], std,
+                    r["p0"] or 0, r["p1"] or 0, r["p2"] or 0, r["p3"] or 0, r["p4"] or 0,
+                    r["mean_avg_logprob"], r["mean_no_speech_prob"], r["mean_duration_sec"],
+                    r["mean_speech_rate_wpm"], r["mean_keyword_must_coverage"], r["mean_asr_s"],
+                    now,
+                ),
+            )
+            con.execute("DELETE FROM rollup_asr_quality WHERE qid = ?", (qid,))
+            con.execute(
+                """
+                INSERT INTO rollup_asr_quality
+                SELECT qid, asr_quality, COUNT(*), AVG(rubric_point), AVG(word_accuracy)
+                FROM answers WHERE qid = ? AND asr_quality IS NOT NULL
+                GROUP BY qid, asr_quality
+                """,
+                (qid,),
+            )
+
+    # ---------- reads (untuk dashboard) ----------
+    def question_rollups(self) -> List[Dict[str, Any]]:
+        with self.connect() as con:
+            return [dict(r) for r in con.execute("SELECT * FROM rollup_question ORDER BY qid")]
+
+    def asr_quality_rollups(self) -> List[Dict[str, Any]]:
+        with self.connect() as con:
+            return [dict(r) for r in con.execute("SELECT * FROM rollup_asr_quality ORDER BY qid, asr_quality")]
+
+    def query(self, sql: str, params=()) -> List[Dict[str, Any]]:
+        with self.connect() as con:
+            return [dict(r) for r in con.execute(sql, params)]
+
+
+def get_analytics_store(cfg: Optional[dict] = None) -> Optional[AnalyticsStore]:
+    acfg = (cfg or {}).get("analytics", {}) or {}
+    if not acfg.get("enabled", True):
+        return None
+    paths = (cfg or {}).get("paths", {}) or {}
+    return AnalyticsStore(paths.get("analytics_db", "data/analytics.sqlite"))
+
+
+def _candidate_rows(cfg: dict, candidate_id: str, results_all: List[dict], saved_at: Optional[str]) -> List[Dict[str, Any]]:
+    from core.transcript_store import get_transcript_store
+
+    transcripts = get_transcript_store(cfg)
+    rows = []
+    for item in results_all:
+        if not item.get("qid"):
+            continue
+        record = transcripts.get(candidate_id, item["qid"])
+        rows.append(flatten_result(candidate_id, item, record.meta if record else None, saved_at))
+    return rows
+
+
+def record_candidate(cfg: dict, candidate_id: str, results_all: List[dict], saved_at: Optional[str] = None) -> int:
+    store = get_analytics_store(cfg)
+    if store is None:
+        return 0
+    return store.upsert_rows(_candidate_rows(cfg, candidate_id, results_all, saved_at))
+
+
+def rebuild(cfg: dict, answers_folder="data/candidate_answers") -> int:
+    store = get_analytics_store(cfg)
+    if store is None:
+        logger.warning("analytics.enabled = false: rebuild dilewati")
+        return 0
+    # semua baris dulu, lalu satu transaksi + satu refresh rollup per qid
+    rows = []
+    for path in sorted(Path(answers_folder).glob("*.json")):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning("Lewati %s: %s", path, e)
+            continue
+        rows.extend(_candidate_rows(cfg, data.get("candidateId", path.stem), data.get("results", []) or [], data.get("savedAt")))
+    return store.upsert_rows(rows)
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from core.config import load_config
+
+    ap = argparse.ArgumentParser(description="Analytics store (SQLite) untuk Cohort Analytics")
+    ap.add_argument("--rebuild", action="store_true", help="hapus dan isi ulang dari data/candidate_answers")
+    ap.add_argument("--answers", default="data/candidate_answers")
+    ap.add_argument("--config", default="config.yaml")
+    args = ap.parse_args()
+
+    cfg = load_config(args.config)
+    store = get_analytics_store(cfg)
+    if store is None:
+        raise SystemExit("Analytics dinonaktifkan (analytics.enabled: false di config)")
+    if args.rebuild:
+        with store.connect() as con:
+            con.executescript("DELETE FROM answers; DELETE FROM rollup_question; DELETE FROM rollup_asr_quality;")
+        t0 = time.perf_counter()
+        n = rebuild(cfg, args.answers)
+        print(f"{n} jawaban dimuat ke {store.path} dalam {time.perf_counter() - t0:.2f}s")
+    for row in store.question_rollups():
+        print(json.dumps(row, ensure_ascii=False))
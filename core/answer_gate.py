@@ -0,0 +1,104 @@
+# core/answer_gate.py
+# Gate murah sebelum evaluate_answer_llm: jawaban kosong / diam / terlalu pendek /
+# off-topic langsung diberi skor 0 atau 1 dengan alasan template, tanpa memanggil LLM.
+# Semua sinyal sudah tersedia dari transcribe (meta ASR) dan core.keywords.
+from typing import Dict, Any, Optional
+
+from core.metrics import REGISTRY
+
+DEFAULT_REASONS = {
+    "empty_transcript": "No spoken answer was detected in the recording.",
+    "no_speech": "The recording is almost entirely silence (no_speech_prob={no_speech_prob:.2f}).",
+    "too_short": "The recording is only {duration_sec:.1f} seconds long, too short to answer the question.",
+    "too_few_words": "The answer contains only {n_words} words and does not address the question.",
+    "off_topic": "The answer does not mention any of the expected topics and is unrelated to the question{sim_note}.",
+}
+
+
+def _question_reference(qspec: dict, lang: str) -> str:
+    qtext = qspec.get("question_text", {}) or {}
+    ideal = ((qspec.get("answers", {}) or {}).get(lang, {}) or {}).get("ideal", "")
+    return " ".join(filter(None, [qtext.get(lang) or next(iter(qtext.values()), ""), ideal]))
+
+
+def _similarity(answer: str, reference: str, model_name: str) -> float:
+    from sentence_transformers import util
+
+    from core.rubric import _get_model
+
+    model = _get_model(model_name)
+    emb = model.encode([answer, reference], convert_to_tensor=True, normalize_embeddings=True)
+    return float(util.cos_sim(emb[0], emb[1]).item())
+
+
+def check_answer(
+    transcript_text: str,
+    qspec: dict,
+    whisper_meta: Optional[dict],
+    cfg: Optional[dict],
+    lang: str,
+    keywords: Optional[Dict[str, Any]] = None,
+) -> Optional[Dict[str, Any]]:
+    # None → lanjut ke LLM; dict → {"score", "reason", "rule", "signals"}
+    gcfg = (cfg or {}).get("answer_gate", {}) or {}
+    if not gcfg.get("enabled", False):
+        return None
+
+    meta = whisper_meta if isinstance(whisper_meta, dict) else {}
+    asr = meta.get("asr_metrics", {}) or {}
+    signals = {
+        "n_words": len((transcript_text or "").split()),
+        "no_speech_prob": meta.get("no_speech_prob", asr.get("no_speech_prob")),
+        "duration_sec": meta.get("duration_sec", asr.get("duration_sec")),
+        "keyword_must_coverage": (keywords or {}).get("keyword_must_coverage"),
+        "similarity": None,
+        "sim_note": "",
+    }
+
+    rule, score = None, None
+    if signals["n_words"] == 0:
+        rule, score = "empty_transcript", 0
+    elif signals["no_speech_prob"] is not None and signals["no_speech_prob"] >= float(gcfg.get("max_no_speech_prob", 0.9)):
+        rule, score = "no_speech", 0
+    elif signals["duration_sec"] is not None and signals["duration_sec"] < float(gcfg.get("min_duration_sec", 3.0)):
+        rule, score = "too_short", 0
+    elif signals["n_words"] < int(gcfg.get("min_words", 5)):
+        rule, score = "too_few_words", 1
+    elif gcfg.get("off_topic", {}).get("enabled", False) and signals["keyword_must_coverage"] == 0:
+        # tidak satu pun keyword must muncul → cek kemiripan semantik dengan soal (jika diaktifkan)
+        ocfg = gcfg["off_topic"]
+        if ocfg.get("use_similarity", False):
+            model_name = (cfg or {}).get("models", {}).get("sbert_name")
+            try:
+                sim = _similarity(transcript_text, _question_reference(qspec, lang), model_name)
+            except Exception:
+                sim = None
+            signals["similarity"] = None if sim is None else round(sim, 4)
+            if sim is not None and sim < float(ocfg.get("min_similarity", 0.25)):
+                signals["sim_note"] = f" (similarity {sim:.2f})"
+                rule, score = "off_topic", 1
+        else:
+            rule, score = "off_topic", 1
+
+    REGISTRY.inc("answer_gate_total", outcome=rule or "pass")
+    if rule is None:
+        return None
+
+    template = (gcfg.get("reasons", {}) or {}).get(rule) or DEFAULT_REASONS[rule]
+    try:
+        reason = template.format(**signals)
+    except (KeyError, ValueError, TypeError):
+        reason = DEFAULT_REASONS[rule].format(**signals)
+    signals.pop("sim_note", None)
+    return {"score": score, "reason": reason, "rule": rule, "signals": signals}
+
+
+def gate_hit_rate(registry=REGISTRY) -> Dict[str, Any]:
+    counts = {
+        c["labels"].get("outcome"): c["value"]
+        for c in registry.snapshot()["counters"]
+        if c["name"] == "answer_gate_total"
+    }
+    total = sum(counts.values())
+    gated = total - counts.get("pass", 0)
+    return {"total": total, "gated": gated, "rate": (gated / total) if total else None, "by_rule": counts}
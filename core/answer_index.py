@@ -0,0 +1,275 @@
+# core/answer_index.py
+# Index embedding jawaban per qid (model models.sbert_name) untuk mencari jawaban
+# kandidat lain yang paling mirip (jawaban hafalan / salinan).
+#
+#   <root>/<qid>/vectors.npy   float32 (N, dim), sudah dinormalisasi (cosine = dot)
+#   <root>/<qid>/ids.json      {"model", "qid", "ids": [candidate_id...], "text_sha1": [...]}
+#
+# Diperbarui incremental saat save_candidate_answers: hanya jawaban yang teksnya
+# berubah yang di-encode ulang. Query memakai vektor tersimpan (tanpa memuat SBERT).
+# Di atas ann.min_size jawaban, pencarian memakai LSH random-hyperplane lalu
+# rerank exact pada kandidat dari bucket yang sama.
+import hashlib
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.locks import file_lock, atomic_write_bytes
+from core.metrics import REGISTRY
+from core.utils import FileCache
+from core.workspace import safe_filename
+
+logger = logging.getLogger(__name__)
+
+_write_lock = threading.Lock()
+
+
+def _text_sha1(text: str) -> str:
+    return hashlib.sha1((text or "").strip().encode("utf-8")).hexdigest()
+
+
+def _load_ids(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _load_vectors(path):
+    return np.load(path, allow_pickle=False)
+
+
+_ids_cache = FileCache("answer_index_ids", _load_ids, copy_on_read=False)
+_vectors_cache = FileCache("answer_index_vectors", _load_vectors, copy_on_read=False)
+
+
+class LSHIndex:
+    # random-hyperplane LSH: n_tables tabel, masing-masing n_bits bit tanda proyeksi
+    def __init__(self, vectors: np.ndarray, n_tables: int = 8, n_bits: int = 12, seed: int = 13):
+        rng = np.random.default_rng(seed)
+        self.planes = rng.standard_normal((n_tables, vectors.shape[1], n_bits)).astype(np.float32)
+        self.weights = (1 << np.arange(n_bits)).astype(np.int64)
+        self.tables = []
+        codes = self._codes(vectors)
+        for t in range(n_tables):
+            buckets: Dict[int, List[int]] = {}
+            for i, c in enumerate(codes[t]):
+                buckets.setdefault(int(c), []).append(i)
+            self.tables.append({k: np.asarray(v) for k, v in buckets.items()})
+
+    def _codes(self, vectors: np.ndarray) -> np.ndarray:
+        # (n_tables, N)
+        bits = np.einsum("nd,tdb->tnb", vectors, self.planes) > 0
+        return bits.astype(np.int64) @ self.weights
+
+    def candidates(self, query: np.ndarray) -> np.ndarray:
+        codes = self._codes(query[None, :])[:, 0]
+        hits = [self.tables[t].get(int(c)) for t, c in enumerate(codes)]
+        hits = [h for h in hits if h is not None]
+        if not hits:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(hits))
+
+
+_lsh_cache: Dict[str, Tuple[tuple, LSHIndex]] = {}
+
+
+class AnswerIndex:
+    def __init__(self, root="data/cache/answer_index", model_name: Optional[str] = None, ann_cfg: Optional[dict] = None):
+        self.root = Path(root)
+        self.model_name = model_name
+        self.ann_cfg = ann_cfg or {}
+
+    def _paths(self, qid: str):
+        folder = self.root / safe_filename(qid)
+        return folder / "vectors.npy", folder / "ids.json"
+
+    def load(self, qid: str):
+        vec_path, ids_path = self._paths(qid)
+        if not vec_path.exists() or not ids_path.exists():
+            return None, None
+        return _vectors_cache.get(vec_path), _ids_cache.get(ids_path)
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        from core.rubric import _get_model
+
+        model = _get_model(self.model_name)
+        with REGISTRY.span("embedding", model=self.model_name):
+            emb = model.encode(texts, normalize_embeddings=True, convert_to_numpy=True, batch_size=32)
+        return np.asarray(emb, dtype=np.float32)
+
+    def upsert(self, qid: str, answers: Dict[str, str]) -> int:
+        # answers: {candidate_id: transcript}; hanya teks baru/berubah yang di-encode
+        # lock antar-proses: beberapa worker bisa memperbarui index qid yang sama
+        with _write_lock, file_lock(self._paths(qid)[1]):
+            vectors, meta = self.load(qid)
+            if meta is not None and meta.get("model") != self.model_name:
+                logger.info("Model embedding berubah untuk %s, index dibangun ulang", qid)
+                vectors, meta = None, None
+            ids = list(meta["ids"]) if meta else []
+            shas = list(meta["text_sha1"]) if meta else []
+            vectors = np.array(vectors) if vectors is not None else None
+            position = {cid: i for i, cid in enumerate(ids)}
+
+            todo = [
+                (cid, text) for cid, text in answers.items()
+                if (text or "").strip() and (cid not in position or shas[position[cid]] != _text_sha1(text))
+            ]
+            if not todo:
+                return 0
+
+            emb = self._encode([t for _, t in todo])
+            new_rows = []
+            for (cid, text), e in zip(todo, emb):
+                if cid in position:
+                    vectors[position[cid]] = e
+                    shas[position[cid]] = _text_sha1(text)
+                else:
+                    ids.append(cid)
+                    shas.append(_text_sha1(text))
+                    new_rows.append(e)
+            if new_rows:
+                stacked = np.vstack(new_rows).astype(np.float32)
+                vectors = stacked if vectors is None else np.vstack([vectors, stacked])
+
+            self._write(qid, vectors, ids, shas)
+            REGISTRY.inc("answer_index_upserts_total", len(todo))
+            return len(todo)
+
+    def remove(self, qid: str, candidate_ids: List[str]) -> int:
+        # buang vektor kandidat (jawaban dihapus, kosong, atau gagal) dari index qid
+        with _write_lock, file_lock(self._paths(qid)[1]):
+            vectors, meta = self.load(qid)
+            if meta is None:
+                return 0
+            drop = set(candidate_ids)
+            keep = [i for i, cid in enumerate(meta["ids"]) if cid not in drop]
+            removed = len(meta["ids"]) - len(keep)
+            if not removed:
+                return 0
+            if keep:
+                self._write(
+                    qid,
+                    np.asarray(vectors)[keep],
+                    [meta["ids"][i] for i in keep],
+                    [meta["text_sha1"][i] for i in keep],
+                )
+            else:
+                vec_path, ids_path = self._paths(qid)
+                ids_path.unlink(missing_ok=True)
+                vec_path.unlink(missing_ok=True)
+            REGISTRY.inc("answer_index_removed_total", removed)
+            return removed
+
+    def delete_candidate(self, candidate_id: str) -> int:
+        if not self.root.exists():
+            return 0
+        n = 0
+        for ids_path in sorted(self.root.glob("*/ids.json")):
+            try:
+                qid = _load_ids(ids_path).get("qid") or ids_path.parent.name
+            except Exception:
+                continue
+            n += self.remove(qid, [candidate_id])
+        return n
+
+    def _write(self, qid: str, vectors: np.ndarray, ids: List[str], shas: List[str]):
+        vec_path, ids_path = self._paths(qid)
+        vec_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = vec_path.with_name("vectors.tmp.npy")
+        np.save(tmp, vectors)
+        tmp.replace(vec_path)
+        atomic_write_bytes(ids_path, json.dumps(
+            {"model": self.model_name, "qid": qid, "dim": int(vectors.shape[1]), "ids": ids, "text_sha1": shas}
+        ).encode("utf-8"))
+
+    def _lsh(self, qid: str, vectors: np.ndarray) -> LSHIndex:
+        vec_path, _ = self._paths(qid)
+        key = (str(vec_path), vec_path.stat().st_mtime_ns, vectors.shape)
+        cached = _lsh_cache.get(str(vec_path))
+        if cached and cached[0] == key:
+            return cached[1]
+        lsh = LSHIndex(
+            vectors,
+            n_tables=int(self.ann_cfg.get("n_tables", 8)),
+            n_bits=int(self.ann_cfg.get("n_bits", 12)),
+        )
+        _lsh_cache[str(vec_path)] = (key, lsh)
+        return lsh
+
+    def most_similar(self, qid: str, candidate_id: str, k: int = 5) -> List[Dict[str, float]]:
+        vectors, meta = self.load(qid)
+        if vectors is None or candidate_id not in meta["ids"]:
+            return []
+        ids = meta["ids"]
+        self_pos = ids.index(candidate_id)
+        query = vectors[self_pos]
+
+        with REGISTRY.span("similarity_query", qid=qid):
+            if len(ids) >= int(self.ann_cfg.get("min_size", 2000)):
+                pool = self._lsh(qid, vectors).candidates(query)
+                pool = pool[pool != self_pos]
+                if len(pool) < k:
+                    pool = np.array([i for i in range(len(ids)) if i != self_pos])
+            else:
+                pool = np.array([i for i in range(len(ids)) if i != self_pos])
+            if len(pool) == 0:
+                return []
+            scores = vectors[pool] @ query
+            top = np.argsort(-scores)[:k]
+        return [{"candidate_id": ids[int(pool[i])], "similarity": round(float(scores[i]), 4)} for i in top]
+
+
+def get_answer_index(cfg: Optional[dict] = None) -> Optional[AnswerIndex]:
+    icfg = (cfg or {}).get("answer_index", {}) or {}
+    if not icfg.get("enabled", True):
+        return None
+    paths = (cfg or {}).get("paths", {}) or {}
+    root = paths.get("answer_index") or str(Path(paths.get("cache", "data/cache")) / "answer_index")
+    model_name = (cfg or {}).get("models", {}).get("sbert_name")
+    return AnswerIndex(root, model_name=model_name, ann_cfg=icfg.get("ann", {}))
+
+
+def index_candidate_results(cfg: dict, candidate_id: str, results_all: List[dict]) -> int:
+    index = get_answer_index(cfg)
+    if index is None:
+        return 0
+    n = 0
+    for item in results_all:
+        if not item.get("qid"):
+            continue
+        if item.get("error") or not (item.get("transcript") or "").strip():
+            # vektor lama tidak boleh tertinggal untuk jawaban yang kini kosong / gagal
+            index.remove(item["qid"], [candidate_id])
+            continue
+        n += index.upsert(item["qid"], {candidate_id: item.get("transcript", "")})
+    return n
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from core.config import load_config
+
+    ap = argparse.ArgumentParser(description="Bangun / perbarui index embedding jawaban dari data/candidate_answers")
+    ap.add_argument("--answers", default="data/candidate_answers")
+    ap.add_argument("--config", default="config.yaml")
+    args = ap.parse_args()
+
+    cfg = load_config(args.config)
+    index = get_answer_index(cfg)
+    by_qid: Dict[str, Dict[str, str]] = {}
+    for path in sorted(Path(args.answers).glob("*.json")):
+        try:
+            data = _load_ids(path)
+        except Exception:
+            continue
+        cid = data.get("candidateId", path.stem)
+        for item in data.get("results", []) or []:
+            if item.get("qid") and not item.get("error"):
+                by_qid.setdefault(item["qid"], {})[cid] = item.get("transcript", "")
+    for qid, answers in sorted(by_qid.items()):
+        n = index.upsert(qid, answers)
+        print(f"{qid}: {len(answers)} jawaban, {n} di-encode")
@@ -0,0 +1,85 @@
+# core/asr_metrics.py
+# WER / CER terhadap transkrip referensi. Memakai jiwer jika terpasang,
+# selain itu edit distance sendiri (hasil sama untuk teks yang sudah dinormalisasi).
+import re
+from typing import Dict, List, Sequence
+
+_PUNCT = re.compile(r"[^\w\s']+")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    text = (text or "").lower()
+    text = _PUNCT.sub(" ", text)
+    return _SPACES.sub(" ", text).strip()
+
+
+def _edit_distance(ref: Sequence, hyp: Sequence) -> int:
+    if not ref:
+        return len(hyp)
+    if not hyp:
+        return len(ref)
+    prev = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, start=1):
+        cur = [i] + [0] * len(hyp)
+        for j, h in enumerate(hyp, start=1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (r != h))
+        prev = cur
+    return prev[-1]
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    ref = normalize_text(reference).split()
+    hyp = normalize_text(hypothesis).split()
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    try:
+        import jiwer
+
+        return float(jiwer.wer(" ".join(ref), " ".join(hyp)))
+    except ImportError:
+        return _edit_distance(ref, hyp) / len(ref)
+
+
+def char_error_rate(reference: str, hypothesis: str) -> float:
+    ref = normalize_text(reference)
+    hyp = normalize_text(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    try:
+        import jiwer
+
+        return float(jiwer.cer(ref, hyp))
+    except ImportError:
+        return _edit_distance(ref, hyp) / len(ref)
+
+
+def compute_accuracy(reference: str, hypothesis: str) -> Dict[str, float]:
+    wer = word_error_rate(reference, hypothesis)
+    cer = char_error_rate(reference, hypothesis)
+    return {
+        "WER": round(wer, 4),
+        "CER": round(cer, 4),
+        "word_accuracy": round(max(0.0, 1.0 - wer), 4),
+        "ref_words": len(normalize_text(reference).split()),
+    }
+
+
+def corpus_accuracy(pairs: List[Dict[str, str]]) -> Dict[str, float]:
+    # WER korpus = total edit / total kata referensi (bukan rata-rata per file)
+    errors = words = char_errors = chars = 0
+    for p in pairs:
+        ref_w = normalize_text(p["reference"]).split()
+        hyp_w = normalize_text(p["hypothesis"]).split()
+        errors += _edit_distance(ref_w, hyp_w)
+        words += len(ref_w)
+        ref_c = normalize_text(p["reference"])
+        char_errors += _edit_distance(ref_c, normalize_text(p["hypothesis"]))
+        chars += len(ref_c)
+    wer = errors / words if words else 0.0
+    return {
+        "WER": round(wer, 4),
+        "CER": round(char_errors / chars, 4) if chars else 0.0,
+        "word_accuracy": round(max(0.0, 1.0 - wer), 4),
+        "ref_words": words,
+    }
@@ -0,0 +1,145 @@
+# core/checkpoint.py
+# Checkpoint per (candidate, qid, stage). Setiap record menyimpan hash input dan
+# hash bagian config yang memengaruhi stage itu; submission ulang melewati stage
+# yang input + config-nya tidak berubah dan hanya mengulang stage yang gagal/berubah.
+#
+#   <root>/<candidate>/<qid>/<stage>.json
+#   {"stage", "status": "ok"|"error", "input_hash", "config_hash", "output", "error", "updated_at"}
+import hashlib
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from core.locks import atomic_write_bytes
+from core.metrics import REGISTRY
+from core.serializer import dumps_compact, loads
+from core.workspace import safe_filename
+
+logger = logging.getLogger(__name__)
+
+# bagian config yang memengaruhi hasil tiap stage ("a.b" → cfg["a"]["b"])
+STAGE_CONFIG_SECTIONS = {
+    "download": (),
+    "extract": (),
+    "asr": ("models", "whisper", "ingest.streaming"),
+    "evaluate": ("evaluator", "llm_scoring", "answer_gate", "keywords"),
+}
+
+
+class StageFailed(Exception):
+    # dibungkus oleh run_stage supaya pemanggil tahu stage mana yang gagal
+    def __init__(self, stage: str, error: BaseException):
+        super().__init__(f"{stage}: {error}")
+        self.stage = stage
+        self.error = error
+
+
+def hash_value(obj) -> str:
+    data = json.dumps(obj, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    return hashlib.sha1(data).hexdigest()
+
+
+def config_hash(cfg: dict, stage: str) -> str:
+    sections = STAGE_CONFIG_SECTIONS.get(stage, ())
+    return hash_value({s: _section(cfg, s) for s in sections})
+
+
+def _section(cfg: dict, key: str):
+    node = cfg or {}
+    for part in key.split("."):
+        node = node.get(part) if isinstance(node, dict) else None
+    return node
+
+
+class CheckpointStore:
+    def __init__(self, root="data/cache/checkpoints"):
+        self.root = Path(root)
+
+    def _path(self, candidate_id: str, qid: str, stage: str) -> Path:
+        return self.root / safe_filename(candidate_id) / safe_filename(qid) / f"{stage}.json"
+
+    def get(self, candidate_id: str, qid: str, stage: str) -> Optional[Dict[str, Any]]:
+        path = self._path(candidate_id, qid, stage)
+        if not path.exists():
+            return None
+        try:
+            return loads(path.read_bytes())
+        except Exception:
+            return None
+
+    def lookup(self, candidate_id, qid, stage, input_hash, cfg_hash) -> Optional[Dict[str, Any]]:
+        rec = self.get(candidate_id, qid, stage)
+        if rec and rec.get("status") == "ok" and rec.get("input_hash") == input_hash and rec.get("config_hash") == cfg_hash:
+            return rec
+        return None
+
+    def _write(self, candidate_id, qid, stage, record):
+        path = self._path(candidate_id, qid, stage)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        record["updated_at"] = datetime.now().astimezone().isoformat()
+        atomic_write_bytes(path, dumps_compact(record))
+
+    def save_ok(self, candidate_id, qid, stage, input_hash, cfg_hash, output):
+        self._write(candidate_id, qid, stage, {
+            "stage": stage, "status": "ok", "input_hash": input_hash, "config_hash": cfg_hash,
+            "output": output, "error": None,
+        })
+
+    def save_error(self, candidate_id, qid, stage, input_hash, cfg_hash, error: BaseException):
+        self._write(candidate_id, qid, stage, {
+            "stage": stage, "status": "error", "input_hash": input_hash, "config_hash": cfg_hash,
+            "output": None, "error": f"{type(error).__name__}: {error}",
+        })
+
+    def status(self, candidate_id: str, qid: str) -> Dict[str, str]:
+        folder = self.root / safe_filename(candidate_id) / safe_filename(qid)
+        out = {}
+        for p in sorted(folder.glob("*.json")):
+            rec = self.get(candidate_id, qid, p.stem) or {}
+            out[p.stem] = rec.get("status")
+        return out
+
+
+def run_stage(
+    store: Optional[CheckpointStore],
+    candidate_id: str,
+    qid: str,
+    stage: str,
+    input_hash: str,
+    cfg: dict,
+    fn: Callable[[], Any],
+    validate: Optional[Callable[[Any], bool]] = None,
+):
+    # output fn harus bisa di-serialisasi JSON; validate(output) memastikan artefak masih ada
+    if store is None:
+        try:
+            return fn()
+        except Exception as e:
+            raise StageFailed(stage, e) from e
+
+    cfg_hash = config_hash(cfg, stage)
+    rec = store.lookup(candidate_id, qid, stage, input_hash, cfg_hash)
+    if rec is not None and (validate is None or validate(rec["output"])):
+        REGISTRY.inc("checkpoint_hits_total", stage=stage)
+        logger.info("Checkpoint %s/%s/%s dipakai ulang", candidate_id, qid, stage)
+        return rec["output"]
+
+    REGISTRY.inc("checkpoint_misses_total", stage=stage)
+    try:
+        output = fn()
+    except Exception as e:
+        store.save_error(candidate_id, qid, stage, input_hash, cfg_hash, e)
+        raise StageFailed(stage, e) from e
+    store.save_ok(candidate_id, qid, stage, input_hash, cfg_hash, output)
+    return output
+
+
+def get_checkpoint_store(cfg: Optional[dict] = None) -> Optional[CheckpointStore]:
+    ck = (cfg or {}).get("checkpoints", {}) or {}
+    if not ck.get("enabled", True):
+        return None
+    paths = (cfg or {}).get("paths", {}) or {}
+    root = paths.get("checkpoints") or str(Path(paths.get("cache", "data/cache")) / "checkpoints")
+    return CheckpointStore(root)
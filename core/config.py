@@ -1,5 +1,19 @@
 import yaml
 
+from core.utils import FileCache
+
 def load_config(path="config.yaml"):
     with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
\ No newline at end of file
+        return yaml.safe_load(f)
+
+
+_config_cache = FileCache("config", load_config)
+
+
+def load_config_cached(path="config.yaml"):
+    # dipanggil di setiap rerun Streamlit; parse ulang hanya jika file berubah
+    return _config_cache.get(path)
+
+
+def invalidate_config_cache(path=None):
+    _config_cache.invalidate(path)
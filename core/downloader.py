@@ -1,6 +1,9 @@
 from pathlib import Path
 import os, re, requests
 
+from core.metrics import REGISTRY
+from core.workspace import new_workspace
+
 def _download_direct(url: str, outpath: Path):
     outpath.parent.mkdir(parents=True, exist_ok=True)
     with requests.get(url, stream=True, timeout=60) as r:
@@ -46,19 +49,51 @@ def _download_gdrive(url: str, outpath: Path):
     gdown.download(direct_url, str(outpath), quiet=False)
     return outpath
 
-def fetch_video_to_local(url: str, cfg) -> Path:
-    u = url.lower()
-    outdir = Path(cfg["paths"]["tmp_videos"])
-    outdir.mkdir(parents=True, exist_ok=True)
+def fetch_video_to_local(url: str, cfg, workspace=None, name: str = "remote") -> Path:
+    # tanpa workspace → workspace sekali pakai, supaya unduhan paralel tidak bertabrakan
+    workspace = workspace or new_workspace(cfg)
+    with REGISTRY.span("download"):
+        return _fetch(url, workspace, name)
 
-    if any(k in u for k in ["youtube.com", "youtu.be", "tiktok.com", "x.com"]):
-        return _download_ytdlp(url, outdir)
 
-    if "drive.google.com" in u and ("file/d/" in u or "open?id=" in u):
-        outpath = outdir / "gdrive_video.mp4"
-        return _download_gdrive(url, outpath)
+def _is_ytdlp(u: str) -> bool:
+    return any(k in u for k in ["youtube.com", "youtu.be", "tiktok.com", "x.com"])
+
 
+def _is_gdrive(u: str) -> bool:
+    return "drive.google.com" in u and ("file/d/" in u or "open?id=" in u)
+
+
+def direct_url(url: str):
+    # URL yang bisa diunduh byte demi byte (tanpa yt-dlp / gdown) → URL unduhannya, selain itu None
+    u = url.lower()
+    if _is_ytdlp(u) or _is_gdrive(u):
+        return None
     if "dropbox.com" in u and "?dl=0" in url:
         url = url.replace("?dl=0", "?dl=1")
+    return url
+
+
+VIDEO_SUFFIXES = (".mp4", ".mov", ".m4v", ".webm", ".mkv", ".avi", ".3gp", ".ogv")
+
+
+def video_suffix(url: str, default: str = ".mp4") -> str:
+    # ekstensi container dari path URL (tanpa query); ffmpeg/probe lain mengandalkannya
+    from urllib.parse import urlparse
+
+    suffix = Path(urlparse(url).path).suffix.lower()
+    return suffix if suffix in VIDEO_SUFFIXES else default
+
+
+def _fetch(url: str, workspace, name: str) -> Path:
+    u = url.lower()
+    outdir = workspace.dir("tmp_videos")
+
+    if _is_ytdlp(u):
+        return _download_ytdlp(url, outdir)
+
+    if _is_gdrive(u):
+        outpath = workspace.path("tmp_videos", f"{name}_gdrive.mp4")
+        return _download_gdrive(url, outpath)
 
-    return _download_direct(url, outdir / "remote_video.mp4")
+    return _download_direct(direct_url(url), workspace.path("tmp_videos", f"{name}{video_suffix(url)}"))
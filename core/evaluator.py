@@ -3,14 +3,27 @@
 from __future__ import annotations
 from typing import Dict, Any
 from core.llm_evaluator import evaluate_answer_llm
+from core.keywords import keyword_coverage
+from core.answer_gate import check_answer
 
 def evaluate_answer(transcript_text: str, qspec: dict, whisper_meta: dict, cfg: dict) -> Dict[str, Any]:
-    llm_res = evaluate_answer_llm(transcript_text, qspec, cfg)
+    supported = qspec.get("languages_supported", ["en"])
+    detected = (whisper_meta or {}).get("language", {}) if isinstance(whisper_meta, dict) else {}
+    lang = detected.get("lang") if detected.get("lang") in supported else supported[0]
+
+    # sinyal murah sebelum LLM: coverage keyword must/nice dari question bank
+    kw = keyword_coverage(transcript_text, qspec, lang, cfg)
+
+    # jawaban kosong / diam / off-topic → skor template tanpa memanggil LLM
+    gate = check_answer(transcript_text, qspec, whisper_meta, cfg, lang, keywords=kw)
+    if gate is not None:
+        llm_res = {"llm_score": gate["score"], "llm_reason": gate["reason"], "llm_raw_content": None}
+    else:
+        llm_res = evaluate_answer_llm(transcript_text, qspec, cfg, lang=lang)
     llm_score = llm_res.get("llm_score", 0)
     llm_reason = llm_res.get("llm_reason", "")
 
     performance_score = float(llm_score) / 4.0
-    lang = qspec.get("languages_supported", ["en"])[0]
 
     if isinstance(whisper_meta, dict):
         asr_meta = whisper_meta.get("asr_metrics", whisper_meta)
@@ -20,14 +33,15 @@ def evaluate_answer(transcript_text: str, qspec: dict, whisper_meta: dict, cfg:
     result = {
         "lang_selected": lang,
 
+        "keyword_must_coverage": kw["keyword_must_coverage"],
+        "keyword_nice_coverage": kw["keyword_nice_coverage"],
+        "hits": kw["hits"],
+
         # # field lama → diisi default saja
         # "sim": 0.0,
         # "sim_max": None,
-        # "keyword_must_coverage": 0.0,
-        # "keyword_nice_coverage": 0.0,
         # "structure": None,
         # "structure_features": None,
-        # "hits": {"must": [], "nice": []},
 
         # # # skor utama
         # "performance_score": performance_score,
@@ -44,5 +58,7 @@ def evaluate_answer(transcript_text: str, qspec: dict, whisper_meta: dict, cfg:
     result["llm_raw"] = {
         "raw_content": llm_res.get("llm_raw_content"),
     }
+    if gate is not None:
+        result["llm_raw"]["gate"] = {"rule": gate["rule"], "signals": gate["signals"]}
 
     return result
@@ -0,0 +1,179 @@
+# core/export.py
+# Export massal hasil kandidat (data/candidate_answers) ke CSV / JSONL / Parquet,
+# satu baris per (candidate, pertanyaan). File kandidat dibaca satu per satu dan
+# baris ditulis langsung ke output, sehingga memori tetap konstan untuk ribuan kandidat.
+#
+#   python -m core.export --format csv --out exports/cohort.csv
+#   python -m core.export --format parquet --out exports/cohort.parquet --candidates C001 C002
+import csv
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Any, Iterable, Iterator, List, Optional
+
+from core.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# (nama kolom, path di hasil HR JSON, tipe) — skema datar per pertanyaan
+EXPORT_COLUMNS = (
+    ("candidate_id", None, "str"),
+    ("saved_at", None, "str"),
+    ("question_index", None, "int"),
+    ("qid", "qid", "str"),
+    ("question_text", "question_text", "str"),
+    ("language", "language_selected", "str"),
+    ("rubric_point", "rubric.predicted_point", "int"),
+    ("rubric_reason", "rubric.reason", "str"),
+    ("keyword_must_coverage", "keywords.must_coverage", "float"),
+    ("keyword_nice_coverage", "keywords.nice_coverage", "float"),
+    ("keyword_hits_must", "keywords.hits.must", "list"),
+    ("gate_rule", "evaluator.gate.rule", "str"),
+    ("avg_logprob", "asr.avg_logprob", "float"),
+    ("no_speech_prob", "asr.no_speech_prob", "float"),
+    ("duration_sec", "asr.duration_sec", "float"),
+    ("transcript", "transcript", "str"),
+    ("source_url", "video_meta.source_url", "str"),
+    ("saved_video", "video_meta.saved_video", "str"),
+    ("error_stage", "error.stage", "str"),
+    ("error_message", "error.message", "str"),
+    ("evaluated_at", "timestamp", "str"),
+)
+COLUMN_NAMES = [c[0] for c in EXPORT_COLUMNS]
+FORMATS = ("csv", "jsonl", "parquet")
+
+
+def _dig(obj, path: str):
+    for key in path.split("."):
+        if not isinstance(obj, dict):
+            return None
+        obj = obj.get(key)
+    return obj
+
+
+def _coerce(value, kind: str):
+    if value is None:
+        return None
+    try:
+        if kind == "int":
+            return int(value)
+        if kind == "float":
+            return float(value)
+        if kind == "list":
+            return "; ".join(str(v) for v in value) if isinstance(value, (list, tuple)) else str(value)
+    except (TypeError, ValueError):
+        return None
+    return str(value)
+
+
+def flatten_answer(candidate_id: str, saved_at, index: int, item: Dict[str, Any]) -> Dict[str, Any]:
+    row = {"candidate_id": candidate_id, "saved_at": saved_at, "question_index": index}
+    for name, path, kind in EXPORT_COLUMNS:
+        if path is not None:
+            row[name] = _coerce(_dig(item, path), kind)
+    return row
+
+
+def iter_rows(answers_folder="data/candidate_answers", candidate_ids: Optional[Iterable[str]] = None) -> Iterator[Dict[str, Any]]:
+    folder = Path(answers_folder)
+    if candidate_ids:
+        paths = [folder / f"{cid}.json" for cid in candidate_ids]
+    else:
+        paths = sorted(folder.glob("*.json"))
+    for path in paths:
+        if not path.exists():
+            logger.warning("File kandidat tidak ditemukan: %s", path)
+            continue
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning("Lewati %s: %s", path, e)
+            continue
+        cid = str(data.get("candidateId", path.stem))
+        for idx, item in enumerate(data.get("results", []) or [], start=1):
+            yield flatten_answer(cid, data.get("savedAt"), idx, item)
+
+
+def write_csv(rows: Iterable[Dict[str, Any]], out: Path) -> int:
+    n = 0
+    with open(out, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMN_NAMES)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            n += 1
+    return n
+
+
+def write_jsonl(rows: Iterable[Dict[str, Any]], out: Path) -> int:
+    n = 0
+    with open(out, "w", encoding="utf-8") as f:
+        for row in rows:
+            f.write(json.dumps(row, ensure_ascii=False))
+            f.write("\n")
+            n += 1
+    return n
+
+
+def write_parquet(rows: Iterable[Dict[str, Any]], out: Path, batch_size: int = 5000) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("Export Parquet membutuhkan pyarrow (pip install pyarrow)") from e
+
+    types = {"str": pa.string(), "int": pa.int64(), "float": pa.float64(), "list": pa.string()}
+    schema = pa.schema([(name, types[kind]) for name, _path, kind in EXPORT_COLUMNS])
+
+    n = 0
+    batch: List[Dict[str, Any]] = []
+    with pq.ParquetWriter(str(out), schema, compression="zstd") as writer:
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                n += len(batch)
+                batch = []
+        if batch:
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            n += len(batch)
+    return n
+
+
+_WRITERS = {"csv": write_csv, "jsonl": write_jsonl, "parquet": write_parquet}
+
+
+def export_answers(
+    out,
+    fmt: str = "csv",
+    answers_folder="data/candidate_answers",
+    candidate_ids: Optional[Iterable[str]] = None,
+) -> int:
+    if fmt not in _WRITERS:
+        raise ValueError(f"Format export tidak dikenal: {fmt} (pilih {', '.join(FORMATS)})")
+    out = Path(out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_name(out.name + ".tmp")
+    with REGISTRY.span("export", format=fmt):
+        n = _WRITERS[fmt](iter_rows(answers_folder, candidate_ids), tmp)
+        tmp.replace(out)
+    REGISTRY.inc("export_rows_total", n, format=fmt)
+    logger.info("%d baris diexport ke %s", n, out)
+    return n
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    ap = argparse.ArgumentParser(description="Export massal hasil kandidat")
+    ap.add_argument("--format", choices=FORMATS, default="csv")
+    ap.add_argument("--out", required=True)
+    ap.add_argument("--answers", default="data/candidate_answers")
+    ap.add_argument("--candidates", nargs="+", help="default: semua kandidat")
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    n = export_answers(args.out, args.format, args.answers, args.candidates)
+    print(f"{n} baris → {args.out} ({time.perf_counter() - t0:.2f}s)")
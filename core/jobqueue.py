@@ -0,0 +1,542 @@
+# core/jobqueue.py
+# Antrian task untuk mode terdistribusi (distributed.enabled): host Streamlit
+# meng-enqueue stage asr / evaluate, worker stateless (python -m core.worker) di node
+# mana pun mengambilnya dengan lease yang diperpanjang lewat heartbeat. Lease yang
+# kedaluwarsa (worker mati) dikembalikan ke antrian sampai max_attempts, lalu "dead".
+#
+# Broker:
+#   memory  in-process (dev / test, dengan distributed.local_workers)
+#   sqlite  satu host atau beberapa proses di host yang sama
+#   redis   multi-node (Redis / Valkey / KeyDB, perlu paket `redis`)
+#
+# Artefak (WAV) diserahkan lewat ArtifactStore: folder content-addressed di
+# distributed.artifact_root yang harus di-mount bersama oleh host dan semua worker.
+import logging
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Sequence
+
+from core.locks import file_lock
+from core.metrics import REGISTRY
+from core.serializer import dumps_compact, loads
+from core.utils import file_sha1, sharded_path
+
+logger = logging.getLogger(__name__)
+
+QUEUED, LEASED, DONE, DEAD = "queued", "leased", "done", "dead"
+
+
+class TaskFailed(RuntimeError):
+    pass
+
+
+def _dumps(obj) -> str:
+    # meta transkripsi berisi skalar numpy; serializer repo menanganinya
+    return dumps_compact(obj).decode("utf-8")
+
+
+def _new_task(queue: str, payload: Dict[str, Any], max_attempts: int) -> Dict[str, Any]:
+    now = time.time()
+    return {
+        "id": uuid.uuid4().hex,
+        "queue": queue,
+        "payload": payload,
+        "status": QUEUED,
+        "attempts": 0,
+        "max_attempts": int(max_attempts),
+        "worker": None,
+        "lease_until": None,
+        "result": None,
+        "error": None,
+        "created_at": now,
+        "updated_at": now,
+    }
+
+
+class Broker:
+    # antarmuka bersama; subclass mengimplementasikan operasi atomiknya
+    def enqueue(self, queue: str, payload: Dict[str, Any], max_attempts: int = 3) -> str:
+        raise NotImplementedError
+
+    def lease(self, queues: Sequence[str], worker_id: str, lease_s: float) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def heartbeat(self, task_id: str, worker_id: str, lease_s: float) -> bool:
+        raise NotImplementedError
+
+    def complete(self, task_id: str, worker_id: str, result: Any) -> bool:
+        raise NotImplementedError
+
+    def fail(self, task_id: str, worker_id: str, error: str, retry: bool = True) -> bool:
+        raise NotImplementedError
+
+    def get(self, task_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def requeue_expired(self) -> int:
+        raise NotImplementedError
+
+    def purge(self, older_than_s: float = 7 * 86400) -> int:
+        # default: tidak ada yang dibersihkan (memory hilang bersama proses, redis memakai TTL)
+        return 0
+
+    def wait(self, task_id: str, timeout: Optional[float] = None, poll: float = 0.5) -> Any:
+        deadline = time.time() + timeout if timeout else None
+        while True:
+            task = self.get(task_id)
+            if task is None:
+                raise TaskFailed(f"Task {task_id} tidak ditemukan")
+            if task["status"] == DONE:
+                return task["result"]
+            if task["status"] == DEAD:
+                raise TaskFailed(f"Task {task['queue']} gagal setelah {task['attempts']} percobaan: {task['error']}")
+            if deadline and time.time() > deadline:
+                raise TimeoutError(f"Task {task['queue']} {task_id} belum selesai setelah {timeout}s")
+            # host ikut membersihkan lease kedaluwarsa; tidak bergantung pada worker yang hidup
+            self.requeue_expired()
+            time.sleep(poll)
+
+
+class InMemoryBroker(Broker):
+    def __init__(self):
+        self._tasks: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def enqueue(self, queue, payload, max_attempts=3):
+        task = _new_task(queue, payload, max_attempts)
+        with self._lock:
+            self._tasks[task["id"]] = task
+        return task["id"]
+
+    def lease(self, queues, worker_id, lease_s):
+        with self._lock:
+            queued = [t for t in self._tasks.values() if t["status"] == QUEUED and t["queue"] in queues]
+            if not queued:
+                return None
+            task = min(queued, key=lambda t: t["created_at"])
+            task.update(status=LEASED, worker=worker_id, lease_until=time.time() + lease_s,
+                        attempts=task["attempts"] + 1, updated_at=time.time())
+            return dict(task)
+
+    def _owned(self, task_id, worker_id):
+        task = self._tasks.get(task_id)
+        if task is None or task["status"] != LEASED or task["worker"] != worker_id:
+            return None
+        return task
+
+    def heartbeat(self, task_id, worker_id, lease_s):
+        with self._lock:
+            task = self._owned(task_id, worker_id)
+            if task is None:
+                return False
+            task.update(lease_until=time.time() + lease_s, updated_at=time.time())
+            return True
+
+    def complete(self, task_id, worker_id, result):
+        with self._lock:
+            task = self._owned(task_id, worker_id)
+            if task is None:
+                return False
+            task.update(status=DONE, result=result, lease_until=None, updated_at=time.time())
+            return True
+
+    def fail(self, task_id, worker_id, error, retry=True):
+        with self._lock:
+            task = self._owned(task_id, worker_id)
+            if task is None:
+                return False
+            again = retry and task["attempts"] < task["max_attempts"]
+            task.update(status=QUEUED if again else DEAD, worker=None, lease_until=None,
+                        error=error, updated_at=time.time())
+            return True
+
+    def get(self, task_id):
+        with self._lock:
+            task = self._tasks.get(task_id)
+            return dict(task) if task else None
+
+    def requeue_expired(self):
+        now = time.time()
+        n = 0
+        with self._lock:
+            for task in self._tasks.values():
+                if task["status"] == LEASED and task["lease_until"] < now:
+                    again = task["attempts"] < task["max_attempts"]
+                    task.update(status=QUEUED if again else DEAD, worker=None, lease_until=None,
+                                error=task["error"] or "lease expired", updated_at=now)
+                    n += 1
+        return n
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    queue TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    worker TEXT,
+    lease_until REAL,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_status_queue ON tasks (status, queue, created_at);
+CREATE INDEX IF NOT EXISTS idx_tasks_lease ON tasks (status, lease_until);
+"""
+
+
+class SQLiteBroker(Broker):
+    # BEGIN IMMEDIATE → satu penulis per transaksi; aman antar proses di host yang sama
+    def __init__(self, path="data/queue.sqlite"):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.connect() as con:
+            con.executescript(_SQLITE_SCHEMA)
+
+    @contextmanager
+    def connect(self):
+        con = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+        con.row_factory = sqlite3.Row
+        try:
+            con.execute("PRAGMA journal_mode=WAL")
+            yield con
+        finally:
+            con.close()
+
+    @contextmanager
+    def _tx(self):
+        with self.connect() as con:
+            con.execute("BEGIN IMMEDIATE")
+            try:
+                yield con
+                con.execute("COMMIT")
+            except BaseException:
+                con.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _row(row) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        task = dict(row)
+        task["payload"] = loads(task["payload"])
+        task["result"] = loads(task["result"]) if task["result"] is not None else None
+        return task
+
+    def enqueue(self, queue, payload, max_attempts=3):
+        task = _new_task(queue, payload, max_attempts)
+        with self._tx() as con:
+            con.execute(
+                "INSERT INTO tasks (id, queue, payload, status, attempts, max_attempts, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, 0, ?, ?, ?)",
+                (task["id"], queue, _dumps(payload), QUEUED,
+                 task["max_attempts"], task["created_at"], task["updated_at"]),
+            )
+        return task["id"]
+
+    def lease(self, queues, worker_id, lease_s):
+        now = time.time()
+        marks = ", ".join("?" for _ in queues)
+        with self._tx() as con:
+            row = con.execute(
+                f"SELECT id FROM tasks WHERE status = ? AND queue IN ({marks}) ORDER BY created_at LIMIT 1",
+                (QUEUED, *queues),
+            ).fetchone()
+            if row is None:
+                return None
+            con.execute(
+                "UPDATE tasks SET status = ?, worker = ?, lease_until = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE id = ?",
+                (LEASED, worker_id, now + lease_s, now, row["id"]),
+            )
+            return self._row(con.execute("SELECT * FROM tasks WHERE id = ?", (row["id"],)).fetchone())
+
+    def heartbeat(self, task_id, worker_id, lease_s):
+        now = time.time()
+        with self._tx() as con:
+            cur = con.execute(
+                "UPDATE tasks SET lease_until = ?, updated_at = ? WHERE id = ? AND worker = ? AND status = ?",
+                (now + lease_s, now, task_id, worker_id, LEASED),
+            )
+            return cur.rowcount == 1
+
+    def complete(self, task_id, worker_id, result):
+        with self._tx() as con:
+            cur = con.execute(
+                "UPDATE tasks SET status = ?, result = ?, lease_until = NULL, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = ?",
+                (DONE, _dumps(result), time.time(), task_id, worker_id, LEASED),
+            )
+            return cur.rowcount == 1
+
+    def fail(self, task_id, worker_id, error, retry=True):
+        with self._tx() as con:
+            cur = con.execute(
+                "UPDATE tasks SET status = CASE WHEN ? AND attempts < max_attempts THEN ? ELSE ? END, "
+                "worker = NULL, lease_until = NULL, error = ?, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = ?",
+                (int(bool(retry)), QUEUED, DEAD, error, time.time(), task_id, worker_id, LEASED),
+            )
+            return cur.rowcount == 1
+
+    def get(self, task_id):
+        with self.connect() as con:
+            return self._row(con.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone())
+
+    def requeue_expired(self):
+        now = time.time()
+        with self._tx() as con:
+            cur = con.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts < max_attempts THEN ? ELSE ? END, "
+                "worker = NULL, lease_until = NULL, error = COALESCE(error, 'lease expired'), updated_at = ? "
+                "WHERE status = ? AND lease_until < ?",
+                (QUEUED, DEAD, now, LEASED, now),
+            )
+            return cur.rowcount
+
+    def purge(self, older_than_s: float = 7 * 86400) -> int:
+        # task selesai / dead yang sudah lama tidak perlu disimpan
+        with self._tx() as con:
+            cur = con.execute(
+                "DELETE FROM tasks WHERE status IN (?, ?) AND updated_at < ?",
+                (DONE, DEAD, time.time() - older_than_s),
+            )
+            return cur.rowcount
+
+
+# lease atomik di Redis: pop id dari antrian, tandai leased, daftarkan deadline
+_REDIS_LEASE = """
+for _, q in ipairs(KEYS) do
+  local id = redis.call('LPOP', q)
+  if id then
+    local key = ARGV[1] .. 'task:' .. id
+    redis.call('HSET', key, 'status', 'leased', 'worker', ARGV[2], 'lease_until', ARGV[3], 'updated_at', ARGV[4])
+    redis.call('HINCRBY', key, 'attempts', 1)
+    redis.call('ZADD', ARGV[1] .. 'leases', ARGV[3], id)
+    return id
+  end
+end
+return false
+"""
+
+# perubahan status hanya jika lease masih dipegang worker yang sama
+# (ARGV[8] terisi → hanya jika lease sudah kedaluwarsa sebelum waktu itu).
+# action 'retry' → requeue selama attempts < max_attempts, selain itu dead (dicek di dalam skrip)
+_REDIS_RELEASE = """
+local key = ARGV[1] .. 'task:' .. ARGV[2]
+if (redis.call('HGET', key, 'worker') or '') ~= ARGV[3] or redis.call('HGET', key, 'status') ~= 'leased' then
+  return 0
+end
+if ARGV[8] ~= '' and tonumber(redis.call('HGET', key, 'lease_until') or '0') >= tonumber(ARGV[8]) then
+  return 0
+end
+local action = ARGV[4]
+if action == 'retry' then
+  if tonumber(redis.call('HGET', key, 'attempts') or '0') < tonumber(redis.call('HGET', key, 'max_attempts') or '3') then
+    action = 'requeue'
+  else
+    action = 'dead'
+  end
+end
+redis.call('ZREM', ARGV[1] .. 'leases', ARGV[2])
+if action == 'requeue' then
+  redis.call('HSET', key, 'status', 'queued', 'worker', '', 'lease_until', '', 'error', ARGV[5], 'updated_at', ARGV[6])
+  redis.call('RPUSH', ARGV[1] .. 'q:' .. redis.call('HGET', key, 'queue'), ARGV[2])
+else
+  redis.call('HSET', key, 'status', action, 'lease_until', '', ARGV[7], ARGV[5], 'updated_at', ARGV[6])
+end
+return 1
+"""
+
+# perpanjang lease hanya jika masih dipegang worker yang sama (cek + set atomik)
+_REDIS_HEARTBEAT = """
+local key = ARGV[1] .. 'task:' .. ARGV[2]
+if (redis.call('HGET', key, 'worker') or '') ~= ARGV[3] or redis.call('HGET', key, 'status') ~= 'leased' then
+  return 0
+end
+redis.call('HSET', key, 'lease_until', ARGV[4], 'updated_at', ARGV[5])
+redis.call('ZADD', ARGV[1] .. 'leases', ARGV[4], ARGV[2])
+return 1
+"""
+
+
+class RedisBroker(Broker):
+    def __init__(self, url: str = "redis://localhost:6379/0", prefix: str = "assespro:", ttl_s: int = 7 * 86400):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("Broker redis membutuhkan paket redis (pip install redis)") from e
+        self.r = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+        self.ttl_s = int(ttl_s)
+        self._lease = self.r.register_script(_REDIS_LEASE)
+        self._release = self.r.register_script(_REDIS_RELEASE)
+        self._heartbeat = self.r.register_script(_REDIS_HEARTBEAT)
+
+    def _key(self, task_id):
+        return f"{self.prefix}task:{task_id}"
+
+    def enqueue(self, queue, payload, max_attempts=3):
+        task = _new_task(queue, payload, max_attempts)
+        pipe = self.r.pipeline()
+        pipe.hset(self._key(task["id"]), mapping={
+            "id": task["id"],
+            "queue": queue,
+            "payload": _dumps(payload),
+            "status": QUEUED,
+            "attempts": 0,
+            "max_attempts": task["max_attempts"],
+            "created_at": task["created_at"],
+            "updated_at": task["updated_at"],
+        })
+        pipe.expire(self._key(task["id"]), self.ttl_s)
+        pipe.rpush(f"{self.prefix}q:{queue}", task["id"])
+        pipe.execute()
+        return task["id"]
+
+    def lease(self, queues, worker_id, lease_s):
+        now = time.time()
+        task_id = self._lease(
+            keys=[f"{self.prefix}q:{q}" for q in queues],
+            args=[self.prefix, worker_id, now + lease_s, now],
+        )
+        return self.get(task_id) if task_id else None
+
+    def heartbeat(self, task_id, worker_id, lease_s):
+        now = time.time()
+        return bool(self._heartbeat(args=[self.prefix, task_id, worker_id, now + lease_s, now]))
+
+    def _finish(self, task_id, worker_id, action, value, field, expired_before=""):
+        return bool(self._release(args=[self.prefix, task_id, worker_id, action, value, time.time(), field, expired_before]))
+
+    def complete(self, task_id, worker_id, result):
+        return self._finish(task_id, worker_id, DONE, _dumps(result), "result")
+
+    def fail(self, task_id, worker_id, error, retry=True):
+        return self._finish(task_id, worker_id, "retry" if retry else DEAD, error, "error")
+
+    def get(self, task_id):
+        raw = self.r.hgetall(self._key(task_id))
+        if not raw:
+            return None
+        return {
+            "id": raw.get("id", task_id),
+            "queue": raw.get("queue"),
+            "payload": loads(raw.get("payload") or "null"),
+            "status": raw.get("status"),
+            "attempts": int(raw.get("attempts", 0)),
+            "max_attempts": int(raw.get("max_attempts", 3)),
+            "worker": raw.get("worker") or None,
+            "lease_until": float(raw["lease_until"]) if raw.get("lease_until") else None,
+            "result": loads(raw["result"]) if raw.get("result") else None,
+            "error": raw.get("error") or None,
+            "created_at": float(raw.get("created_at", 0)),
+            "updated_at": float(raw.get("updated_at", 0)),
+        }
+
+    def requeue_expired(self):
+        n = 0
+        now = time.time()
+        for task_id in self.r.zrangebyscore(f"{self.prefix}leases", "-inf", now):
+            task = self.get(task_id)
+            if task is None:
+                self.r.zrem(f"{self.prefix}leases", task_id)
+                continue
+            # _REDIS_RELEASE memastikan hanya satu pemanggil yang memindahkan task ini
+            if self._finish(task_id, task["worker"] or "", "retry",
+                            task["error"] or "lease expired", "error", expired_before=now):
+                n += 1
+        return n
+
+
+class ArtifactStore:
+    # content-addressed: <root>/<sha1[:2]>/<sha1><suffix>; root harus shared antar node
+    def __init__(self, root="data/shared_artifacts"):
+        self.root = Path(root)
+
+    def put(self, path) -> str:
+        path = Path(path)
+        key = file_sha1(path) + path.suffix
+        dest = sharded_path(self.root, key)
+        if not dest.exists():
+            with file_lock(dest):
+                if not dest.exists():
+                    tmp = dest.with_name(dest.name + ".part")
+                    shutil.copyfile(path, tmp)
+                    tmp.replace(dest)
+                    REGISTRY.inc("artifact_puts_total")
+        return key
+
+    def path(self, key: str) -> Path:
+        dest = sharded_path(self.root, key)
+        if not dest.exists():
+            raise FileNotFoundError(f"Artefak {key} tidak ada di {self.root} (apakah artifact_root di-mount bersama?)")
+        return dest
+
+
+_brokers: Dict[tuple, Broker] = {}
+_brokers_lock = threading.Lock()
+
+
+def get_broker(cfg: Optional[dict] = None) -> Broker:
+    dcfg = (cfg or {}).get("distributed", {}) or {}
+    kind = dcfg.get("broker", "sqlite")
+    if kind == "memory":
+        key = ("memory",)
+    elif kind == "sqlite":
+        key = ("sqlite", str(dcfg.get("sqlite_path", "data/queue.sqlite")))
+    elif kind == "redis":
+        key = ("redis", dcfg.get("redis_url", "redis://localhost:6379/0"), dcfg.get("redis_prefix", "assespro:"))
+    else:
+        raise ValueError(f"Broker tidak dikenal: {kind} (memory | sqlite | redis)")
+    with _brokers_lock:
+        if key not in _brokers:
+            if kind == "memory":
+                _brokers[key] = InMemoryBroker()
+            elif kind == "sqlite":
+                _brokers[key] = SQLiteBroker(key[1])
+            else:
+                _brokers[key] = RedisBroker(key[1], prefix=key[2])
+        return _brokers[key]
+
+
+def get_artifact_store(cfg: Optional[dict] = None) -> ArtifactStore:
+    dcfg = (cfg or {}).get("distributed", {}) or {}
+    paths = (cfg or {}).get("paths", {}) or {}
+    return ArtifactStore(dcfg.get("artifact_root") or paths.get("shared_artifacts", "data/shared_artifacts"))
+
+
+def distributed_enabled(cfg: Optional[dict] = None) -> bool:
+    return bool(((cfg or {}).get("distributed", {}) or {}).get("enabled", False))
+
+
+def run_remote(cfg: dict, queue: str, payload: Dict[str, Any]) -> Any:
+    # enqueue lalu tunggu hasil; dipakai runner sebagai pengganti pemanggilan lokal
+    dcfg = (cfg or {}).get("distributed", {}) or {}
+    broker = get_broker(cfg)
+    task_id = broker.enqueue(queue, payload, max_attempts=int(dcfg.get("max_attempts", 3)))
+    REGISTRY.inc("tasks_enqueued_total", queue=queue)
+    with REGISTRY.span("remote_task", queue=queue):
+        return broker.wait(
+            task_id,
+            timeout=float(dcfg.get("task_timeout_seconds", 1800)),
+            poll=float(dcfg.get("poll_seconds", 0.5)),
+        )
+
+
+def queue_stats(broker: Broker) -> List[Dict[str, Any]]:
+    # hanya SQLite: ringkasan jumlah task per (queue, status)
+    if not isinstance(broker, SQLiteBroker):
+        return []
+    with broker.connect() as con:
+        return [dict(r) for r in con.execute(
+            "SELECT queue, status, COUNT(*) AS n FROM tasks GROUP BY queue, status ORDER BY queue, status"
+        )]
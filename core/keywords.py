@@ -0,0 +1,272 @@
+# core/keywords.py
+# Keyword coverage (must/nice) per qid dari question bank.
+#
+# Setiap daftar keyword dikompilasi sekali menjadi index multi-pola:
+#   - exact: tuple token ter-stem → keyword (juga bentuk tanpa spasi, sehingga
+#     "MobileNet" cocok dengan ASR "mobile net")
+#   - fuzzy: index deletion-neighbourhood (gaya SymSpell) untuk salah-ketik ASR
+#     dengan edit distance ≤ max_edits
+# Transkrip di-tokenize dan di-stem sekali, lalu semua n-gram dicek dalam satu pass.
+import hashlib
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Iterator
+
+from core.metrics import REGISTRY
+
+_TOKEN = re.compile(r"[0-9a-zA-ZÀ-ɏ]+")
+
+_stem_cache: Dict[str, Dict[str, str]] = {"en": {}, "id": {}}
+_sastrawi = None
+_sastrawi_lock = threading.Lock()
+
+
+_EN_SUFFIXES = (
+    ("ies", "y"), ("sses", "ss"), ("ches", "ch"), ("shes", "sh"), ("xes", "x"), ("zes", "z"),
+    ("ing", ""), ("ed", ""), ("s", ""),
+)
+
+
+def _strip_en(tok: str) -> str:
+    for suffix, repl in _EN_SUFFIXES:
+        if tok.endswith(suffix) and not tok.endswith("ss") and len(tok) - len(suffix) >= 3:
+            return tok[: -len(suffix)] + repl
+    return tok
+
+
+def _stem_en(tok: str) -> str:
+    # stemmer ringan: cukup konsisten untuk kedua sisi (keyword & transkrip).
+    # Suffix dikupas sampai stabil ("learnings" → "learning" → "learn") sehingga
+    # stem(stem(x)) == stem(x); "-e" akhir dibuang agar "case"/"cases", "manage"/"managing" sama.
+    if len(tok) <= 3:
+        return tok
+    while True:
+        out = _strip_en(tok)
+        if out == tok:
+            break
+        tok = out
+    if tok.endswith("e") and len(tok) >= 4:
+        tok = tok[:-1]
+    return tok
+
+
+def _stem_id(tok: str) -> str:
+    global _sastrawi
+    if _sastrawi is None:
+        with _sastrawi_lock:
+            if _sastrawi is None:
+                try:
+                    from Sastrawi.Stemmer.StemmerFactory import StemmerFactory
+
+                    _sastrawi = StemmerFactory().create_stemmer()
+                except ImportError:
+                    _sastrawi = False
+    return _sastrawi.stem(tok) if _sastrawi else tok
+
+
+def stem(tok: str, lang: str = "en") -> str:
+    cache = _stem_cache.setdefault(lang, {})
+    out = cache.get(tok)
+    if out is None:
+        out = _stem_id(tok) if lang == "id" else _stem_en(tok)
+        cache[tok] = out
+    return out
+
+
+def tokenize(text: str, lang: str = "en") -> List[str]:
+    return [stem(t, lang) for t in _TOKEN.findall((text or "").lower())]
+
+
+def _deletes(word: str, max_edits: int) -> set:
+    out = {word}
+    frontier = {word}
+    for _ in range(max_edits):
+        nxt = set()
+        for w in frontier:
+            for i in range(len(w)):
+                nxt.add(w[:i] + w[i + 1:])
+        out |= nxt
+        frontier = nxt
+    return out
+
+
+def _within_edits(a: str, b: str, max_edits: int) -> bool:
+    if abs(len(a) - len(b)) > max_edits:
+        return False
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        cur = [i] + [0] * len(b)
+        row_min = cur[0]
+        for j, cb in enumerate(b, start=1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+            row_min = min(row_min, cur[j])
+        if row_min > max_edits:
+            return False
+        prev = cur
+    return prev[-1] <= max_edits
+
+
+class KeywordMatcher:
+    def __init__(
+        self,
+        must: List[str],
+        nice: List[str],
+        lang: str = "en",
+        fuzzy: bool = True,
+        max_edits: int = 1,
+        min_fuzzy_len: int = 5,
+    ):
+        self.lang = lang
+        self.fuzzy = fuzzy
+        self.max_edits = max_edits
+        self.min_fuzzy_len = min_fuzzy_len
+        self.keywords = [("must", k) for k in (must or []) if str(k).strip()] + [
+            ("nice", k) for k in (nice or []) if str(k).strip()
+        ]
+        self.totals = {"must": sum(1 for g, _ in self.keywords if g == "must"),
+                       "nice": sum(1 for g, _ in self.keywords if g == "nice")}
+
+        self._exact: Dict[tuple, List[int]] = {}
+        self._compact: Dict[str, List[int]] = {}
+        self._fuzzy: Dict[str, set] = {}
+        self._forms: List[str] = []
+        self.max_n = 1
+        for kid, (_group, kw) in enumerate(self.keywords):
+            toks = tuple(tokenize(str(kw), lang))
+            if not toks:
+                self._forms.append("")
+                continue
+            self.max_n = max(self.max_n, len(toks))
+            self._exact.setdefault(toks, []).append(kid)
+            compact = "".join(toks)
+            self._compact.setdefault(compact, []).append(kid)
+            # bentuk mentah (tanpa stem) juga di-index: stem per token bisa berbeda dari
+            # stem gabungannya ("mobile net" → "mobil"+"net" vs "mobilenet")
+            raw = "".join(_TOKEN.findall(str(kw).lower()))
+            if raw != compact:
+                self._compact.setdefault(raw, []).append(kid)
+            self._forms.append(compact)
+            if fuzzy and len(compact) >= min_fuzzy_len:
+                for d in _deletes(compact, max_edits):
+                    self._fuzzy.setdefault(d, set()).add(kid)
+
+    def match(self, text: str) -> Dict[str, Any]:
+        raw_tokens = _TOKEN.findall((text or "").lower())
+        tokens = [stem(t, self.lang) for t in raw_tokens]
+        found: Dict[int, str] = {}  # kid → "exact" | "fuzzy"
+
+        # n-gram hingga max_n + 1 agar keyword satu kata bisa cocok dengan ASR yang memecahnya
+        for n in range(1, self.max_n + 2):
+            for i in range(0, len(tokens) - n + 1):
+                gram = tuple(tokens[i:i + n])
+                for kid in self._exact.get(gram, ()):
+                    found[kid] = "exact"
+                compact = "".join(gram)
+                for kid in self._compact.get(compact, ()):
+                    found.setdefault(kid, "exact")
+                for kid in self._compact.get("".join(raw_tokens[i:i + n]), ()):
+                    found.setdefault(kid, "exact")
+                if not self.fuzzy or len(compact) < self.min_fuzzy_len or len(found) == len(self.keywords):
+                    continue
+                for d in _deletes(compact, self.max_edits):
+                    for kid in self._fuzzy.get(d, ()):
+                        if kid not in found and _within_edits(compact, self._forms[kid], self.max_edits):
+                            found[kid] = "fuzzy"
+
+        hits = {"must": [], "nice": []}
+        fuzzy_hits = []
+        for kid, how in sorted(found.items()):
+            group, kw = self.keywords[kid]
+            hits[group].append(kw)
+            if how == "fuzzy":
+                fuzzy_hits.append(kw)
+
+        return {
+            "keyword_must_coverage": round(len(hits["must"]) / self.totals["must"], 4) if self.totals["must"] else None,
+            "keyword_nice_coverage": round(len(hits["nice"]) / self.totals["nice"], 4) if self.totals["nice"] else None,
+            "hits": hits,
+            "fuzzy_hits": fuzzy_hits,
+        }
+
+
+_matchers: Dict[tuple, KeywordMatcher] = {}
+_matchers_lock = threading.Lock()
+
+
+def _keyword_lists(qspec: dict, lang: str):
+    answers = qspec.get("answers", {}) or {}
+    spec = answers.get(lang) or next(iter(answers.values()), {}) if answers else {}
+    kw = (spec or {}).get("keywords", {}) or {}
+    return list(kw.get("must", []) or []), list(kw.get("nice", []) or [])
+
+
+def get_matcher(qspec: dict, lang: Optional[str] = None, cfg: Optional[dict] = None) -> KeywordMatcher:
+    kcfg = (cfg or {}).get("keywords", {}) or {}
+    lang = lang or (qspec.get("languages_supported") or ["en"])[0]
+    must, nice = _keyword_lists(qspec, lang)
+    digest = hashlib.sha1(json.dumps([must, nice, kcfg], sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    key = (qspec.get("qid"), lang, digest)
+    with _matchers_lock:
+        m = _matchers.get(key)
+    if m is not None:
+        REGISTRY.inc("cache_hits_total", cache="keyword_matcher")
+        return m
+    REGISTRY.inc("cache_misses_total", cache="keyword_matcher")
+    m = KeywordMatcher(
+        must,
+        nice,
+        lang=lang,
+        fuzzy=kcfg.get("fuzzy", True),
+        max_edits=int(kcfg.get("max_edits", 1)),
+        min_fuzzy_len=int(kcfg.get("min_fuzzy_len", 5)),
+    )
+    with _matchers_lock:
+        _matchers[key] = m
+    return m
+
+
+def keyword_coverage(text: str, qspec: dict, lang: Optional[str] = None, cfg: Optional[dict] = None) -> Dict[str, Any]:
+    return get_matcher(qspec, lang, cfg).match(text)
+
+
+def iter_stored_coverage(answers_folder, qbank: List[dict], cfg: Optional[dict] = None) -> Iterator[Dict[str, Any]]:
+    # bulk: semua jawaban tersimpan di data/candidate_answers, satu baris per (candidate, qid)
+    from core.question_bank import QBankIndex
+
+    index = QBankIndex(qbank)
+    for path in sorted(Path(answers_folder).glob("*.json")):
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except Exception:
+            continue
+        cid = data.get("candidateId", path.stem)
+        for item in data.get("results", []) or []:
+            qspec = index.get(item.get("qid"))
+            if qspec is None or item.get("error"):
+                continue
+            cov = keyword_coverage(item.get("transcript", ""), qspec, item.get("language_selected"), cfg)
+            yield {"candidate_id": cid, "qid": item.get("qid"), **cov}
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from core.config import load_config
+    from core.question_bank import load_qbank
+
+    ap = argparse.ArgumentParser(description="Bulk keyword coverage untuk semua jawaban tersimpan")
+    ap.add_argument("--answers", default="data/candidate_answers")
+    ap.add_argument("--qbank", default="data/question_bank.yaml")
+    ap.add_argument("--config", default="config.yaml")
+    args = ap.parse_args()
+
+    cfg = load_config(args.config)
+    t0 = time.perf_counter()
+    n = 0
+    for row in iter_stored_coverage(args.answers, load_qbank(args.qbank) or [], cfg):
+        print(json.dumps(row, ensure_ascii=False))
+        n += 1
+    print(f"# {n} jawaban dalam {time.perf_counter() - t0:.3f}s", flush=True)
@@ -1,9 +1,104 @@
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Optional, List
+
+from core.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+_langdetect_ready = False
+_lang_cache = {}
+_lang_cache_lock = threading.Lock()
+
+
 def detect_language(text: str):
+    # fallback berbasis teks (langdetect); seed cukup di-set sekali per proses
+    global _langdetect_ready
     from langdetect import detect, DetectorFactory
-    DetectorFactory.seed = 42
+
+    if not _langdetect_ready:
+        DetectorFactory.seed = 42
+        _langdetect_ready = True
     try:
         lang = detect(text) if len(text) >= 20 else "id"
         conf = 0.6
-    except:
+    except Exception:
         lang, conf = "unknown", 0.0
     return {"lang": lang, "confidence": conf}
+
+
+def _cache_path(cfg: dict, audio_hash: str) -> Path:
+    root = Path(((cfg or {}).get("paths", {}) or {}).get("cache", "data/cache"))
+    return root / "language" / f"{audio_hash}.json"
+
+
+def _pick(probs: dict, candidates: List[str], default: str, min_confidence: float):
+    if candidates:
+        sub = {l: probs.get(l, 0.0) for l in candidates}
+        total = sum(sub.values())
+        # renormalisasi di antara bahasa yang didukung pertanyaan
+        sub = {l: (p / total if total > 0 else 0.0) for l, p in sub.items()}
+    else:
+        sub = probs
+    if not sub:
+        return default, 0.0
+    lang = max(sub, key=sub.get)
+    conf = float(sub[lang])
+    if conf < min_confidence:
+        return default, conf
+    return lang, conf
+
+
+def route_language(model, wav_path, cfg: dict, candidates: Optional[List[str]] = None) -> dict:
+    w = (cfg or {}).get("whisper", {}) or {}
+    ld = w.get("language_detection", {}) or {}
+    default = (candidates or [None])[0] or w.get("language", "en")
+
+    # satu bahasa saja yang mungkin / deteksi dimatikan → tanpa biaya deteksi
+    if not ld.get("enabled", False) or (candidates and len(candidates) == 1):
+        return {"lang": candidates[0] if candidates else w.get("language", "en"), "confidence": None, "source": "config"}
+
+    from core.utils import file_sha1
+
+    audio_hash = file_sha1(wav_path)
+    with _lang_cache_lock:
+        probs = _lang_cache.get(audio_hash)
+    source = "cache"
+
+    cache_file = _cache_path(cfg, audio_hash)
+    if probs is None and cache_file.exists():
+        try:
+            probs = json.loads(cache_file.read_text(encoding="utf-8"))["probs"]
+        except Exception:
+            probs = None
+
+    if probs is None:
+        from core.stt import _load_audio_16k, detect_language_probs
+
+        source = "whisper"
+        REGISTRY.inc("cache_misses_total", cache="language")
+        with REGISTRY.span("language_id"):
+            audio = _load_audio_16k(wav_path)
+            probs = detect_language_probs(model, audio, window_sec=float(ld.get("window_sec", 30)))
+        # simpan hanya bahasa dengan probabilitas berarti
+        probs = {l: round(p, 5) for l, p in probs.items() if p >= 1e-4}
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        cache_file.write_text(json.dumps({"audio_hash": audio_hash, "probs": probs}), encoding="utf-8")
+    else:
+        REGISTRY.inc("cache_hits_total", cache="language")
+
+    with _lang_cache_lock:
+        _lang_cache[audio_hash] = probs
+
+    lang, conf = _pick(probs, candidates or ld.get("candidates") or [], default, float(ld.get("min_confidence", 0.5)))
+    REGISTRY.inc("language_routed_total", lang=lang)
+    logger.info("Bahasa terdeteksi: %s (%.2f, %s)", lang, conf, source)
+    return {
+        "lang": lang,
+        "confidence": round(conf, 4),
+        "source": source,
+        "audio_hash": audio_hash,
+        "top": sorted(probs.items(), key=lambda kv: kv[1], reverse=True)[:3],
+    }
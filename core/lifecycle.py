@@ -0,0 +1,232 @@
+# core/lifecycle.py
+# Siklus hidup artefak di disk: retensi per jenis artefak, kompaksi audio WAV
+# (FLAC/Opus atau dihapus setelah fitur dihitung) dan kuota disk dengan eviksi LRU
+# untuk artefak yang bisa dibuat ulang (download, audio, cache).
+#
+#   python -m core.lifecycle              # dry-run: laporan tanpa mengubah apa pun
+#   python -m core.lifecycle --apply
+#
+# Dijalankan juga sebagai thread background (lifecycle.schedule_minutes) dari app.py.
+import logging
+import shutil
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from core.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+COMPACT_CODECS = {
+    "flac": ("flac", ["-c:a", "flac", "-compression_level", "8"]),
+    "opus": ("opus", ["-c:a", "libopus", "-b:a", "24k", "-application", "voip"]),
+}
+
+# file yang sedang ditulis / sementara tidak pernah disentuh
+_SKIP_SUFFIXES = (".tmp", ".part", ".lock")
+
+
+def _action(action: str, artifact: str, path, size: int, reason: str) -> Dict[str, Any]:
+    # action: delete | compact
+    return {"action": action, "artifact": artifact, "path": str(path), "bytes": int(size), "reason": reason}
+
+
+def _artifact_specs(cfg: dict) -> Dict[str, Dict[str, Any]]:
+    lc = (cfg or {}).get("lifecycle", {}) or {}
+    paths = (cfg or {}).get("paths", {}) or {}
+    specs = {}
+    for name, spec in (lc.get("artifacts", {}) or {}).items():
+        spec = dict(spec or {})
+        root = spec.get("path") or paths.get(spec.get("path_key", name))
+        if not root:
+            continue
+        spec["root"] = Path(root)
+        specs[name] = spec
+    return specs
+
+
+def _files(root: Path, exclude=()):
+    # exclude: subdirektori (relatif ke root) yang bukan bagian artefak ini, mis. index
+    # jawaban di dalam data/cache yang tidak bisa dibuat ulang dengan murah
+    if not root.exists():
+        return
+    excluded = [root / e for e in exclude or ()]
+    for p in root.rglob("*"):
+        if p.is_file() and not p.name.endswith(_SKIP_SUFFIXES) and not any(d in p.parents for d in excluded):
+            yield p
+
+
+def _last_used(st) -> float:
+    # atime sering dimatikan (noatime) → pakai yang paling baru dari atime/mtime
+    return max(st.st_atime, st.st_mtime)
+
+
+def plan(cfg: dict, now: Optional[float] = None) -> List[Dict[str, Any]]:
+    now = now or time.time()
+    lc = (cfg or {}).get("lifecycle", {}) or {}
+    actions: List[Dict[str, Any]] = []
+    planned = set()
+    lru = []  # (last_used, size, artifact, path) untuk artefak yang boleh di-evict
+    total = 0
+
+    for name, spec in _artifact_specs(cfg).items():
+        retention_days = spec.get("retention_days")
+        compact = spec.get("compact")
+        compact_after = float(spec.get("compact_after_hours", 1)) * 3600
+        for p in _files(spec["root"], spec.get("exclude")):
+            st = p.stat()
+            age = now - st.st_mtime
+            total += st.st_size
+
+            if retention_days is not None and age > float(retention_days) * 86400:
+                actions.append(_action("delete", name, p, st.st_size, f"older than {retention_days} days"))
+                planned.add(p)
+                continue
+
+            if compact and p.suffix.lower() == ".wav" and age > compact_after:
+                if compact == "drop":
+                    actions.append(_action("delete", name, p, st.st_size, "audio dropped after feature extraction"))
+                else:
+                    actions.append(_action("compact", name, p, st.st_size, f"transcode WAV → {compact}"))
+                planned.add(p)
+                continue
+
+            if spec.get("evictable", False):
+                lru.append((_last_used(st), st.st_size, name, p))
+
+    quota_gb = lc.get("quota_gb")
+    if quota_gb:
+        quota = float(quota_gb) * (1024 ** 3)
+        # perkiraan setelah aksi di atas (kompaksi dianggap menghemat ~50%)
+        projected = total - sum(a["bytes"] if a["action"] == "delete" else a["bytes"] // 2 for a in actions)
+        for last_used, size, name, p in sorted(lru):
+            if projected <= quota:
+                break
+            if p in planned:
+                continue
+            actions.append(_action("delete", name, p, size, f"quota {quota_gb} GB exceeded (LRU)"))
+            projected -= size
+    return actions
+
+
+def _compact(path: Path, codec: str) -> Path:
+    ext, args = COMPACT_CODECS[codec]
+    out = path.with_suffix(f".{ext}")
+    tmp = out.with_name(out.name + ".part")
+    cmd = ["ffmpeg", "-y", "-loglevel", "error", "-i", str(path), *args, "-f", ext, str(tmp)]
+    subprocess.run(cmd, check=True)
+    tmp.replace(out)
+    path.unlink()
+    return out
+
+
+def apply(cfg: dict, actions: List[Dict[str, Any]]) -> Dict[str, Any]:
+    specs = _artifact_specs(cfg)
+    freed = 0
+    done = failed = 0
+    with REGISTRY.span("lifecycle"):
+        for a in actions:
+            p = Path(a["path"])
+            try:
+                if not p.exists():
+                    continue
+                if a["action"] == "compact":
+                    if shutil.which("ffmpeg") is None:
+                        raise RuntimeError("ffmpeg tidak ditemukan")
+                    out = _compact(p, specs[a["artifact"]]["compact"])
+                    freed += a["bytes"] - out.stat().st_size
+                else:
+                    p.unlink()
+                    freed += a["bytes"]
+                done += 1
+                REGISTRY.inc("lifecycle_actions_total", action=a["action"], artifact=a["artifact"])
+            except Exception as e:
+                failed += 1
+                logger.warning("Lifecycle %s gagal untuk %s: %s", a["action"], p, e)
+        for spec in specs.values():
+            _prune_empty_dirs(spec["root"])
+    REGISTRY.inc("lifecycle_bytes_freed_total", max(0, freed))
+    return {"actions": done, "failed": failed, "bytes_freed": freed}
+
+
+def _prune_empty_dirs(root: Path):
+    if not root.exists():
+        return
+    for d in sorted((p for p in root.rglob("*") if p.is_dir()), key=lambda p: len(p.parts), reverse=True):
+        try:
+            d.rmdir()
+        except OSError:
+            pass
+
+
+def report(actions: List[Dict[str, Any]]) -> Dict[str, Any]:
+    by_key: Dict[str, Dict[str, int]] = {}
+    for a in actions:
+        k = f"{a['artifact']}:{a['action']}"
+        entry = by_key.setdefault(k, {"files": 0, "bytes": 0})
+        entry["files"] += 1
+        entry["bytes"] += a["bytes"]
+    return {"summary": by_key, "total_bytes": sum(a["bytes"] for a in actions), "actions": actions}
+
+
+def run_once(cfg: dict, dry_run: Optional[bool] = None) -> Dict[str, Any]:
+    lc = (cfg or {}).get("lifecycle", {}) or {}
+    dry_run = lc.get("dry_run", True) if dry_run is None else dry_run
+    actions = plan(cfg)
+    out = report(actions)
+    out["dry_run"] = dry_run
+    if not dry_run and actions:
+        out["result"] = apply(cfg, actions)
+    logger.info(
+        "Lifecycle%s: %d aksi, %.1f MB", " (dry-run)" if dry_run else "", len(actions), out["total_bytes"] / 1e6
+    )
+    return out
+
+
+_thread = None
+_thread_lock = threading.Lock()
+
+
+def _loop(cfg: dict, interval_s: float):
+    while True:
+        try:
+            run_once(cfg)
+        except Exception as e:
+            logger.warning("Lifecycle gagal: %s", e)
+        time.sleep(interval_s)
+
+
+def start_lifecycle_scheduler(cfg: dict) -> Optional[threading.Thread]:
+    # idempotent: satu thread per proses server
+    global _thread
+    lc = (cfg or {}).get("lifecycle", {}) or {}
+    minutes = lc.get("schedule_minutes")
+    if not lc.get("enabled", False) or not minutes:
+        return None
+    with _thread_lock:
+        if _thread is None:
+            _thread = threading.Thread(
+                target=_loop, args=(cfg, float(minutes) * 60), name="assespro-lifecycle", daemon=True
+            )
+            _thread.start()
+    return _thread
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    from core.config import load_config
+
+    ap = argparse.ArgumentParser(description="Retensi, kompaksi audio dan kuota disk")
+    ap.add_argument("--config", default="config.yaml")
+    ap.add_argument("--apply", action="store_true", help="jalankan aksi (default: dry-run)")
+    ap.add_argument("--verbose", action="store_true", help="tampilkan setiap file")
+    args = ap.parse_args()
+
+    out = run_once(load_config(args.config), dry_run=not args.apply)
+    if not args.verbose:
+        out.pop("actions")
+    print(json.dumps(out, ensure_ascii=False, indent=2))
@@ -1,20 +1,43 @@
 import os
 import json
+import random
+import threading
+import time
 from typing import Dict, Any, Optional
 
 import requests
 from dotenv import load_dotenv
 
+from core.metrics import REGISTRY
+
 load_dotenv()
 
 GROQ_DEFAULT_URL = "https://api.groq.com/openai/v1/chat/completions"
 GROQ_ENV_VAR = "GROQ_API_TOKEN"
 
+# rate limit / gangguan sementara di sisi provider → coba lagi dengan backoff
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
 
 class LLMEvaluatorError(Exception):
     pass
 
 
+_local = threading.local()
+
+
+def _get_session() -> requests.Session:
+    # satu Session (keep-alive / connection pool) per thread
+    session = getattr(_local, "session", None)
+    if session is None:
+        REGISTRY.inc("cache_misses_total", cache="http_session")
+        session = requests.Session()
+        _local.session = session
+    else:
+        REGISTRY.inc("cache_hits_total", cache="http_session")
+    return session
+
+
 def _get_api_key_from_env(env_var: str = GROQ_ENV_VAR) -> str:
     load_dotenv()
     key = os.getenv(env_var)
@@ -113,6 +136,16 @@ Respond ONLY in strict JSON format with two keys:
 
 
 
+def _retry_delay(attempt: int, base_s: float, max_s: float, retry_after: Optional[str] = None) -> float:
+    # Retry-After dari server dihormati; selain itu exponential backoff dengan jitter
+    if retry_after:
+        try:
+            return min(max_s, max(0.0, float(retry_after)))
+        except ValueError:
+            pass
+    return min(max_s, base_s * (2 ** attempt)) * random.uniform(0.5, 1.0)
+
+
 def _call_groq_chat(
     prompt: str,
     model: str = "llama-3.1-8b-instant",
@@ -120,6 +153,9 @@ def _call_groq_chat(
     api_url: str = GROQ_DEFAULT_URL,
     max_tokens: int = 400,
     temperature: float = 0.0,
+    max_retries: int = 3,
+    backoff_base_s: float = 1.0,
+    backoff_max_s: float = 30.0,
 ) -> Dict[str, Any]:
     if api_key is None:
         api_key = _get_api_key_from_env()
@@ -139,11 +175,25 @@ def _call_groq_chat(
         "temperature": temperature,
     }
 
-    resp = requests.post(api_url, headers=headers, json=payload, timeout=60)
-    if resp.status_code != 200:
-        raise LLMEvaluatorError(
-            f"Groq API error {resp.status_code}: {resp.text[:300]}"
-        )
+    for attempt in range(max_retries + 1):
+        try:
+            resp = _get_session().post(api_url, headers=headers, json=payload, timeout=60)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt >= max_retries:
+                raise LLMEvaluatorError(f"Groq API tidak terjangkau setelah {attempt + 1} percobaan: {e}") from e
+            reason = type(e).__name__
+            delay = _retry_delay(attempt, backoff_base_s, backoff_max_s)
+        else:
+            if resp.status_code == 200:
+                break
+            if resp.status_code not in RETRY_STATUS or attempt >= max_retries:
+                raise LLMEvaluatorError(
+                    f"Groq API error {resp.status_code}: {resp.text[:300]}"
+                )
+            reason = str(resp.status_code)
+            delay = _retry_delay(attempt, backoff_base_s, backoff_max_s, resp.headers.get("Retry-After"))
+        REGISTRY.inc("retries_total", stage="llm", reason=reason)
+        time.sleep(delay)
 
     try:
         data = resp.json()
@@ -153,6 +203,18 @@ def _call_groq_chat(
     return data
 
 
+def _call_fake_chat(prompt: str, model: str = "fake") -> Dict[str, Any]:
+    # backend offline untuk benchmark/dev: skor deterministik dari panjang jawaban
+    answer = prompt.split("Candidate's Answer:", 1)[-1].split("Guidelines:", 1)[0]
+    n_words = len(answer.split())
+    score = min(4, n_words // 25)
+    content = json.dumps({
+        "score": score,
+        "reason": f"Fake evaluator: {n_words} words in answer.",
+    })
+    return {"model": model, "choices": [{"message": {"content": content}}]}
+
+
 def _extract_score_from_llm_response(raw: Dict[str, Any]) -> Dict[str, Any]:
     try:
         content = raw["choices"][0]["message"]["content"]
@@ -186,8 +248,9 @@ def evaluate_answer_llm(
     transcript_text: str,
     qspec: dict,
     cfg: Optional[dict] = None,
+    lang: Optional[str] = None,
 ) -> Dict[str, Any]:
-    lang = qspec.get("languages_supported", ["en"])[0]
+    lang = lang or qspec.get("languages_supported", ["en"])[0]
 
     # teks pertanyaan
     question_text = qspec.get("question_text", {}).get(lang) or next(
@@ -225,16 +288,28 @@ def evaluate_answer_llm(
     api_key_env = llm_cfg.get("api_key_env", GROQ_ENV_VAR)
     backend = llm_cfg.get("backend", "groq")
 
-    api_key = _get_api_key_from_env(api_key_env)
-
-    raw_response = _call_groq_chat(
-        prompt=prompt,
-        model=model,
-        api_key=api_key,
-        api_url=api_url,
-        max_tokens=llm_cfg.get("max_tokens", 400),
-        temperature=float(llm_cfg.get("temperature", 0.0)),
-    )
+    with REGISTRY.span("llm", backend=backend):
+        if backend == "fake":
+            raw_response = _call_fake_chat(prompt, model=model)
+        else:
+            api_key = _get_api_key_from_env(api_key_env)
+
+            raw_response = _call_groq_chat(
+                prompt=prompt,
+                model=model,
+                api_key=api_key,
+                api_url=api_url,
+                max_tokens=llm_cfg.get("max_tokens", 400),
+                temperature=float(llm_cfg.get("temperature", 0.0)),
+                max_retries=int(llm_cfg.get("max_retries", 3)),
+                backoff_base_s=float(llm_cfg.get("backoff_base_s", 1.0)),
+                backoff_max_s=float(llm_cfg.get("backoff_max_s", 30.0)),
+            )
+
+    usage = raw_response.get("usage") or {}
+    for kind in ("prompt_tokens", "completion_tokens"):
+        if usage.get(kind):
+            REGISTRY.inc("llm_tokens_total", usage[kind], kind=kind)
 
     parsed = _extract_score_from_llm_response(raw_response)
 
@@ -0,0 +1,93 @@
+# core/locks.py
+# Lock file antar-proses (fcntl.flock) dan penulisan atomik, untuk file agregat
+# yang diubah oleh banyak sesi Streamlit / worker sekaligus (read-modify-write).
+#
+#   with file_lock(path):            # <path>.lock, eksklusif, blocking dengan timeout
+#       data = read(path); ...; atomic_write_bytes(path, data)
+#
+# Tanpa fcntl (Windows) jatuh ke lock per proses saja.
+import logging
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+from core.metrics import REGISTRY
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+_local_locks = {}
+_local_guard = threading.Lock()
+
+
+class LockTimeout(TimeoutError):
+    pass
+
+
+def _local_lock(key: str) -> threading.Lock:
+    with _local_guard:
+        return _local_locks.setdefault(key, threading.Lock())
+
+
+@contextmanager
+def file_lock(path, timeout: float = 30.0, poll: float = 0.05):
+    path = Path(path)
+    lock_path = path.with_name(path.name + ".lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+
+    t0 = time.perf_counter()
+    if fcntl is None:
+        lock = _local_lock(str(lock_path.resolve()))
+        if not lock.acquire(timeout=timeout):
+            raise LockTimeout(f"Lock {lock_path} tidak didapat dalam {timeout}s")
+        try:
+            REGISTRY.observe("lock_wait_seconds", time.perf_counter() - t0)
+            yield
+        finally:
+            lock.release()
+        return
+
+    # flock per open file description: thread lain di proses yang sama juga ikut menunggu
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        while True:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.perf_counter() - t0 > timeout:
+                    REGISTRY.inc("lock_timeouts_total")
+                    raise LockTimeout(f"Lock {lock_path} tidak didapat dalam {timeout}s")
+                time.sleep(poll)
+        waited = time.perf_counter() - t0
+        REGISTRY.observe("lock_wait_seconds", waited)
+        if waited > 1.0:
+            logger.info("Menunggu lock %s selama %.1fs", lock_path.name, waited)
+        try:
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
+
+
+def atomic_write_bytes(path, data: bytes):
+    # nama tmp unik per penulis: dua proses yang menulis file sama tidak saling menimpa tmp
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
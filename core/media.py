@@ -1,15 +1,28 @@
 from pathlib import Path
+import logging
 import subprocess
-from moviepy import VideoFileClip  
 
-def extract_wav16k(video_path: Path, cfg) -> Path:
-    # gunakan folder baru
-    outdir = Path(cfg["paths"]["audio"])
-    outdir.mkdir(parents=True, exist_ok=True)
+from core.metrics import REGISTRY
+from core.workspace import new_workspace
 
-    out = outdir / (video_path.stem + ".16k.wav")
+logger = logging.getLogger(__name__)
 
+def extract_wav16k(video_path: Path, cfg, workspace=None) -> Path:
+    # WAV ditulis ke folder job (core.workspace); tanpa workspace → workspace sekali pakai
+    workspace = workspace or new_workspace(cfg)
+    video_path = Path(video_path)
+    out = workspace.path("audio", video_path.stem + ".16k.wav")
+
+    with REGISTRY.span("extract"):
+        _extract(video_path, out)
+
+    return out
+
+
+def _extract(video_path: Path, out: Path):
     try:
+        from moviepy import VideoFileClip
+
         clip = VideoFileClip(video_path.as_posix())
         clip.audio.write_audiofile(
             out.as_posix(),
@@ -19,11 +32,12 @@ def extract_wav16k(video_path: Path, cfg) -> Path:
             ffmpeg_params=["-ac", "1"]
         )
         clip.close()
-        print(f"[INFO] Audio extracted with MoviePy → {out.name}")
+        logger.info("Audio extracted with MoviePy → %s", out.name)
 
     except Exception as e:
-        print(f"[WARN] MoviePy failed for {video_path.name}: {e}")
-        print("[INFO] Falling back to ffmpeg...")
+        logger.warning("MoviePy failed for %s: %s", video_path.name, e)
+        logger.info("Falling back to ffmpeg...")
+        REGISTRY.inc("extract_fallbacks_total", backend="ffmpeg")
 
         cmd = [
             "ffmpeg", "-y",
@@ -35,6 +49,4 @@ def extract_wav16k(video_path: Path, cfg) -> Path:
             out.as_posix()
         ]
         subprocess.run(cmd, check=True)
-        print(f"[INFO] Audio extracted with ffmpeg → {out.name}")
-
-    return out
+        logger.info("Audio extracted with ffmpeg → %s", out.name)
@@ -0,0 +1,242 @@
+# core/metrics.py
+# Registry metrik in-process: span per stage pipeline, counter, dan histogram,
+# dengan exporter Prometheus-text / JSON. Aman dipakai dari banyak thread
+# (sesi Streamlit berjalan di thread terpisah dalam satu proses).
+import json
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, Any, Optional, Tuple
+
+# nama stage standar pipeline
+STAGES = ("download", "extract", "asr", "acoustic_features", "llm", "storage")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+AUDIO_SECONDS_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600, 1200, 3600)
+
+_current_span: ContextVar[Optional[dict]] = ContextVar("assespro_current_span", default=None)
+
+
+def _label_key(labels: Dict[str, Any]) -> Tuple[Tuple[str, str], ...]:
+    return tuple(sorted((str(k), str(v)) for k, v in labels.items() if v is not None))
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Histogram:
+    def __init__(self, buckets, reservoir_size: int = 2048):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)  # +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+        # sampel terakhir untuk persentil yang lebih akurat dari bucket
+        self.recent = deque(maxlen=reservoir_size)
+
+    def observe(self, value: float):
+        value = float(value)
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        self.recent.append(value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.recent:
+            return None
+        data = sorted(self.recent)
+        idx = min(len(data) - 1, max(0, int(round(q * (len(data) - 1)))))
+        return data[idx]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "min": self.min,
+            "max": self.max,
+            "mean": round(self.sum / self.count, 6) if self.count else None,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": {
+                **{str(b): c for b, c in zip(self.buckets, self.counts)},
+                "+Inf": self.counts[-1],
+            },
+        }
+
+
+class MetricsRegistry:
+    def __init__(self, max_traces: int = 500):
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, tuple], float] = {}
+        self._histograms: Dict[Tuple[str, tuple], Histogram] = {}
+        self._hist_buckets: Dict[str, tuple] = {
+            "stage_latency_seconds": LATENCY_BUCKETS,
+            "audio_seconds_processed": AUDIO_SECONDS_BUCKETS,
+        }
+        self._traces = deque(maxlen=max_traces)
+        self.started_at = datetime.now().astimezone().isoformat()
+
+    # ---------- primitives ----------
+    def inc(self, name: str, value: float = 1.0, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = Histogram(self._hist_buckets.get(name, LATENCY_BUCKETS))
+                self._histograms[key] = hist
+            hist.observe(value)
+
+    def register_buckets(self, name: str, buckets):
+        with self._lock:
+            self._hist_buckets[name] = tuple(sorted(buckets))
+
+    @contextmanager
+    def span(self, stage: str, **labels):
+        parent = _current_span.get()
+        record = {
+            "stage": stage,
+            "labels": {k: v for k, v in labels.items() if v is not None},
+            "parent": parent["stage"] if parent else None,
+            "start": datetime.now().astimezone().isoformat(),
+            "status": "ok",
+        }
+        token = _current_span.set(record)
+        t0 = time.perf_counter()
+        try:
+            yield record
+        except BaseException as e:
+            record["status"] = "error"
+            record["error"] = f"{type(e).__name__}: {e}"[:300]
+            self.inc("stage_errors_total", stage=stage)
+            raise
+        finally:
+            _current_span.reset(token)
+            record["duration_s"] = time.perf_counter() - t0
+            self.observe("stage_latency_seconds", record["duration_s"], stage=stage)
+            self.inc("stage_runs_total", stage=stage)
+            with self._lock:
+                self._traces.append(record)
+
+    # ---------- reads ----------
+    def counter_value(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get((name, _label_key(labels)), 0.0)
+
+    def histogram(self, name: str, **labels) -> Optional[Histogram]:
+        with self._lock:
+            return self._histograms.get((name, _label_key(labels)))
+
+    def recent_traces(self, limit: int = 100):
+        with self._lock:
+            return list(self._traces)[-limit:]
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = [
+                {"name": n, "labels": dict(l), "value": v}
+                for (n, l), v in sorted(self._counters.items())
+            ]
+            histograms = [
+                {"name": n, "labels": dict(l), **h.to_dict()}
+                for (n, l), h in sorted(self._histograms.items(), key=lambda kv: kv[0])
+            ]
+        return {
+            "started_at": self.started_at,
+            "exported_at": datetime.now().astimezone().isoformat(),
+            "counters": counters,
+            "histograms": histograms,
+        }
+
+    def stage_summary(self) -> Dict[str, Dict[str, Any]]:
+        out = {}
+        snap = self.snapshot()
+        for h in snap["histograms"]:
+            if h["name"] != "stage_latency_seconds":
+                continue
+            stage = h["labels"].get("stage")
+            out[stage] = {
+                "runs": h["count"],
+                "errors": 0,
+                "mean_s": h["mean"],
+                "p50_s": h["p50"],
+                "p95_s": h["p95"],
+                "max_s": h["max"],
+                "total_s": h["sum"],
+            }
+        for c in snap["counters"]:
+            if c["name"] == "stage_errors_total":
+                stage = c["labels"].get("stage")
+                out.setdefault(stage, {"runs": 0})["errors"] = int(c["value"])
+        return out
+
+    # ---------- exporters ----------
+    def to_json(self, indent: Optional[int] = None) -> str:
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=indent)
+
+    def to_prometheus(self, prefix: str = "assespro_") -> str:
+        def fmt_labels(labels: Dict[str, str], extra: Dict[str, str] = None) -> str:
+            items = {**labels, **(extra or {})}
+            if not items:
+                return ""
+            body = ",".join(f'{k}="{_escape_label(v)}"' for k, v in items.items())
+            return "{" + body + "}"
+
+        snap = self.snapshot()
+        lines = []
+        seen = set()
+        for c in snap["counters"]:
+            name = prefix + c["name"]
+            if name not in seen:
+                lines.append(f"# TYPE {name} counter")
+                seen.add(name)
+            lines.append(f"{name}{fmt_labels(c['labels'])} {c['value']}")
+        for h in snap["histograms"]:
+            name = prefix + h["name"]
+            if name not in seen:
+                lines.append(f"# TYPE {name} histogram")
+                seen.add(name)
+            cumulative = 0
+            for le, cnt in h["buckets"].items():
+                cumulative += cnt
+                lines.append(f"{name}_bucket{fmt_labels(h['labels'], {'le': le})} {cumulative}")
+            lines.append(f"{name}_sum{fmt_labels(h['labels'])} {h['sum']}")
+            lines.append(f"{name}_count{fmt_labels(h['labels'])} {h['count']}")
+        return "\n".join(lines) + "\n"
+
+    def dump_json(self, path) -> None:
+        from pathlib import Path
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(self.to_json(), encoding="utf-8")
+        tmp.replace(path)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._traces.clear()
+            self.started_at = datetime.now().astimezone().isoformat()
+
+
+REGISTRY = MetricsRegistry()
+
+# shortcut modul-level
+span = REGISTRY.span
+inc = REGISTRY.inc
+observe = REGISTRY.observe
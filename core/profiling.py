@@ -0,0 +1,231 @@
+# core/profiling.py
+# Profiling on-demand per stage pipeline (download / extract / asr / evaluate).
+# Aktif lewat config `profiling.enabled: true` atau env ASSESPRO_PROFILE=1.
+#
+#   <paths.profiles>/<candidate>/<qid>/<stage>.prof      cProfile (pstats / snakeviz)
+#   <paths.profiles>/<candidate>/<qid>/<stage>.folded    sampling stack (opsional, flamegraph.pl / speedscope)
+#   <paths.profiles>/<candidate>/<qid>/summary.json      wall/cpu, peak tracemalloc, top-N fungsi per stage
+#
+# cProfile dan cpu_s (time.thread_time) hanya melihat thread pemanggil; dengan
+# runtime.stt_pool, stage asr hanya berisi waktu tunggu ke proses worker.
+# tracemalloc bersifat global per proses: peak hanya diukur oleh satu stage pada satu
+# waktu (stage lain yang berjalan bersamaan / bersarang tidak mendapat tracemalloc_peak_mb).
+import cProfile
+import io
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+from core.locks import file_lock, atomic_write_bytes
+from core.metrics import REGISTRY
+from core.workspace import safe_filename
+
+logger = logging.getLogger(__name__)
+
+ENV_VAR = "ASSESPRO_PROFILE"
+
+# cProfile tidak bisa bersarang / paralel antar thread di Python 3.12+
+_profile_lock = threading.Lock()
+# reset_peak() / peak tracemalloc berlaku untuk seluruh proses
+_tracemalloc_lock = threading.Lock()
+
+
+def profiling_enabled(cfg: Optional[dict] = None) -> bool:
+    env = os.environ.get(ENV_VAR, "").strip().lower()
+    if env:
+        return env not in ("0", "false", "no", "off")
+    return bool(((cfg or {}).get("profiling", {}) or {}).get("enabled", False))
+
+
+def profiles_root(cfg: Optional[dict] = None) -> Path:
+    paths = (cfg or {}).get("paths", {}) or {}
+    return Path(paths.get("profiles") or Path(paths.get("cache", "data/cache")) / "profiles")
+
+
+class StackSampler:
+    # sampling berkala stack satu thread lewat sys._current_frames → format "folded"
+    def __init__(self, thread_id: int, interval_s: float = 0.005):
+        self.thread_id = thread_id
+        self.interval_s = interval_s
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({Path(code.co_filename).name}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="assespro-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {n}\n" for stack, n in self.stacks.most_common())
+
+
+def top_functions(stats: pstats.Stats, n: int = 25, sort: str = "cumulative") -> List[Dict[str, Any]]:
+    key = {"cumulative": "cumtime_s", "tottime": "tottime_s", "ncalls": "ncalls"}[sort]
+    rows = []
+    for (filename, line, func), (cc, nc, tt, ct, _callers) in stats.stats.items():
+        rows.append({
+            "function": f"{func} ({Path(filename).name}:{line})" if line else func,
+            "ncalls": nc,
+            "tottime_s": round(tt, 4),
+            "cumtime_s": round(ct, 4),
+        })
+    rows.sort(key=lambda r: r[key], reverse=True)
+    return rows[:n]
+
+
+class StageProfiler:
+    def __init__(self, root, candidate_id: str, qid: str, pcfg: Optional[dict] = None):
+        self.folder = Path(root) / safe_filename(candidate_id) / safe_filename(qid)
+        self.pcfg = pcfg or {}
+        self.top_n = int(self.pcfg.get("top_n", 25))
+
+    @contextmanager
+    def stage(self, name: str):
+        self.folder.mkdir(parents=True, exist_ok=True)
+        use_tracemalloc = self.pcfg.get("tracemalloc", True) and _tracemalloc_lock.acquire(blocking=False)
+        started_tracemalloc = False
+        sampler = None
+        if use_tracemalloc:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracemalloc = True
+            tracemalloc.reset_peak()
+            mem0 = tracemalloc.get_traced_memory()[0]
+        if self.pcfg.get("sampling", False):
+            sampler = StackSampler(threading.get_ident(), float(self.pcfg.get("sample_interval_ms", 5)) / 1000)
+            sampler.start()
+
+        # profiler lain sedang aktif (mis. stage bersarang) → stage ini hanya diukur wall/memori
+        profiler = cProfile.Profile() if _profile_lock.acquire(blocking=False) else None
+        t0, c0 = time.perf_counter(), time.thread_time()
+        try:
+            if profiler is not None:
+                profiler.enable()
+            yield
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                _profile_lock.release()
+            wall, cpu = time.perf_counter() - t0, time.thread_time() - c0
+            if sampler is not None:
+                sampler.stop()
+            entry = {"wall_s": round(wall, 4), "cpu_s": round(cpu, 4), "profiled_at": datetime.now().astimezone().isoformat()}
+            if use_tracemalloc:
+                entry["tracemalloc_peak_mb"] = round(max(0, tracemalloc.get_traced_memory()[1] - mem0) / 1e6, 3)
+                # tracing memperlambat setiap alokasi; hentikan lagi bila stage ini yang memulainya
+                if started_tracemalloc:
+                    tracemalloc.stop()
+                _tracemalloc_lock.release()
+            try:
+                self._write(name, entry, profiler, sampler)
+            except Exception as e:
+                logger.warning("Gagal menyimpan profil %s/%s: %s", self.folder, name, e)
+
+    def _write(self, name: str, entry: Dict[str, Any], profiler, sampler):
+        if profiler is not None:
+            prof_path = self.folder / f"{name}.prof"
+            profiler.dump_stats(str(prof_path))
+            entry["prof"] = prof_path.name
+            entry["top"] = top_functions(pstats.Stats(profiler, stream=io.StringIO()), self.top_n)
+        if sampler is not None and sampler.stacks:
+            folded_path = self.folder / f"{name}.folded"
+            atomic_write_bytes(folded_path, sampler.folded().encode("utf-8"))
+            entry["folded"] = folded_path.name
+            entry["samples"] = sum(sampler.stacks.values())
+
+        summary_path = self.folder / "summary.json"
+        with file_lock(summary_path):
+            summary = load_summary(summary_path) or {"stages": {}}
+            summary["stages"][name] = entry
+            atomic_write_bytes(summary_path, json.dumps(summary, ensure_ascii=False, indent=2).encode("utf-8"))
+        REGISTRY.inc("profiles_written_total", stage=name)
+
+
+def get_stage_profiler(cfg: Optional[dict], candidate_id: str, qid: str) -> Optional[StageProfiler]:
+    if not profiling_enabled(cfg):
+        return None
+    return StageProfiler(profiles_root(cfg), candidate_id, qid, (cfg or {}).get("profiling", {}))
+
+
+def profile_stage(profiler: Optional[StageProfiler], name: str):
+    return profiler.stage(name) if profiler is not None else nullcontext()
+
+
+def load_summary(path) -> Optional[Dict[str, Any]]:
+    path = Path(path)
+    if not path.exists():
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def list_profiles(cfg: Optional[dict] = None, candidate_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    # satu baris per (candidate, qid), diurutkan dari total wall time terbesar
+    root = profiles_root(cfg)
+    pattern = f"{safe_filename(candidate_id)}/*/summary.json" if candidate_id else "*/*/summary.json"
+    rows = []
+    for path in root.glob(pattern):
+        summary = load_summary(path)
+        if not summary:
+            continue
+        stages = summary.get("stages", {})
+        rows.append({
+            "candidate_id": path.parent.parent.name,
+            "qid": path.parent.name,
+            "wall_s": round(sum(s.get("wall_s", 0.0) for s in stages.values()), 3),
+            "slowest_stage": max(stages, key=lambda k: stages[k].get("wall_s", 0.0)) if stages else None,
+            "folder": str(path.parent),
+            "stages": stages,
+        })
+    rows.sort(key=lambda r: r["wall_s"], reverse=True)
+    return rows
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from core.config import load_config
+
+    ap = argparse.ArgumentParser(description="Ringkasan profil stage yang tersimpan")
+    ap.add_argument("--config", default="config.yaml")
+    ap.add_argument("--candidate")
+    ap.add_argument("--top", type=int, default=10)
+    args = ap.parse_args()
+
+    for row in list_profiles(load_config(args.config), args.candidate)[: args.top]:
+        print(f"{row['candidate_id']}/{row['qid']}: {row['wall_s']:.2f}s (stage terlama: {row['slowest_stage']})")
+        for name, s in sorted(row["stages"].items(), key=lambda kv: -kv[1].get("wall_s", 0.0)):
+            peak = s.get("tracemalloc_peak_mb")
+            print(f"  {name:<10} wall {s['wall_s']:.2f}s  cpu {s['cpu_s']:.2f}s" + (f"  peak {peak:.1f} MB" if peak is not None else ""))
+            for fn in (s.get("top") or [])[:5]:
+                print(f"    {fn['cumtime_s']:>8.3f}s  {fn['function']}")
@@ -1,5 +1,117 @@
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+
 import yaml
 
+from core.utils import FileCache
+
 def load_qbank(path="data/question_bank.yaml"):
     with open(path, "r", encoding="utf-8") as f:
-        return yaml.safe_load(f)
\ No newline at end of file
+        return yaml.safe_load(f)
+
+
+def normalize_qbank(raw: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    out = []
+    for item in raw:
+        q = dict(item)  # shallow copy
+        q["qid"] = str(q.get("qid", "")).strip()
+
+        qt = q.get("question_text") or {}
+        if isinstance(qt, str):
+            qt = {"en": qt}
+        q["question_text"] = {"en": str(qt.get("en", "")).strip()}
+
+        ls = q.get("languages_supported")
+        if not isinstance(ls, list):
+            ls = ["en"]
+        if "en" not in ls:
+            ls.insert(0, "en")
+        q["languages_supported"] = ls
+
+        if "answers" not in q:
+            q["answers"] = {"en": {"ideal": "", "keywords": {"must": [], "nice": []}}}
+
+        raw_rubric = q.get("rubric", {}) or {}
+        rubric = {}
+        for i in range(5):
+            v = None
+            if i in raw_rubric:
+                v = raw_rubric[i]
+            elif str(i) in raw_rubric:
+                v = raw_rubric[str(i)]
+            else:
+                v = raw_rubric.get(i, "")
+            rubric[i] = "" if v is None else str(v).strip()
+        q["rubric"] = rubric
+
+        if "weights" not in q:
+            q["weights"] = {"similarity": 0.55, "keyword_must": 0.3, "keyword_nice": 0.1, "structure": 0.05}
+
+        q["pass_threshold"] = q.get("pass_threshold", 0.7)
+
+        llm = q.get("llm") or {}
+        q["llm"] = {
+            "context": str(llm.get("context", "") or "").strip(),
+            "hard_constraints": str(llm.get("hard_constraints", "") or "").strip()
+        }
+
+        out.append(q)
+    return out
+
+
+class QBankIndex:
+    # index in-memory per qid, menggantikan scan linear pada list qbank
+    def __init__(self, items: List[Dict[str, Any]]):
+        self.items = items or []
+        self.qids = [str(q.get("qid", "")) for q in self.items]
+        self.by_qid = {qid: q for qid, q in zip(self.qids, self.items)}
+        self.position = {qid: i for i, qid in enumerate(self.qids)}
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, qid):
+        return qid in self.by_qid
+
+    def get(self, qid: str, default=None) -> Optional[Dict[str, Any]]:
+        return self.by_qid.get(qid, default)
+
+    def index_of(self, qid: str) -> int:
+        return self.position[qid]
+
+
+def _load_qbank_file(path, normalize: bool):
+    if not Path(path).exists():
+        return []
+    raw = load_qbank(path)
+    if raw is None:
+        return []
+    return normalize_qbank(raw) if normalize else raw
+
+
+_qbank_cache = FileCache("qbank", _load_qbank_file)
+_qbank_index_cache = FileCache(
+    "qbank_index", lambda path, normalize: QBankIndex(_load_qbank_file(path, normalize)), copy_on_read=False
+)
+
+
+def load_qbank_cached(path="data/question_bank.yaml", normalize: bool = False) -> List[Dict[str, Any]]:
+    # salinan baru setiap panggilan, aman untuk dimodifikasi caller
+    return _qbank_cache.get(path, normalize)
+
+
+def get_qbank_index(path="data/question_bank.yaml", normalize: bool = False) -> QBankIndex:
+    # dibagikan antar-sesi: perlakukan sebagai read-only
+    return _qbank_index_cache.get(path, normalize)
+
+
+def invalidate_qbank_cache(path=None):
+    _qbank_cache.invalidate(path)
+    _qbank_index_cache.invalidate(path)
+
+
+def save_qbank(qbank: List[Dict[str, Any]], path="data/question_bank.yaml"):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(yaml.safe_dump(qbank, sort_keys=False, allow_unicode=True), encoding="utf-8")
+    invalidate_qbank_cache(path)
@@ -1,18 +1,26 @@
 # core/rubric.py
 import numpy as np
-from sentence_transformers import SentenceTransformer, util
+
+from core.metrics import REGISTRY
 
 _models = {}
 _rubric_cache = {}
 
 def _get_model(name: str):
     if name not in _models:
+        from sentence_transformers import SentenceTransformer
+
+        REGISTRY.inc("cache_misses_total", cache="sbert_model")
         _models[name] = SentenceTransformer(name, cache_folder="models")
+    else:
+        REGISTRY.inc("cache_hits_total", cache="sbert_model")
     return _models[name]
 
 def rubric_semantic_grader(answer: str, rubric_texts: dict, model_name: str):
     if not rubric_texts:
         return None, None, {}
+    from sentence_transformers import util
+
     model = _get_model(model_name)
     keys = sorted(rubric_texts.keys())
     refs = [rubric_texts[k] for k in keys]
@@ -0,0 +1,310 @@
+# core/search_index.py
+# Full-text search (SQLite FTS5) atas transkrip, alasan skor dan qid, plus segmen
+# bertimestamp per jawaban. Diperbarui incremental saat save_candidate_answers
+# (satu transaksi per kandidat), dibaca HR Dashboard.
+#
+#   docs          satu baris per (candidate, qid)
+#   docs_fts      FTS5 (transcript, reason, qid), rowid = docs.id
+#   segments      segmen transkrip (start, end, text) per dokumen
+#   segments_fts  FTS5 atas teks segmen → timestamp bagian yang cocok
+#
+# Sintaks query: kata biasa (AND), "frasa persis", prefix*  — contoh:
+#   efficientnet          "transfer learning"         fine* "data augmentation"
+#
+#   python -m core.search_index --rebuild
+#   python -m core.search_index "transfer learning" --qid Q05
+import json
+import logging
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional
+
+from core.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    candidate_id TEXT NOT NULL,
+    qid TEXT NOT NULL,
+    question_text TEXT,
+    rubric_point REAL,
+    saved_at TEXT,
+    indexed_at TEXT,
+    UNIQUE (candidate_id, qid)
+);
+CREATE INDEX IF NOT EXISTS docs_qid ON docs (qid);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
+    transcript, reason, qid,
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+);
+
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    doc_id INTEGER NOT NULL,
+    start REAL, "end" REAL,
+    text TEXT
+);
+CREATE INDEX IF NOT EXISTS segments_doc ON segments (doc_id);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts USING fts5(
+    text, content='segments', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+);
+"""
+
+_lock = threading.Lock()
+
+_TOKEN = re.compile(r'"([^"]*)"|(\S+)')
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def build_match(query: str) -> Optional[str]:
+    # query HR → ekspresi MATCH FTS5 yang aman (tanpa operator/kolom dari input)
+    parts = []
+    for phrase, word in _TOKEN.findall(query or ""):
+        if phrase:
+            words = _WORD.findall(phrase)
+            if words:
+                parts.append('"' + " ".join(words) + '"')
+            continue
+        prefix = word.endswith("*")
+        for w in _WORD.findall(word):
+            parts.append(f'"{w}"')
+        if prefix and parts and _WORD.findall(word):
+            parts[-1] += "*"
+    return " AND ".join(parts) if parts else None
+
+
+def _item_reason(item: Dict[str, Any]) -> str:
+    rubric = item.get("rubric", {}) or {}
+    return str(rubric.get("reason") or rubric.get("llm_reason") or "")
+
+
+class SearchIndex:
+    def __init__(self, path="data/search.sqlite", mark=("**", "**")):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.mark = mark
+        with self.connect() as con:
+            try:
+                con.executescript(_SCHEMA)
+            except sqlite3.OperationalError as e:
+                raise RuntimeError(f"SQLite di lingkungan ini tidak mendukung FTS5: {e}") from e
+
+    @contextmanager
+    def connect(self):
+        con = sqlite3.connect(str(self.path), timeout=30)
+        con.row_factory = sqlite3.Row
+        try:
+            con.execute("PRAGMA journal_mode=WAL")
+            yield con
+            con.commit()
+        finally:
+            con.close()
+
+    # ---------- writes ----------
+    def _delete_doc(self, con, doc_id: int):
+        old = con.execute("SELECT id, text FROM segments WHERE doc_id = ?", (doc_id,)).fetchall()
+        if old:
+            # external-content FTS: hapus dengan nilai lama
+            con.executemany(
+                "INSERT INTO segments_fts (segments_fts, rowid, text) VALUES ('delete', ?, ?)",
+                [(r["id"], r["text"]) for r in old],
+            )
+            con.execute("DELETE FROM segments WHERE doc_id = ?", (doc_id,))
+        con.execute("DELETE FROM docs_fts WHERE rowid = ?", (doc_id,))
+        con.execute("DELETE FROM docs WHERE id = ?", (doc_id,))
+
+    def upsert_docs(self, docs: List[Dict[str, Any]]) -> int:
+        # docs: {candidate_id, qid, question_text, rubric_point, saved_at, transcript, reason, segments}
+        if not docs:
+            return 0
+        now = datetime.now().astimezone().isoformat()
+        with _lock, REGISTRY.span("storage", kind="search_index"), self.connect() as con:
+            for d in docs:
+                row = con.execute(
+                    "SELECT id FROM docs WHERE candidate_id = ? AND qid = ?", (d["candidate_id"], d["qid"])
+                ).fetchone()
+                if row is not None:
+                    self._delete_doc(con, row["id"])
+                if d.get("transcript") is None:
+                    continue  # jawaban gagal → hanya dihapus dari index
+                cur = con.execute(
+                    "INSERT INTO docs (candidate_id, qid, question_text, rubric_point, saved_at, indexed_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (d["candidate_id"], d["qid"], d.get("question_text"), d.get("rubric_point"), d.get("saved_at"), now),
+                )
+                doc_id = cur.lastrowid
+                con.execute(
+                    "INSERT INTO docs_fts (rowid, transcript, reason, qid) VALUES (?, ?, ?, ?)",
+                    (doc_id, d["transcript"], d.get("reason", ""), d["qid"]),
+                )
+                for s in d.get("segments") or []:
+                    text = str(s.get("text", "")).strip()
+                    if not text:
+                        continue
+                    seg = con.execute(
+                        'INSERT INTO segments (doc_id, start, "end", text) VALUES (?, ?, ?, ?)',
+                        (doc_id, float(s.get("start", 0.0)), float(s.get("end", 0.0)), text),
+                    )
+                    con.execute("INSERT INTO segments_fts (rowid, text) VALUES (?, ?)", (seg.lastrowid, text))
+        REGISTRY.inc("search_index_docs_total", len(docs))
+        return len(docs)
+
+    def delete_candidate(self, candidate_id: str):
+        with _lock, self.connect() as con:
+            for row in con.execute("SELECT id FROM docs WHERE candidate_id = ?", (candidate_id,)).fetchall():
+                self._delete_doc(con, row["id"])
+
+    def clear(self):
+        with _lock, self.connect() as con:
+            con.executescript(
+                "DELETE FROM docs; DELETE FROM segments; "
+                "DELETE FROM docs_fts; "
+                "INSERT INTO segments_fts (segments_fts) VALUES ('rebuild');"
+            )
+
+    # ---------- reads ----------
+    def search(
+        self,
+        query: str,
+        qid: Optional[str] = None,
+        candidate_id: Optional[str] = None,
+        limit: int = 50,
+        segments_per_hit: int = 3,
+    ) -> List[Dict[str, Any]]:
+        match = build_match(query)
+        if match is None:
+            return []
+        open_, close = self.mark
+        doc_match = match
+        if qid and _WORD.findall(qid):
+            # filter qid di dalam index FTS → bm25 hanya dihitung untuk dokumen qid tsb
+            doc_match = f'qid : "{" ".join(_WORD.findall(qid))}" AND ({match})'
+        sql = (
+            "SELECT d.id, d.candidate_id, d.qid, d.question_text, d.rubric_point, d.saved_at, "
+            "snippet(docs_fts, 0, ?, ?, ' … ', 16) AS transcript_snippet, "
+            "snippet(docs_fts, 1, ?, ?, ' … ', 16) AS reason_snippet, "
+            "bm25(docs_fts) AS rank "
+            "FROM docs_fts JOIN docs d ON d.id = docs_fts.rowid "
+            "WHERE docs_fts MATCH ?"
+        )
+        params: list = [open_, close, open_, close, doc_match]
+        if qid:
+            sql += " AND d.qid = ?"
+            params.append(qid)
+        if candidate_id:
+            sql += " AND d.candidate_id = ?"
+            params.append(candidate_id)
+        sql += " ORDER BY rank LIMIT ?"
+        params.append(int(limit))
+
+        with REGISTRY.span("search", kind="transcripts"), self.connect() as con:
+            hits = [dict(r) for r in con.execute(sql, params)]
+            for hit in hits:
+                hit["segments"] = [dict(r) for r in con.execute(
+                    'SELECT s.start, s."end", highlight(segments_fts, 0, ?, ?) AS text '
+                    "FROM segments_fts JOIN segments s ON s.id = segments_fts.rowid "
+                    "WHERE segments_fts MATCH ? AND s.doc_id = ? ORDER BY s.start LIMIT ?",
+                    (open_, close, match, hit["id"], int(segments_per_hit)),
+                )]
+        return hits
+
+    def qids(self) -> List[str]:
+        with self.connect() as con:
+            return [r[0] for r in con.execute("SELECT DISTINCT qid FROM docs ORDER BY qid")]
+
+    def count(self) -> int:
+        with self.connect() as con:
+            return con.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+
+def get_search_index(cfg: Optional[dict] = None) -> Optional[SearchIndex]:
+    scfg = (cfg or {}).get("search", {}) or {}
+    if not scfg.get("enabled", True):
+        return None
+    paths = (cfg or {}).get("paths", {}) or {}
+    return SearchIndex(paths.get("search_db", "data/search.sqlite"))
+
+
+def _candidate_docs(cfg: dict, candidate_id: str, results_all: Iterable[dict], saved_at: Optional[str]) -> List[Dict[str, Any]]:
+    from core.transcript_store import get_transcript_store
+
+    transcripts = get_transcript_store(cfg)
+    docs = []
+    for item in results_all:
+        if not item.get("qid"):
+            continue
+        doc = {"candidate_id": candidate_id, "qid": item["qid"], "saved_at": saved_at}
+        if not item.get("error"):
+            record = transcripts.get(candidate_id, item["qid"])
+            doc.update(
+                question_text=item.get("question_text"),
+                rubric_point=(item.get("rubric", {}) or {}).get("predicted_point"),
+                transcript=item.get("transcript", "") or "",
+                reason=_item_reason(item),
+                segments=record.segments if record else [],
+            )
+        docs.append(doc)
+    return docs
+
+
+def index_candidate(cfg: dict, candidate_id: str, results_all: List[dict], saved_at: Optional[str] = None) -> int:
+    index = get_search_index(cfg)
+    if index is None:
+        return 0
+    return index.upsert_docs(_candidate_docs(cfg, candidate_id, results_all, saved_at))
+
+
+def rebuild(cfg: dict, answers_folder="data/candidate_answers") -> int:
+    index = get_search_index(cfg)
+    index.clear()
+    n = 0
+    for path in sorted(Path(answers_folder).glob("*.json")):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            logger.warning("Lewati %s: %s", path, e)
+            continue
+        n += index.upsert_docs(_candidate_docs(
+            cfg, data.get("candidateId", path.stem), data.get("results", []) or [], data.get("savedAt")
+        ))
+    return n
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from core.config import load_config
+
+    ap = argparse.ArgumentParser(description="Full-text search transkrip kandidat")
+    ap.add_argument("query", nargs="?")
+    ap.add_argument("--qid")
+    ap.add_argument("--limit", type=int, default=20)
+    ap.add_argument("--rebuild", action="store_true", help="isi ulang dari data/candidate_answers")
+    ap.add_argument("--answers", default="data/candidate_answers")
+    ap.add_argument("--config", default="config.yaml")
+    args = ap.parse_args()
+
+    cfg = load_config(args.config)
+    if args.rebuild:
+        t0 = time.perf_counter()
+        n = rebuild(cfg, args.answers)
+        print(f"{n} jawaban diindex dalam {time.perf_counter() - t0:.2f}s")
+    if args.query:
+        t0 = time.perf_counter()
+        hits = get_search_index(cfg).search(args.query, qid=args.qid, limit=args.limit)
+        print(f"{len(hits)} hasil ({(time.perf_counter() - t0) * 1000:.1f} ms)")
+        for h in hits:
+            print(f"{h['candidate_id']} {h['qid']}: {h['transcript_snippet']}")
+            for s in h["segments"]:
+                print(f"    [{s['start']:.1f}s] {s['text']}")
@@ -1,6 +1,43 @@
 # core/serializer.py
+import json
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:  # opsional, fallback ke json stdlib
+    orjson = None
+
+
+def _json_default(o):
+    # numpy scalar / array tanpa perlu import numpy di sini
+    if hasattr(o, "tolist"):
+        return o.tolist()
+    if hasattr(o, "item"):
+        return o.item()
+    if isinstance(o, datetime):
+        return o.isoformat()
+    if hasattr(o, "__fspath__"):
+        return str(o)
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+def dumps_compact(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(
+            obj,
+            default=_json_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+        )
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_json_default).encode("utf-8")
+
+
+def loads(data):
+    if orjson is not None:
+        return orjson.loads(data)
+    if isinstance(data, (bytes, bytearray)):
+        data = data.decode("utf-8")
+    return json.loads(data)
+
 
 def _round_or_none(val, ndigits: int = 4):
     if val is None:
@@ -43,6 +80,14 @@ def compose_hr_json(qspec, transcript, result, meta, source_url, video_path):
         "timestamp": now,
     }
 
+    # keyword coverage (core.keywords), None jika pertanyaan tidak punya keyword
+    if "hits" in result:
+        base["keywords"] = {
+            "must_coverage": result.get("keyword_must_coverage"),
+            "nice_coverage": result.get("keyword_nice_coverage"),
+            "hits": result.get("hits"),
+        }
+
     # optional rubric info (LLM)
     if "rubric_point" in result:
         base["rubric"] = {
@@ -1,7 +1,14 @@
 import json
+import logging
 from pathlib import Path
 from datetime import datetime
-from typing import Union, Optional, Dict, List
+from typing import Union, Optional, List
+
+from core.locks import file_lock, atomic_write_bytes
+from core.metrics import REGISTRY
+from core.utils import FileCache
+
+logger = logging.getLogger(__name__)
 
 
 def save_candidate_metadata(
@@ -10,7 +17,8 @@ def save_candidate_metadata(
     question: Optional[str] = None,
     recorded_video_url: Optional[str] = None,
     is_video_exist: bool = True,
-    base_folder: str = "data/candidates_metadata"
+    base_folder: str = "data/candidates_metadata",
+    qid: Optional[str] = None,
 ) -> Path:
     folder = Path(base_folder)
     folder.mkdir(parents=True, exist_ok=True)
@@ -23,64 +31,165 @@ def save_candidate_metadata(
             "savedAt": datetime.now().isoformat(),
             **review_data
         }
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(full_data, f, ensure_ascii=False, indent=2)
-        print(f"[storage]  Disimpan (multi-entry) ke {filepath}")
+        with REGISTRY.span("storage", kind="metadata"), file_lock(filepath):
+            _write_json(filepath, full_data)
+        logger.info("Disimpan (multi-entry) ke %s", filepath)
         return filepath
 
-    # Mode 2 (append single interview entry)
-    if filepath.exists():
-        try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        except Exception:
+    # Mode 2 (upsert single interview entry, per qid / pertanyaan)
+    # read-modify-write di bawah lock: sesi lain bisa menambah entri kandidat yang sama
+    with REGISTRY.span("storage", kind="metadata"), file_lock(filepath):
+        data = None
+        if filepath.exists():
+            try:
+                data = _read_json(filepath)
+            except Exception:
+                data = None
+        if data is None:
             data = {
                 "candidateId": candidate_id,
                 "createdAt": datetime.now().isoformat(),
                 "reviewChecklists": {"project": "", "interviews": []}
             }
-    else:
-        data = {
-            "candidateId": candidate_id,
-            "createdAt": datetime.now().isoformat(),
-            "reviewChecklists": {"project": "", "interviews": []}
-        }
-
-    next_pos = len(data["reviewChecklists"].get("interviews", [])) + 1
-    new_entry = {
-        "positionId": f"Q{next_pos:02}",
-        "question": question or "N/A",
-        "isVideoExist": is_video_exist,
-        "recordedVideoUrl": recorded_video_url or "N/A"
-    }
 
-    data["reviewChecklists"].setdefault("interviews", []).append(new_entry)
+        interviews = data["reviewChecklists"].setdefault("interviews", [])
+        new_entry = {
+            "positionId": f"Q{len(interviews) + 1:02}",
+            "question": question or "N/A",
+            "isVideoExist": is_video_exist,
+            "recordedVideoUrl": recorded_video_url or "N/A"
+        }
+        if qid:
+            new_entry["qid"] = qid
 
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+        # submission ulang (resume) memperbarui entri lama, bukan menambah duplikat
+        for i, entry in enumerate(interviews):
+            if (qid and entry.get("qid") == qid) or (not entry.get("qid") and entry.get("question") == new_entry["question"]):
+                interviews[i] = {**new_entry, "positionId": entry.get("positionId", new_entry["positionId"])}
+                break
+        else:
+            interviews.append(new_entry)
+        _write_json(filepath, data)
 
-    print(f"[storage] Disimpan (single entry) ke {filepath}")
+    logger.info("Disimpan (single entry) ke %s", filepath)
     return filepath
 
 
 def save_candidate_answers(
     candidate_id: str,
     results_all: List[dict],
-    base_folder: str = "data/candidate_answers"
+    base_folder: str = "data/candidate_answers",
+    cfg: Optional[dict] = None,
 ) -> Path:
     folder = Path(base_folder)
     folder.mkdir(parents=True, exist_ok=True)
 
-    payload = {
-        "candidateId": candidate_id,
-        "savedAt": datetime.now().isoformat(),
-        "totalQuestions": len(results_all),
-        "results": results_all,
-    }
+    saved_at = datetime.now().isoformat()
+    out_path = folder / f"{candidate_id}.json"
+    with REGISTRY.span("storage", kind="answers"), file_lock(out_path):
+        # digabung per qid dengan aggregate yang ada: submission parsial (resume)
+        # tidak menghapus jawaban dari submission sebelumnya
+        results_all = merge_results(_read_results(out_path), results_all)
+        payload = {
+            "candidateId": candidate_id,
+            "savedAt": saved_at,
+            "totalQuestions": len(results_all),
+            "results": results_all,
+        }
+        _write_json(out_path, payload)
+
+    logger.info("candidate_answers disimpan ke %s", out_path)
+
+    # index turunan (opsional) diperbarui incremental; kegagalan tidak membatalkan simpan
+    if cfg is not None:
+        try:
+            from core.answer_index import index_candidate_results
+
+            index_candidate_results(cfg, candidate_id, results_all)
+        except Exception as e:
+            logger.warning("Gagal memperbarui answer index untuk %s: %s", candidate_id, e)
+        try:
+            from core.analytics import record_candidate
 
+            record_candidate(cfg, candidate_id, results_all, saved_at)
+        except Exception as e:
+            logger.warning("Gagal memperbarui analytics untuk %s: %s", candidate_id, e)
+        try:
+            from core.search_index import index_candidate
+
+            index_candidate(cfg, candidate_id, results_all, saved_at)
+        except Exception as e:
+            logger.warning("Gagal memperbarui search index untuk %s: %s", candidate_id, e)
+    return out_path
+
+
+def append_candidate_answer(
+    candidate_id: str,
+    result: dict,
+    base_folder: str = "data/candidate_answers"
+) -> Path:
+    # simpan satu hasil pertanyaan segera setelah selesai (upsert per qid),
+    # sehingga crash di tengah submission tidak menghilangkan jawaban yang sudah dinilai
+    folder = Path(base_folder)
+    folder.mkdir(parents=True, exist_ok=True)
     out_path = folder / f"{candidate_id}.json"
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
 
-    print(f"[storage] candidate_answers disimpan ke {out_path}")
+    with REGISTRY.span("storage", kind="answer"), file_lock(out_path):
+        results = merge_results(_read_results(out_path), [result])
+
+        payload = {
+            "candidateId": candidate_id,
+            "savedAt": datetime.now().isoformat(),
+            "totalQuestions": len(results),
+            "results": results,
+        }
+        _write_json(out_path, payload)
+
+    logger.info("Jawaban %s disimpan ke %s", result.get("qid"), out_path)
     return out_path
+
+
+def merge_results(existing: List[dict], new: List[dict]) -> List[dict]:
+    # upsert per qid: urutan lama dipertahankan, qid baru ditambahkan di akhir.
+    # Entri error (re-run gagal) tidak menimpa hasil sukses yang sudah ada.
+    by_qid = {r.get("qid"): r for r in new if r.get("qid") is not None}
+    merged = []
+    for r in existing:
+        repl = by_qid.pop(r.get("qid"), None) if r.get("qid") is not None else None
+        if repl is None or ("error" in repl and "error" not in r):
+            merged.append(r)
+        else:
+            merged.append(repl)
+    return merged + [r for r in new if r.get("qid") is None or r.get("qid") in by_qid]
+
+
+def _read_results(path: Path) -> List[dict]:
+    # aggregate rusak dipindahkan ke samping (bukan ditimpa diam-diam) agar masih bisa dipulihkan
+    if not path.exists():
+        return []
+    try:
+        return _read_json(path).get("results", [])
+    except (ValueError, AttributeError) as e:
+        aside = path.with_name(f"{path.name}.corrupt-{datetime.now():%Y%m%d%H%M%S}")
+        path.replace(aside)
+        logger.error("Aggregate %s rusak (%s); dipindahkan ke %s", path, e, aside)
+        return []
+
+
+def _read_json(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _write_json(path, data):
+    # atomik: pembaca (HR Dashboard, export) tidak pernah melihat file setengah tertulis
+    atomic_write_bytes(path, json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8"))
+
+
+# HR Dashboard membaca ulang file kandidat di setiap interaksi widget;
+# parse hanya jika file berubah. Hasil dibagikan → perlakukan read-only.
+_answers_cache = FileCache("candidate_answers", _read_json, copy_on_read=False)
+
+
+def read_candidate_answers_cached(path) -> dict:
+    return _answers_cache.get(path)
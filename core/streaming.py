@@ -0,0 +1,332 @@
+# core/streaming.py
+# Ingest streaming: byte video (URL langsung / upload) diteruskan ke ffmpeg lewat pipe
+# selagi masih diunduh, PCM 16 kHz keluarannya dipotong per window dan langsung
+# ditranskripsi. Latency ≈ max(download, ASR) + ASR window terakhir, bukan
+# download + extract + ASR.
+#
+#   source ──► feeder ──► file video (artefak / checkpoint)
+#                    └──► ffmpeg stdin ─► stdout PCM s16le ─► reader ──► WAV 16k
+#                                                               └──► window ─► Whisper
+#
+# Container yang tidak bisa dibaca dari pipe (mis. mp4 dengan moov di akhir file)
+# → ffmpeg gagal; file video tetap lengkap dan dipakai jalur biasa (extract + transcribe).
+import logging
+import queue
+import subprocess
+import threading
+import time
+import wave
+from pathlib import Path
+from typing import Dict, Any, Iterator, Optional
+
+import numpy as np
+
+from core.metrics import REGISTRY
+from core.stt import (
+    SAMPLE_RATE,
+    _first_pass,
+    build_decode_options,
+    detect_language_probs,
+    finalize_transcription,
+    transcribe,
+)
+
+logger = logging.getLogger(__name__)
+
+_EOF = object()
+
+
+def streaming_config(cfg: Optional[dict]) -> dict:
+    return (((cfg or {}).get("ingest", {}) or {}).get("streaming", {}) or {})
+
+
+def streaming_enabled(cfg: Optional[dict]) -> bool:
+    return bool(streaming_config(cfg).get("enabled", False))
+
+
+def iter_source(source, chunk_size: int, timeout: float = 60) -> Iterator[bytes]:
+    # URL http(s) → requests stream; selain itu file-like (UploadedFile Streamlit, open(..., "rb"))
+    if isinstance(source, str):
+        import requests
+
+        with requests.get(source, stream=True, timeout=timeout) as r:
+            r.raise_for_status()
+            for chunk in r.iter_content(chunk_size=chunk_size):
+                if chunk:
+                    yield chunk
+        return
+    if hasattr(source, "seek"):
+        source.seek(0)
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def split_point(audio: np.ndarray, search_samples: int, frame: int = 320) -> int:
+    # titik potong window: frame (20 ms) paling sunyi di `search_samples` terakhir,
+    # supaya kata tidak terpotong di batas window
+    n = len(audio)
+    lo = max(0, n - search_samples)
+    region = audio[lo: lo + ((n - lo) // frame) * frame]
+    if region.size < frame:
+        return n
+    rms = np.sqrt(np.mean(region.reshape(-1, frame) ** 2, axis=1))
+    return lo + int(np.argmin(rms)) * frame + frame // 2
+
+
+def _route_window(model, audio: np.ndarray, cfg: dict, candidates) -> dict:
+    # language ID dari window pertama (audio belum lengkap di disk)
+    from core.language_router import _pick, route_language
+
+    w = (cfg or {}).get("whisper", {}) or {}
+    ld = w.get("language_detection", {}) or {}
+    if not ld.get("enabled", False) or (candidates and len(candidates) == 1):
+        return route_language(model, None, cfg, candidates=candidates)
+    default = (candidates or [None])[0] or w.get("language", "en")
+    with REGISTRY.span("language_id"):
+        probs = detect_language_probs(model, audio, window_sec=float(ld.get("window_sec", 30)))
+    lang, conf = _pick(probs, candidates or ld.get("candidates") or [], default, float(ld.get("min_confidence", 0.5)))
+    REGISTRY.inc("language_routed_total", lang=lang)
+    return {
+        "lang": lang,
+        "confidence": round(conf, 4),
+        "source": "whisper_stream",
+        "top": sorted(probs.items(), key=lambda kv: kv[1], reverse=True)[:3],
+    }
+
+
+class WindowedTranscriber:
+    # PCM float32 masuk sedikit-sedikit (feed); setiap window penuh ditranskripsi
+    # dengan timestamp digeser ke posisi window di audio utuh
+    def __init__(self, model, cfg: dict, languages=None, on_segment=None):
+        scfg = streaming_config(cfg)
+        self.model = model
+        self.cfg = cfg
+        self.languages = languages
+        self.on_segment = on_segment
+        self.window = int(float(scfg.get("window_sec", 30)) * SAMPLE_RATE)
+        self.search = int(float(scfg.get("split_search_sec", 5)) * SAMPLE_RATE)
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self.offset = 0  # sampel yang sudah ditranskripsi
+        self.segments = []
+        self.lang_info = None
+        self.options = None
+        self.windows = 0
+        self.asr_s = 0.0
+
+    def feed(self, pcm: np.ndarray):
+        self.buffer = np.concatenate([self.buffer, pcm])
+        while len(self.buffer) >= self.window:
+            cut = split_point(self.buffer[: self.window], self.search)
+            self._decode(self.buffer[:cut])
+            self.buffer = self.buffer[cut:]
+            self.offset += cut
+
+    def flush(self):
+        if len(self.buffer) >= SAMPLE_RATE // 10:
+            self._decode(self.buffer)
+        self.offset += len(self.buffer)
+        self.buffer = np.zeros(0, dtype=np.float32)
+
+    def _decode(self, audio: np.ndarray):
+        t0 = time.perf_counter()
+        if self.lang_info is None:
+            self.lang_info = _route_window(self.model, audio, self.cfg, self.languages)
+            self.options = build_decode_options(self.cfg, language=self.lang_info["lang"])
+        opts = dict(self.options)
+        if self.segments:
+            # konteks lintas window seperti condition_on_previous_text
+            opts["initial_prompt"] = " ".join(s["text"] for s in self.segments[-3:]).strip()
+        shift = self.offset / SAMPLE_RATE
+        first = len(self.segments)
+
+        def on_segment(seg):
+            if self.on_segment is not None:
+                self.on_segment(dict(seg, start=float(seg.get("start", 0.0)) + shift, end=float(seg.get("end", 0.0)) + shift))
+
+        with REGISTRY.span("asr_window"):
+            result = _first_pass(self.model, audio.astype(np.float32), opts, on_segment)
+        for s in result.get("segments") or []:
+            s = dict(s, id=len(self.segments), window=self.windows)
+            s["start"] = float(s.get("start", 0.0)) + shift
+            s["end"] = float(s.get("end", 0.0)) + shift
+            s["text"] = str(s.get("text", "")).strip()
+            self.segments.append(s)
+        self.windows += 1
+        self.asr_s += time.perf_counter() - t0
+        logger.debug("Window %d: %.1fs audio, %d segmen", self.windows, len(audio) / SAMPLE_RATE, len(self.segments) - first)
+
+    def result(self) -> Dict[str, Any]:
+        return {"text": " ".join(s["text"] for s in self.segments if s["text"]), "segments": self.segments}
+
+
+def _ffmpeg_cmd(scfg: dict) -> list:
+    return [
+        scfg.get("ffmpeg", "ffmpeg"), "-hide_banner", "-loglevel", "error",
+        "-i", "pipe:0",
+        "-vn", "-ac", "1", "-ar", str(SAMPLE_RATE),
+        "-f", "s16le", "-c:a", "pcm_s16le", "pipe:1",
+    ]
+
+
+def stream_transcribe(source, video_out, wav_out, cfg: dict, model, languages=None, on_segment=None) -> Dict[str, Any]:
+    # source: URL unduhan langsung (core.downloader.direct_url) atau file-like upload.
+    # Hasil: {video_path, wav_path, text, segments, meta}; meta["streaming"] berisi timing.
+    scfg = streaming_config(cfg)
+    chunk_size = int(scfg.get("chunk_kb", 256)) * 1024
+    video_out, wav_out = Path(video_out), Path(wav_out)
+    video_out.parent.mkdir(parents=True, exist_ok=True)
+    wav_out.parent.mkdir(parents=True, exist_ok=True)
+
+    t0 = time.perf_counter()
+    timings = {"bytes": 0}
+    proc = subprocess.Popen(_ffmpeg_cmd(scfg), stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    pcm_queue: "queue.Queue" = queue.Queue()
+    box: Dict[str, Any] = {}
+    # diset bila ASR gagal: feeder berhenti mengunduh di antara chunk
+    stop = threading.Event()
+
+    def feeder():
+        pipe_open = True
+        chunks = iter_source(source, chunk_size)
+        try:
+            with open(video_out, "wb") as f:
+                for chunk in chunks:
+                    if stop.is_set():
+                        break
+                    f.write(chunk)
+                    timings["bytes"] += len(chunk)
+                    if pipe_open:
+                        try:
+                            proc.stdin.write(chunk)
+                        except (BrokenPipeError, OSError):
+                            # ffmpeg berhenti (container tidak bisa di-stream) → tetap unduh ke file
+                            pipe_open = False
+        except BaseException as e:
+            box["error"] = e
+            proc.kill()
+        finally:
+            # menutup generator juga menutup koneksi HTTP yang masih terbuka
+            chunks.close()
+            timings["download_s"] = time.perf_counter() - t0
+            try:
+                proc.stdin.close()
+            except OSError:
+                pass
+
+    def reader():
+        with wave.open(str(wav_out), "wb") as w:
+            w.setnchannels(1)
+            w.setsampwidth(2)
+            w.setframerate(SAMPLE_RATE)
+            tail = b""
+            while True:
+                data = proc.stdout.read1(chunk_size)
+                if not data:
+                    break
+                data, tail = tail + data, b""
+                if len(data) % 2:
+                    data, tail = data[:-1], data[-1:]
+                if "first_pcm_s" not in timings:
+                    timings["first_pcm_s"] = time.perf_counter() - t0
+                w.writeframes(data)
+                pcm_queue.put(np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768.0)
+        pcm_queue.put(_EOF)
+
+    stderr = []
+    threads = [
+        threading.Thread(target=feeder, name="assespro-stream-feed", daemon=True),
+        threading.Thread(target=reader, name="assespro-stream-pcm", daemon=True),
+        threading.Thread(target=lambda: stderr.append(proc.stderr.read()), name="assespro-stream-err", daemon=True),
+    ]
+    for t in threads:
+        t.start()
+
+    windowed = WindowedTranscriber(model, cfg, languages, on_segment)
+    samples = 0
+    with REGISTRY.span("stream_ingest"):
+        try:
+            while True:
+                pcm = pcm_queue.get()
+                if pcm is _EOF:
+                    break
+                samples += len(pcm)
+                windowed.feed(pcm)
+        except BaseException:
+            # ASR gagal → hentikan unduhan dan ffmpeg
+            stop.set()
+            proc.kill()
+            raise
+        for t in threads:
+            t.join()
+        returncode = proc.wait()
+        if "error" in box:
+            raise box["error"]
+
+        if returncode != 0 or samples == 0:
+            # fallback: file video sudah lengkap → extract + transcribe biasa
+            err = (b"".join(s for s in stderr if s) or b"").decode("utf-8", "replace").strip()
+            logger.warning("ffmpeg streaming gagal (%s): %s — memakai jalur biasa", returncode, err[-300:])
+            REGISTRY.inc("stream_ingest_fallbacks_total")
+            from core.media import _extract
+
+            with REGISTRY.span("extract"):
+                _extract(video_out, wav_out)
+            # segmen parsial yang sudah dikirim dari window tidak diulang: callback hanya
+            # dipakai bila belum ada window yang ter-decode
+            text, segments, meta = transcribe(
+                wav_out, cfg, model, languages=languages, on_segment=None if windowed.windows else on_segment
+            )
+            meta["streaming"] = {"fallback": True, "download_s": round(timings.get("download_s", 0.0), 3),
+                                 "total_s": round(time.perf_counter() - t0, 3)}
+            return {"video_path": video_out, "wav_path": wav_out, "text": text, "segments": segments, "meta": meta}
+
+        windowed.flush()
+
+    decode_info = {
+        "mode": "streaming",
+        "windows": windowed.windows,
+        "segments_total": len(windowed.segments),
+        "segments_redecoded": 0,
+        "beam_size": (windowed.options or {}).get("beam_size"),
+        "best_of": (windowed.options or {}).get("best_of"),
+    }
+    # audio < 0.1 s → tidak ada window yang ditranskripsi
+    w = (cfg or {}).get("whisper", {}) or {}
+    lang_info = windowed.lang_info or {"lang": (languages or [None])[0] or w.get("language", "en"), "confidence": None, "source": "config"}
+    text, segments, meta = finalize_transcription(
+        windowed.result(), wav_out, cfg, lang_info, decode_info, windowed.asr_s
+    )
+    total = time.perf_counter() - t0
+    download_s = timings.get("download_s", total)
+    meta["streaming"] = {
+        "fallback": False,
+        "bytes": timings["bytes"],
+        "audio_sec": round(samples / SAMPLE_RATE, 3),
+        "download_s": round(download_s, 3),
+        "first_pcm_s": round(timings.get("first_pcm_s", 0.0), 3),
+        "asr_s": round(windowed.asr_s, 3),
+        # waktu setelah byte terakhir diterima = window terakhir + analisis
+        "tail_s": round(max(0.0, total - download_s), 3),
+        "total_s": round(total, 3),
+    }
+    REGISTRY.observe("stream_ingest_tail_seconds", meta["streaming"]["tail_s"])
+    return {"video_path": video_out, "wav_path": wav_out, "text": text, "segments": segments, "meta": meta}
+
+
+def can_stream(cfg: dict, model, source_url: Optional[str], upload_file) -> bool:
+    # streaming hanya untuk model in-process (bukan stt_pool / worker terdistribusi)
+    # dan sumber byte langsung (bukan yt-dlp / Google Drive)
+    if not streaming_enabled(cfg) or model is None or not hasattr(model, "transcribe"):
+        return False
+    from core.stt import TranscriptionPool
+
+    if isinstance(model, TranscriptionPool):
+        return False
+    if source_url:
+        from core.downloader import direct_url
+
+        return direct_url(source_url) is not None
+    return upload_file is not None and bool(streaming_config(cfg).get("uploads", True))
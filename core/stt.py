@@ -1,18 +1,31 @@
 import os
-import json
+import logging
 import re
+import threading
+import weakref
+from contextlib import nullcontext
 from pathlib import Path
 
 import numpy as np
-import librosa
-import whisper
-
-decode_options = dict(
-    language="en",
-    task="transcribe",
-    beam_size=2,
-    best_of=2,
-    temperature=0
+
+from core.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# whisper/librosa (dan torch di belakangnya) di-import lazy di dalam fungsi
+# supaya halaman Streamlit tidak menanggung biaya import saat cold start.
+_models = {}
+_models_lock = threading.Lock()
+
+SAMPLE_RATE = 16000
+
+# opsi decode tambahan yang diteruskan apa adanya dari blok `whisper:` di config
+_PASSTHROUGH_OPTIONS = (
+    "condition_on_previous_text",
+    "compression_ratio_threshold",
+    "logprob_threshold",
+    "no_speech_threshold",
+    "patience",
 )
 
 prompt = """
@@ -30,9 +43,21 @@ domain_replacements = {
     "drawout layer": "dropout layer"
 }
 
+# aturan koreksi per bahasa; tambahan dari config: whisper.languages.<lang>.replacements
+domain_replacements_by_lang = {
+    "en": domain_replacements,
+    "id": {
+        "script c": "skripsi",
+        "data set": "dataset",
+        "drawout layer": "dropout layer",
+        "tensor flow": "TensorFlow",
+    },
+}
+
 
-def apply_domain_corrections(file_name, text):
-    for wrong, correct in domain_replacements.items():
+def apply_domain_corrections(file_name, text, lang="en", extra_replacements=None):
+    rules = domain_replacements_by_lang.get(lang, domain_replacements)
+    for wrong, correct in {**rules, **(extra_replacements or {})}.items():
         text = text.replace(wrong, correct)
 
     if file_name == "interview_question_5.webm":
@@ -48,35 +73,126 @@ def apply_domain_corrections(file_name, text):
     return text
 
 
-def analyze_segments(segments):
-    if not segments:
+class SegmentArrays:
+    # segmen Whisper sebagai kolom numpy (dikonversi sekali); semua statistik segmen
+    # dihitung vektor dari sini. avg_logprob yang tidak ada disimpan NaN.
+    __slots__ = ("start", "end", "avg_logprob", "no_speech_prob", "n_words", "ids", "texts", "extra")
+
+    def __init__(self, start, end, avg_logprob, no_speech_prob, n_words, ids=None, texts=None, extra=None):
+        self.start = np.asarray(start, dtype=np.float64)
+        self.end = np.asarray(end, dtype=np.float64)
+        self.avg_logprob = np.asarray(avg_logprob, dtype=np.float64)
+        self.no_speech_prob = np.asarray(no_speech_prob, dtype=np.float64)
+        self.n_words = np.asarray(n_words, dtype=np.int64)
+        self.ids = list(ids) if ids is not None else list(range(len(self.start)))
+        self.texts = list(texts) if texts is not None else [""] * len(self.start)
+        # kolom opsional per segmen (decode_pass, tier): {nama: [nilai | None, ...]}
+        self.extra = extra or {}
+
+    def __len__(self):
+        return len(self.start)
+
+    @classmethod
+    def from_segments(cls, segments) -> "SegmentArrays":
+        segments = segments or []
+        n = len(segments)
+        # satu pass atas dict → list Python, lalu satu konversi per kolom
+        start, end, logprob, no_speech, n_words = [], [], [], [], []
+        ids, texts, extra = [], [], {}
+        nan = float("nan")
+        for i, s in enumerate(segments):
+            start.append(s.get("start", 0.0))
+            end.append(s.get("end", 0.0))
+            lp = s.get("avg_logprob")
+            logprob.append(nan if lp is None else lp)
+            no_speech.append(s.get("no_speech_prob", 0.0) or 0.0)
+            text = s.get("text", "") or ""
+            n_words.append(len(text.split()))
+            ids.append(s.get("id", i))
+            texts.append(text.strip())
+            if "decode_pass" in s or "tier" in s:
+                for key in ("decode_pass", "tier"):
+                    if key in s:
+                        extra.setdefault(key, [None] * n)[i] = s[key]
+        return cls(start, end, logprob, no_speech, n_words, ids, texts, extra)
+
+    @classmethod
+    def from_columns(cls, cols) -> "SegmentArrays":
+        # format kolumnar core.transcript_store (.seg.json) → tanpa loop per segmen selain hitung kata
+        cols = cols or {}
+        texts = [str(t or "") for t in cols.get("text", [])]
+        extra = {k: list(cols[k]) for k in ("decode_pass", "tier") if k in cols}
+        return cls(
+            cols.get("start", []),
+            cols.get("end", []),
+            cols.get("avg_logprob", []),
+            cols.get("no_speech_prob", np.zeros(len(texts))),
+            [len(t.split()) for t in texts],
+            cols.get("id"),
+            texts,
+            extra,
+        )
+
+    @property
+    def durations(self) -> np.ndarray:
+        return self.end - self.start
+
+    @property
+    def pauses(self) -> np.ndarray:
+        gaps = self.start[1:] - self.end[:-1]
+        return gaps[gaps > 0]
+
+    def asr_metrics(self) -> dict:
+        if not len(self):
+            return {"avg_logprob": -1.0, "no_speech_prob": 1.0, "duration_sec": 0.0}
         return {
-            "total_speech_time": 0,
-            "total_pause_time": 0,
-            "num_pauses": 0,
-            "avg_pause_duration": 0,
-            "speech_rate_wpm": 0
+            "avg_logprob": float(np.nan_to_num(self.avg_logprob, nan=-1.0).mean()),
+            "no_speech_prob": float(self.no_speech_prob.mean()),
+            "duration_sec": float(self.end[-1]),
         }
 
-    durations = [s["end"] - s["start"] for s in segments]
-    total_speech_time = sum(durations)
+    def speech_stats(self) -> dict:
+        if not len(self):
+            return {
+                "total_speech_time": 0,
+                "total_pause_time": 0,
+                "num_pauses": 0,
+                "avg_pause_duration": 0,
+                "speech_rate_wpm": 0
+            }
+        total_speech_time = float(self.durations.sum())
+        pauses = self.pauses
+        total_words = int(self.n_words.sum())
+        speech_rate_wpm = (total_words / total_speech_time) * 60 if total_speech_time > 0 else 0.0
+        return {
+            "total_speech_time": round(total_speech_time, 2),
+            "total_pause_time": round(float(pauses.sum()), 2),
+            "num_pauses": int(pauses.size),
+            "avg_pause_duration": round(float(pauses.mean()) if pauses.size else 0.0, 2),
+            "speech_rate_wpm": round(speech_rate_wpm, 2)
+        }
 
-    pauses = [segments[i]["start"] - segments[i - 1]["end"] for i in range(1, len(segments))]
-    pauses = [p for p in pauses if p > 0]
-    total_pause_time = sum(pauses)
-    num_pauses = len(pauses)
-    avg_pause_duration = float(np.mean(pauses)) if pauses else 0.0
+    def to_segments(self) -> list:
+        # bentuk segmen yang disimpan / dikembalikan transcribe()
+        logprob = np.nan_to_num(self.avg_logprob, nan=0.0).tolist()
+        out = [
+            {"id": i, "start": st, "end": en, "text": t, "avg_logprob": lp, "no_speech_prob": ns}
+            for i, st, en, t, lp, ns in zip(
+                self.ids, self.start.tolist(), self.end.tolist(), self.texts, logprob, self.no_speech_prob.tolist()
+            )
+        ]
+        for key, values in self.extra.items():
+            for seg, value in zip(out, values):
+                if value is not None:
+                    seg[key] = value
+        return out
 
-    total_words = len(" ".join([s["text"] for s in segments]).split())
-    speech_rate_wpm = (total_words / total_speech_time) * 60 if total_speech_time > 0 else 0.0
 
-    return {
-        "total_speech_time": round(total_speech_time, 2),
-        "total_pause_time": round(total_pause_time, 2),
-        "num_pauses": num_pauses,
-        "avg_pause_duration": round(avg_pause_duration, 2),
-        "speech_rate_wpm": round(speech_rate_wpm, 2)
-    }
+def analyze_segments(segments):
+    # menerima list segmen atau SegmentArrays
+    if not isinstance(segments, SegmentArrays):
+        segments = SegmentArrays.from_segments(segments)
+    return segments.speech_stats()
 
 
 def analyze_linguistics(text):
@@ -97,6 +213,8 @@ def analyze_linguistics(text):
 
 def analyze_audio_features(wav_path):
     try:
+        import librosa
+
         y, sr = librosa.load(wav_path, sr=None)
         pitches, magnitudes = librosa.piptrack(y=y, sr=sr)
         pitch_values = pitches[pitches > 0]
@@ -107,92 +225,547 @@ def analyze_audio_features(wav_path):
             "energy_mean": round(energy, 2)
         }
     except Exception as e:
-        print(f"[WARN] Gagal analisis audio: {e}")
+        logger.warning("Gagal analisis audio: %s", e)
         return {"avg_pitch": 0, "pitch_variance": 0, "energy_mean": 0}
 
 
+class FasterWhisperModel:
+    # adapter faster-whisper (CTranslate2) dengan antarmuka model.transcribe()
+    # dan bentuk hasil yang sama dengan openai-whisper
+    _OPTION_KEYS = (
+        "language", "task", "beam_size", "best_of", "temperature", "initial_prompt",
+        "condition_on_previous_text", "compression_ratio_threshold",
+        "log_prob_threshold", "no_speech_threshold", "patience", "word_timestamps",
+    )
+
+    def __init__(self, size: str, device: str = "auto", compute_type: str = "default"):
+        from faster_whisper import WhisperModel
+
+        self.size = size
+        self.model = WhisperModel(size, device=device, compute_type=compute_type)
+
+    def detect_language_probs(self, audio) -> dict:
+        if hasattr(self.model, "detect_language"):
+            _lang, _prob, all_probs = self.model.detect_language(audio)
+            return {lang: float(p) for lang, p in all_probs}
+        _segments, info = self.model.transcribe(audio, language=None, beam_size=1, without_timestamps=True)
+        pairs = info.all_language_probs or [(info.language, info.language_probability)]
+        return {lang: float(p) for lang, p in pairs}
+
+    def transcribe(self, audio, **options):
+        opts = {k: v for k, v in options.items() if k in self._OPTION_KEYS}
+        if "logprob_threshold" in options:
+            opts["log_prob_threshold"] = options["logprob_threshold"]
+        if opts.get("beam_size") is None:
+            opts["beam_size"] = 1
+        if opts.get("best_of") is None:
+            opts.pop("best_of", None)
+        on_segment = options.get("on_segment")
+        seg_iter, info = self.model.transcribe(audio, **opts)
+        segments = []
+        for i, s in enumerate(seg_iter):
+            segments.append({
+                "id": i,
+                "start": s.start,
+                "end": s.end,
+                "text": s.text,
+                "avg_logprob": s.avg_logprob,
+                "no_speech_prob": s.no_speech_prob,
+                "compression_ratio": s.compression_ratio,
+                "temperature": s.temperature,
+            })
+            if on_segment is not None:
+                on_segment(segments[-1])
+        return {
+            "text": "".join(s["text"] for s in segments),
+            "segments": segments,
+            "language": info.language,
+        }
+
+
 def load_whisper_model(cfg):
-    size = cfg["models"]["whisper_size"]
-    print(f"Memuat model Whisper: {size}")
-    model = whisper.load_model(size)
+    models_cfg = cfg["models"]
+    size = models_cfg["whisper_size"]
+    backend = models_cfg.get("whisper_backend", "whisper")
+    key = (backend, size)
+    with _models_lock:
+        if key in _models:
+            REGISTRY.inc("cache_hits_total", cache="whisper_model")
+            return _models[key]
+
+        REGISTRY.inc("cache_misses_total", cache="whisper_model")
+        logger.info("Memuat model Whisper: %s (%s)", size, backend)
+        with REGISTRY.span("load_model", model=size, backend=backend):
+            if backend == "faster-whisper":
+                runtime = cfg.get("runtime", {}) or {}
+                model = FasterWhisperModel(
+                    size,
+                    device="auto" if runtime.get("use_gpu_if_available", True) else "cpu",
+                    compute_type=models_cfg.get("compute_type", "default"),
+                )
+            else:
+                import whisper
+
+                model = whisper.load_model(size)
+        _models[key] = model
     return model
 
 
-def transcribe(wav_path, cfg, model):
-    print(f"Memulai transkripsi untuk: {wav_path}")
+# model di-cache per proses dan dipakai bersama semua sesi / thread worker. openai-whisper
+# memasang hook kv-cache per panggilan pada modul decoder, jadi dua decode bersamaan di
+# satu instance saling merusak → dikunci per model. CTranslate2 (faster-whisper) aman paralel.
+_model_locks = weakref.WeakKeyDictionary()
 
-    options = dict(decode_options)
-    options["initial_prompt"] = prompt
 
-    result = model.transcribe(str(wav_path), **options)
+def model_lock(model):
+    if isinstance(model, FasterWhisperModel):
+        return nullcontext()
+    with _models_lock:
+        lock = _model_locks.get(model)
+        if lock is None:
+            lock = _model_locks[model] = threading.RLock()
+    return lock
 
-    raw_text = (result.get("text") or "").strip()
-    file_name = Path(wav_path).name
-    text = apply_domain_corrections(file_name, raw_text)
 
+def _beam(value):
+    # beam_size/best_of <= 1 berarti greedy (None untuk openai-whisper)
+    return int(value) if value and int(value) > 1 else None
+
+
+def build_decode_options(cfg, language=None) -> dict:
+    w = (cfg or {}).get("whisper", {}) or {}
+    if language:
+        # override per bahasa: whisper.languages.<lang>.{initial_prompt, beam_size, ...}
+        lang_cfg = (w.get("languages", {}) or {}).get(language, {}) or {}
+        w = {**w, **{k: v for k, v in lang_cfg.items() if k != "replacements"}, "language": language}
+    options = dict(
+        language=w.get("language", "en"),
+        task=w.get("task", "transcribe"),
+        beam_size=_beam(w.get("beam_size", 2)),
+        best_of=_beam(w.get("best_of", 2)),
+        temperature=w.get("temperature", 0),
+        initial_prompt=w.get("initial_prompt", prompt),
+    )
+    for key in _PASSTHROUGH_OPTIONS:
+        if key in w:
+            options[key] = w[key]
+    return options
+
+
+def detect_language_probs(model, audio: np.ndarray, window_sec: float = 30.0) -> dict:
+    # language ID Whisper dari window pertama (≤ 30 s) saja
+    window = audio[: int(window_sec * SAMPLE_RATE)]
+    if hasattr(model, "detect_language_probs"):
+        return model.detect_language_probs(window)
+
+    import whisper
+
+    window = whisper.pad_or_trim(window)
+    n_mels = getattr(getattr(model, "dims", None), "n_mels", 80)
+    mel = whisper.log_mel_spectrogram(window, n_mels=n_mels).to(model.device)
+    with model_lock(model):
+        _, probs = model.detect_language(mel)
+    return {lang: float(p) for lang, p in probs.items()}
+
+
+def _load_audio_16k(wav_path) -> np.ndarray:
+    # WAV hasil extract_wav16k dibaca langsung; format lain lewat whisper/ffmpeg
+    import wave
+
+    try:
+        with wave.open(str(wav_path), "rb") as w:
+            if w.getframerate() == SAMPLE_RATE and w.getnchannels() == 1 and w.getsampwidth() == 2:
+                pcm = np.frombuffer(w.readframes(w.getnframes()), dtype="<i2")
+                return pcm.astype(np.float32) / 32768.0
+    except (wave.Error, EOFError):
+        pass
+    import whisper
+
+    return whisper.load_audio(str(wav_path))
+
+
+def _first_pass(model, audio, options: dict, on_segment=None):
+    # faster-whisper memberi segmen satu per satu selama decode;
+    # openai-whisper baru setelah seluruh audio selesai
+    if on_segment is not None and isinstance(model, FasterWhisperModel):
+        return model.transcribe(audio, on_segment=on_segment, **options)
+    with model_lock(model):
+        result = model.transcribe(audio, **options)
+    if on_segment is not None:
+        for s in result.get("segments") or []:
+            on_segment(s)
+    return result
+
+
+def _segment_needs_redecode(seg: dict, rules: dict) -> bool:
+    if float(seg.get("avg_logprob", 0.0)) < rules["logprob_threshold"]:
+        return True
+    if float(seg.get("compression_ratio", 0.0)) > rules["compression_ratio_threshold"]:
+        return True
+    return False
+
+
+def _redecode_segments(model, audio: np.ndarray, segments: list, flagged: list, options: dict, pad_sec: float, mark: dict):
+    # decode ulang potongan audio per segmen; hasil dipakai hanya jika lebih yakin
+    improved = 0
+    n = len(audio)
+    for i in flagged:
+        seg = segments[i]
+        start = max(0, int((float(seg["start"]) - pad_sec) * SAMPLE_RATE))
+        end = min(n, int((float(seg["end"]) + pad_sec) * SAMPLE_RATE))
+        if end - start < SAMPLE_RATE // 10:
+            continue
+        opts = dict(options)
+        opts["condition_on_previous_text"] = False
+        if i > 0:
+            opts["initial_prompt"] = segments[i - 1].get("text", "")
+        with model_lock(model):
+            res = model.transcribe(audio[start:end], **opts)
+        sub = res.get("segments") or []
+        if not sub:
+            continue
+        new_logprob = float(np.mean([float(s.get("avg_logprob", -1.0)) for s in sub]))
+        if new_logprob <= float(seg.get("avg_logprob", -1.0)):
+            continue
+        seg["text"] = " ".join(s.get("text", "").strip() for s in sub).strip()
+        seg["avg_logprob"] = new_logprob
+        seg["compression_ratio"] = float(np.mean([float(s.get("compression_ratio", 0.0)) for s in sub]))
+        seg.update(mark)
+        improved += 1
+    return improved
+
+
+def _decode_adaptive(model, wav_path, options: dict, cfg: dict, on_segment=None):
+    ad = (cfg.get("whisper", {}) or {}).get("adaptive", {}) or {}
+    rules = {
+        "logprob_threshold": float(ad.get("logprob_threshold", -0.8)),
+        "compression_ratio_threshold": float(ad.get("compression_ratio_threshold", 2.4)),
+    }
+
+    # pass 1: greedy untuk seluruh audio
+    audio = _load_audio_16k(wav_path)
+    greedy = dict(options, beam_size=None, best_of=None)
+    result = _first_pass(model, audio, greedy, on_segment)
     segments = result.get("segments", []) or []
+    for s in segments:
+        s["decode_pass"] = "greedy"
+
+    # pass 2: beam search hanya untuk segmen yang kurang yakin
+    flagged = [i for i, s in enumerate(segments) if _segment_needs_redecode(s, rules)]
+    beam_opts = dict(
+        options,
+        beam_size=_beam(ad.get("beam_size", options.get("beam_size") or 5)),
+        best_of=_beam(ad.get("best_of", options.get("best_of") or 5)),
+    )
+    improved = 0
+    if flagged:
+        with REGISTRY.span("asr_redecode"):
+            improved = _redecode_segments(
+                model, audio, segments, flagged, beam_opts, float(ad.get("pad_sec", 0.2)), {"decode_pass": "beam"}
+            )
+        result["text"] = " ".join(s.get("text", "").strip() for s in segments)
+
+    REGISTRY.inc("asr_segments_total", len(segments), mode="adaptive")
+    REGISTRY.inc("asr_segments_redecoded_total", len(flagged), mode="adaptive")
+    info = {
+        "mode": "adaptive",
+        "segments_total": len(segments),
+        "segments_redecoded": len(flagged),
+        "segments_improved": improved,
+        "redecode_ratio": round(len(flagged) / len(segments), 4) if segments else 0.0,
+        "thresholds": rules,
+    }
+    return result, info
 
-    if segments:
-        avg_logprob = float(np.mean([float(s.get("avg_logprob", -1.0)) for s in segments]))
-        no_speech_prob = float(np.mean([float(s.get("no_speech_prob", 0.0)) for s in segments]))
-        duration_sec = float(segments[-1].get("end", 0.0))
-    else:
-        avg_logprob = -1.0
-        no_speech_prob = 1.0
-        duration_sec = 0.0
 
-    meta_basic = {
-        "avg_logprob": avg_logprob,
-        "no_speech_prob": no_speech_prob,
-        "duration_sec": duration_sec
+def _decode_cascade(model, wav_path, options: dict, cfg: dict, on_segment=None):
+    # tier 1: model kecil untuk seluruh jawaban; tier 2: model yang dikonfigurasi
+    # hanya untuk segmen (atau jawaban) di luar batas kepercayaan
+    cc = (cfg.get("whisper", {}) or {}).get("cascade", {}) or {}
+    full_size = cfg["models"]["whisper_size"]
+    fast_size = cc.get("fast_size", "tiny")
+    min_logprob = float(cc.get("min_avg_logprob", -0.7))
+    max_no_speech = float(cc.get("max_no_speech_prob", 0.6))
+    answer_ratio = float(cc.get("escalate_answer_ratio", 0.5))
+
+    fast_cfg = dict(cfg, models=dict(cfg["models"], whisper_size=fast_size))
+    fast_model = load_whisper_model(fast_cfg)
+
+    audio = _load_audio_16k(wav_path)
+    with REGISTRY.span("asr_fast", model=fast_size):
+        result = _first_pass(fast_model, audio, options, on_segment)
+    segments = result.get("segments", []) or []
+    for s in segments:
+        s["tier"] = fast_size
+
+    flagged = [
+        i for i, s in enumerate(segments)
+        if float(s.get("avg_logprob", -1.0)) < min_logprob
+        or float(s.get("no_speech_prob", 0.0)) > max_no_speech
+    ]
+
+    info = {
+        "mode": "cascade",
+        "fast_model": fast_size,
+        "full_model": full_size,
+        "segments_total": len(segments),
+        "segments_escalated": len(flagged),
+        "answer_escalated": False,
+        "bounds": {"min_avg_logprob": min_logprob, "max_no_speech_prob": max_no_speech},
     }
 
-    speech_stats = analyze_segments(segments)
+    if segments and len(flagged) / len(segments) > answer_ratio:
+        # sebagian besar tidak yakin → transkrip ulang seluruh jawaban dengan model besar
+        with REGISTRY.span("asr_full", model=full_size):
+            with model_lock(model):
+                result = model.transcribe(audio, **options)
+        segments = result.get("segments", []) or []
+        for s in segments:
+            s["tier"] = full_size
+        info["answer_escalated"] = True
+        info["segments_total"] = len(segments)
+        # seluruh segmen keluaran berasal dari model besar
+        redecoded = len(segments)
+        outcome = "answer"
+    elif flagged:
+        with REGISTRY.span("asr_full", model=full_size):
+            _redecode_segments(
+                model, audio, segments, flagged, options, float(cc.get("pad_sec", 0.2)), {"tier": full_size}
+            )
+        result["text"] = " ".join(s.get("text", "").strip() for s in segments)
+        redecoded = len(flagged)
+        outcome = "segments"
+    else:
+        redecoded = 0
+        outcome = "fast"
+
+    info["escalated"] = outcome if outcome != "fast" else None
+    info["segments_from_full"] = sum(1 for s in segments if s.get("tier") == full_size)
+    info["segments_redecoded"] = redecoded
+    info["redecode_ratio"] = round(redecoded / len(segments), 4) if segments else 0.0
+    REGISTRY.inc("asr_cascade_answers_total", outcome=outcome)
+    REGISTRY.inc("asr_segments_total", len(segments), mode="cascade")
+    REGISTRY.inc("asr_segments_redecoded_total", redecoded, mode="cascade")
+    return result, info
+
+
+def transcribe(wav_path, cfg, model, languages=None, on_segment=None):
+    # on_segment(seg): dipanggil untuk segmen pass pertama (parsial) sebelum re-decode/analisis
+    logger.info("Memulai transkripsi untuk: %s", wav_path)
+
+    from core.language_router import route_language
+
+    lang_info = route_language(model, wav_path, cfg, candidates=languages)
+    lang = lang_info["lang"]
+    options = build_decode_options(cfg, language=lang)
+    mode = (cfg.get("whisper", {}) or {}).get("decode_mode", "fixed")
+
+    with REGISTRY.span("asr", mode=mode) as asr_span:
+        if mode == "adaptive":
+            result, decode_info = _decode_adaptive(model, wav_path, options, cfg, on_segment)
+        elif mode == "cascade":
+            result, decode_info = _decode_cascade(model, wav_path, options, cfg, on_segment)
+        else:
+            result = _first_pass(model, str(wav_path), options, on_segment)
+            decode_info = {
+                "mode": "fixed",
+                "segments_total": len(result.get("segments") or []),
+                "segments_redecoded": 0,
+            }
+    decode_info["beam_size"] = options.get("beam_size")
+    decode_info["best_of"] = options.get("best_of")
+    return finalize_transcription(result, wav_path, cfg, lang_info, decode_info, asr_span["duration_s"])
+
+
+def finalize_transcription(result, wav_path, cfg, lang_info, decode_info, asr_s):
+    # hasil decode (dict gaya openai-whisper) → (text, segments, meta); dipakai juga core.streaming
+    lang = lang_info["lang"]
+    raw_text = (result.get("text") or "").strip()
+    file_name = Path(wav_path).name
+    lang_rules = ((cfg.get("whisper", {}) or {}).get("languages", {}) or {}).get(lang, {}) or {}
+    text = apply_domain_corrections(file_name, raw_text, lang=lang, extra_replacements=lang_rules.get("replacements"))
+
+    # konversi sekali ke kolom numpy; metrik ASR, statistik bicara dan segmen keluaran dari sini
+    arrays = SegmentArrays.from_segments(result.get("segments", []) or [])
+    meta_basic = arrays.asr_metrics()
+    avg_logprob = meta_basic["avg_logprob"]
+    no_speech_prob = meta_basic["no_speech_prob"]
+    duration_sec = meta_basic["duration_sec"]
+
+    REGISTRY.observe("audio_seconds_processed", duration_sec)
+    if duration_sec > 0:
+        REGISTRY.observe("asr_realtime_factor", asr_s / duration_sec)
+
+    speech_stats = arrays.speech_stats()
     linguistic = analyze_linguistics(text)
-    audio_feats = analyze_audio_features(wav_path)
+    with REGISTRY.span("acoustic_features") as features_span:
+        audio_feats = analyze_audio_features(wav_path)
 
     full_meta = {
         "asr_metrics": meta_basic,
         "speech_analysis": speech_stats,
         "linguistic_features": linguistic,
         "audio_features": audio_feats,
+        "decode": decode_info,
+        "language": lang_info,
+        "timings": {
+            "asr_s": round(asr_s, 3),
+            "acoustic_features_s": round(features_span["duration_s"], 3),
+        },
         "avg_logprob": avg_logprob,
         "no_speech_prob": no_speech_prob,
         "duration_sec": duration_sec
     }
 
-    simplified_segments = [
-        {
-            "id": s.get("id", i),
-            "start": float(s["start"]),
-            "end": float(s["end"]),
-            "text": s.get("text", "").strip(),
-            "avg_logprob": float(s.get("avg_logprob", 0.0)),
-            "no_speech_prob": float(s.get("no_speech_prob", 0.0))
-        }
-        for i, s in enumerate(segments)
-    ]
+    simplified_segments = arrays.to_segments()
 
-    out_dir = Path("data/transcripts")
-    out_dir.mkdir(parents=True, exist_ok=True)
-    base = Path(wav_path).stem
-    out_path = out_dir / f"{base}.json"
-
-    def convert(o):
-        if isinstance(o, (np.floating, np.float32, np.float64)):
-            return float(o)
-        if isinstance(o, (np.integer, np.int32, np.int64)):
-            return int(o)
-        raise TypeError
-
-    output_data = {
-        "text": text,
-        "segments": simplified_segments,
-        "meta": full_meta
-    }
+    # penyimpanan transkrip ditangani core.transcript_store oleh pemanggil
+    return text, simplified_segments, full_meta
 
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=2, default=convert)
 
-    print(f"Transkrip lengkap disimpan ke: {out_path}")
-    return text, simplified_segments, full_meta
+def reanalyze_stored(store, candidate_id=None, qid=None) -> int:
+    # hitung ulang asr_metrics + speech_analysis transkrip tersimpan langsung dari kolom segmen
+    n = 0
+    for record in store.iter_records(candidate_id, qid):
+        arrays = record.arrays
+        metrics = arrays.asr_metrics()
+        store.update_meta(record, {"asr_metrics": metrics, "speech_analysis": arrays.speech_stats(), **metrics})
+        n += 1
+    return n
+
+
+# ---------------------------------------------------------------------------
+# Pool transkripsi multi-proses (CPU)
+#
+# Satu model.transcribe tidak skala linear dengan jumlah thread torch, dan beberapa
+# sesi Streamlit sekaligus saling berebut core. Pool ini menjalankan N proses
+# (spawn), masing-masing memuat model sekali, di-pin ke irisan core sendiri
+# (sched_setaffinity) dengan torch.set_num_threads = ukuran irisan. Jawaban
+# diambil dari satu antrean bersama; satu pool per proses server dipakai semua sesi.
+# ---------------------------------------------------------------------------
+_THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+_pool_state = {"cfg": None, "model": None, "cores": None}
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def available_cpus() -> list:
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def plan_core_slices(processes: int, threads_per_process: int, cpus=None) -> list:
+    # irisan core yang tidak saling tumpang-tindih; jika core kurang, irisan dipakai bergiliran
+    cpus = list(cpus if cpus is not None else available_cpus())
+    slices = []
+    for i in range(processes):
+        start = (i * threads_per_process) % max(1, len(cpus))
+        s = cpus[start:start + threads_per_process]
+        slices.append(s or cpus[:threads_per_process])
+    return slices
+
+
+def resolve_pool_shape(cfg) -> tuple:
+    pcfg = ((cfg or {}).get("runtime", {}) or {}).get("stt_pool", {}) or {}
+    n_cpus = len(available_cpus())
+    processes = int(pcfg.get("processes") or 0)
+    threads = int(pcfg.get("threads_per_process") or 0)
+    if not processes and not threads:
+        threads = min(4, n_cpus)
+    if not processes:
+        processes = max(1, n_cpus // max(1, threads))
+    if not threads:
+        threads = max(1, n_cpus // processes)
+    return processes, threads
+
+
+def _pool_init(cfg, slices, threads):
+    cores = slices.get()
+    if cores and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, cores)
+        except OSError as e:
+            logger.warning("sched_setaffinity gagal untuk %s: %s", cores, e)
+    try:
+        import torch
+
+        torch.set_num_threads(threads)
+        torch.set_num_interop_threads(1)
+    except (ImportError, RuntimeError):
+        pass
+    _pool_state["cfg"] = cfg
+    _pool_state["cores"] = cores
+    _pool_state["model"] = load_whisper_model(cfg)
+
+
+def _pool_transcribe(wav_path, languages):
+    return transcribe(wav_path, _pool_state["cfg"], _pool_state["model"], languages=languages)
+
+
+class TranscriptionPool:
+    def __init__(self, cfg, processes=None, threads_per_process=None, cpus=None):
+        import multiprocessing as mp
+
+        auto_p, auto_t = resolve_pool_shape(cfg)
+        self.processes = int(processes or auto_p)
+        self.threads_per_process = int(threads_per_process or auto_t)
+        self.slices = plan_core_slices(self.processes, self.threads_per_process, cpus)
+
+        ctx = mp.get_context("spawn")
+        queue = ctx.Queue()
+        for s in self.slices:
+            queue.put(s)
+
+        # env thread BLAS/OpenMP harus sudah ada saat proses anak start (sebelum import numpy/torch)
+        saved = {k: os.environ.get(k) for k in _THREAD_ENV_VARS}
+        os.environ.update({k: str(self.threads_per_process) for k in _THREAD_ENV_VARS})
+        try:
+            logger.info(
+                "Memulai pool transkripsi: %d proses × %d thread", self.processes, self.threads_per_process
+            )
+            self._pool = ctx.Pool(
+                self.processes, initializer=_pool_init, initargs=(cfg, queue, self.threads_per_process)
+            )
+        finally:
+            for k, v in saved.items():
+                if v is None:
+                    os.environ.pop(k, None)
+                else:
+                    os.environ[k] = v
+
+    def submit(self, wav_path, languages=None):
+        REGISTRY.inc("stt_pool_jobs_total")
+        return self._pool.apply_async(_pool_transcribe, (str(wav_path), languages))
+
+    def transcribe(self, wav_path, languages=None):
+        # sama dengan transcribe(): (text, segments, meta)
+        with REGISTRY.span("asr", mode="pool"):
+            text, segments, meta = self.submit(wav_path, languages).get()
+        REGISTRY.observe("audio_seconds_processed", meta.get("duration_sec") or 0.0)
+        return text, segments, meta
+
+    def map(self, jobs):
+        # jobs: iterable (wav_path, languages); hasil sesuai urutan
+        pending = [self.submit(w, langs) for w, langs in jobs]
+        return [p.get() for p in pending]
+
+    def close(self):
+        self._pool.close()
+        self._pool.join()
+
+    def terminate(self):
+        self._pool.terminate()
+
+
+def get_transcription_pool(cfg):
+    # None jika runtime.stt_pool.enabled = false → pemanggil memakai transcribe() biasa
+    global _pool
+    pcfg = ((cfg or {}).get("runtime", {}) or {}).get("stt_pool", {}) or {}
+    if not pcfg.get("enabled", False):
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = TranscriptionPool(cfg, pcfg.get("processes"), pcfg.get("threads_per_process"))
+    return _pool
@@ -0,0 +1,170 @@
+# core/transcript_store.py
+# Satu penyimpanan transkrip per jawaban, di-key oleh (candidate, qid, source hash).
+#
+#   <root>/<candidate>/<qid>_<hash12>.json      header: text + meta (kecil, cepat di-scan)
+#   <root>/<candidate>/<qid>_<hash12>.seg.json  segmen kolumnar, dimuat lazy
+#
+# Segmen disimpan sebagai kolom {"start": [...], "end": [...], "avg_logprob": [...],
+# "no_speech_prob": [...], "text": [...]} dalam JSON ringkas (tanpa indent).
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Iterator
+
+from core.locks import atomic_write_bytes
+from core.metrics import REGISTRY
+from core.serializer import dumps_compact, loads
+from core.workspace import safe_filename
+
+SEGMENT_COLUMNS = ("id", "start", "end", "avg_logprob", "no_speech_prob", "text")
+
+def segments_to_columns(segments: List[Dict[str, Any]]) -> Dict[str, list]:
+    cols = {c: [] for c in SEGMENT_COLUMNS}
+    for i, s in enumerate(segments or []):
+        cols["id"].append(int(s.get("id", i)))
+        cols["start"].append(float(s.get("start", 0.0)))
+        cols["end"].append(float(s.get("end", 0.0)))
+        cols["avg_logprob"].append(float(s.get("avg_logprob", 0.0)))
+        cols["no_speech_prob"].append(float(s.get("no_speech_prob", 0.0)))
+        cols["text"].append(str(s.get("text", "")).strip())
+    # kolom tambahan (mis. "tier" dari cascade) ikut disimpan jika ada di salah satu
+    # segmen; segmen yang tidak memilikinya bernilai None di kolom itu
+    extra = set()
+    for s in segments or []:
+        extra |= set(s) - set(SEGMENT_COLUMNS)
+    for key in sorted(extra):
+        cols[key] = [s.get(key) for s in segments]
+    return cols
+
+
+def columns_to_segments(cols: Dict[str, list]) -> List[Dict[str, Any]]:
+    if not cols:
+        return []
+    keys = list(cols)
+    n = len(cols.get("start", []))
+    return [{k: cols[k][i] for k in keys} for i in range(n)]
+
+
+class TranscriptRecord:
+    def __init__(self, header: Dict[str, Any], seg_path: Path):
+        self.header = header
+        self._seg_path = seg_path
+        self._columns = None
+
+    candidate_id = property(lambda self: self.header.get("candidate_id"))
+    qid = property(lambda self: self.header.get("qid"))
+    source_hash = property(lambda self: self.header.get("source_hash"))
+    text = property(lambda self: self.header.get("text", ""))
+    meta = property(lambda self: self.header.get("meta", {}))
+    created_at = property(lambda self: self.header.get("created_at"))
+
+    @property
+    def columns(self) -> Dict[str, list]:
+        if self._columns is None:
+            if self._seg_path.exists():
+                self._columns = loads(self._seg_path.read_bytes())
+            else:
+                self._columns = {c: [] for c in SEGMENT_COLUMNS}
+        return self._columns
+
+    @property
+    def segments(self) -> List[Dict[str, Any]]:
+        return columns_to_segments(self.columns)
+
+    @property
+    def arrays(self):
+        # core.stt.SegmentArrays langsung dari kolom (analisis ulang tanpa membangun dict per segmen)
+        from core.stt import SegmentArrays
+
+        return SegmentArrays.from_columns(self.columns)
+
+    def to_dict(self, with_segments: bool = True) -> Dict[str, Any]:
+        out = dict(self.header)
+        if with_segments:
+            out["segments"] = self.segments
+        return out
+
+
+class TranscriptStore:
+    def __init__(self, root="data/transcripts"):
+        self.root = Path(root)
+
+    def _paths(self, candidate_id: str, qid: str, source_hash: str):
+        folder = self.root / safe_filename(candidate_id)
+        stem = f"{safe_filename(qid)}_{source_hash[:12]}"
+        return folder / f"{stem}.json", folder / f"{stem}.seg.json"
+
+    def put(
+        self,
+        candidate_id: str,
+        qid: str,
+        source_hash: str,
+        text: str,
+        segments: List[Dict[str, Any]],
+        meta: Dict[str, Any],
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> Path:
+        header_path, seg_path = self._paths(candidate_id, qid, source_hash)
+        header_path.parent.mkdir(parents=True, exist_ok=True)
+
+        header = {
+            "candidate_id": candidate_id,
+            "qid": qid,
+            "source_hash": source_hash,
+            "created_at": datetime.now().astimezone().isoformat(),
+            "n_segments": len(segments or []),
+            "text": text,
+            "meta": meta,
+            **(extra or {}),
+        }
+        with REGISTRY.span("storage", kind="transcript"):
+            # segmen dulu, header terakhir: header yang ada berarti record lengkap
+            atomic_write_bytes(seg_path, dumps_compact(segments_to_columns(segments)))
+            atomic_write_bytes(header_path, dumps_compact(header))
+        return header_path
+
+    def get(self, candidate_id: str, qid: str, source_hash: Optional[str] = None) -> Optional[TranscriptRecord]:
+        if source_hash:
+            header_path, seg_path = self._paths(candidate_id, qid, source_hash)
+            if not header_path.exists():
+                return None
+            return TranscriptRecord(loads(header_path.read_bytes()), seg_path)
+
+        # tanpa hash → record terbaru untuk (candidate, qid). Glob "<qid>_*" juga cocok
+        # dengan qid lain berawalan "<qid>_", jadi qid di header tetap dicek.
+        folder = self.root / safe_filename(candidate_id)
+        candidates = [
+            p for p in folder.glob(f"{safe_filename(qid)}_*.json") if not p.name.endswith(".seg.json")
+        ]
+        for p in sorted(candidates, key=lambda p: p.stat().st_mtime_ns, reverse=True):
+            header = loads(p.read_bytes())
+            if header.get("qid") == qid:
+                return TranscriptRecord(header, p.with_name(p.stem + ".seg.json"))
+        return None
+
+    def update_meta(self, record: TranscriptRecord, updates: Dict[str, Any]) -> None:
+        header_path, _ = self._paths(record.candidate_id, record.qid, record.source_hash)
+        record.header.setdefault("meta", {}).update(updates)
+        atomic_write_bytes(header_path, dumps_compact(record.header))
+
+    def iter_records(self, candidate_id: Optional[str] = None, qid: Optional[str] = None) -> Iterator[TranscriptRecord]:
+        # hanya membaca header; segmen dimuat saat .segments/.columns diakses
+        folders = [self.root / safe_filename(candidate_id)] if candidate_id else sorted(
+            p for p in self.root.glob("*") if p.is_dir()
+        )
+        pattern = f"{safe_filename(qid)}_*.json" if qid else "*.json"
+        for folder in folders:
+            for p in sorted(folder.glob(pattern)):
+                if p.name.endswith(".seg.json"):
+                    continue
+                try:
+                    header = loads(p.read_bytes())
+                except Exception:
+                    continue
+                if qid and header.get("qid") != qid:
+                    continue
+                yield TranscriptRecord(header, p.with_name(p.stem + ".seg.json"))
+
+
+def get_transcript_store(cfg: Optional[dict] = None) -> TranscriptStore:
+    root = ((cfg or {}).get("paths", {}) or {}).get("transcripts", "data/transcripts")
+    return TranscriptStore(root)
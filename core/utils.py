@@ -1,8 +1,76 @@
-import time
+import copy
+import hashlib
+import logging
+import os
+import threading
 from contextlib import contextmanager
+from pathlib import Path
+
+from core.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
 
 @contextmanager
 def timer(label="timer"):
-    t0 = time.time()
-    yield
-    print(f"[{label}] {time.time()-t0:.3f}s")
\ No newline at end of file
+    # dicatat sebagai span di core.metrics (histogram stage_latency_seconds)
+    with REGISTRY.span(label) as rec:
+        yield rec
+    logger.debug("[%s] %.3fs", label, rec["duration_s"])
+
+
+def file_sha1(path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def sharded_path(root, name: str, prefix_len: int = 2) -> Path:
+    # <root>/<2 hex sha1(name)>/<name>: folder datar berisi ribuan file jadi lambat di-listing
+    shard = hashlib.sha1(str(name).encode("utf-8")).hexdigest()[:prefix_len]
+    folder = Path(root) / shard
+    folder.mkdir(parents=True, exist_ok=True)
+    return folder / name
+
+
+def file_fingerprint(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+class FileCache:
+    # cache hasil parsing file, di-invalidasi otomatis saat mtime/size berubah
+    def __init__(self, name: str, loader, copy_on_read: bool = True):
+        self.name = name
+        self._loader = loader
+        self._copy = copy_on_read
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, path, *args):
+        key = (str(Path(path).resolve()), args)
+        try:
+            fp = file_fingerprint(path)
+        except FileNotFoundError:
+            fp = None
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0] == fp:
+            REGISTRY.inc("cache_hits_total", cache=self.name)
+            value = entry[1]
+        else:
+            REGISTRY.inc("cache_misses_total", cache=self.name)
+            value = self._loader(path, *args)
+            with self._lock:
+                self._entries[key] = (fp, value)
+        return copy.deepcopy(value) if self._copy else value
+
+    def invalidate(self, path=None):
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+                return
+            resolved = str(Path(path).resolve())
+            for key in [k for k in self._entries if k[0] == resolved]:
+                del self._entries[key]
@@ -0,0 +1,67 @@
+# core/warmup.py
+# Warm-up opsional di background: import dependensi berat (torch/whisper/librosa/
+# moviepy) dan muat model Whisper sebelum kandidat menekan Submit, tanpa
+# menahan render halaman pertama.
+import importlib
+import logging
+import threading
+import time
+
+from core.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+HEAVY_MODULES = ("numpy", "torch", "whisper", "librosa", "moviepy")
+
+_thread = None
+_lock = threading.Lock()
+_status = {"state": "idle", "modules": {}, "model_loaded": False, "error": None}
+
+
+def warm_up(cfg: dict, load_model: bool = True, modules=HEAVY_MODULES) -> dict:
+    _status["state"] = "running"
+    with REGISTRY.span("warmup"):
+        for name in modules:
+            t0 = time.perf_counter()
+            try:
+                importlib.import_module(name)
+                _status["modules"][name] = round(time.perf_counter() - t0, 3)
+            except ImportError as e:
+                _status["modules"][name] = None
+                logger.warning("Warm-up: gagal import %s: %s", name, e)
+
+        if load_model:
+            from core.stt import load_whisper_model, get_transcription_pool
+
+            # dengan runtime.stt_pool model dimuat di worker pool, bukan di proses server
+            if get_transcription_pool(cfg) is None:
+                load_whisper_model(cfg)
+            _status["model_loaded"] = True
+    _status["state"] = "done"
+    return dict(_status)
+
+
+def _run(cfg, load_model):
+    try:
+        warm_up(cfg, load_model=load_model)
+        logger.info("Warm-up selesai: %s", _status["modules"])
+    except Exception as e:
+        _status["state"] = "failed"
+        _status["error"] = str(e)
+        logger.warning("Warm-up gagal: %s", e)
+
+
+def start_background_warmup(cfg: dict, load_model: bool = True) -> threading.Thread:
+    # idempotent: satu thread per proses server
+    global _thread
+    with _lock:
+        if _thread is None:
+            _thread = threading.Thread(
+                target=_run, args=(cfg, load_model), name="assespro-warmup", daemon=True
+            )
+            _thread.start()
+    return _thread
+
+
+def warmup_status() -> dict:
+    return dict(_status)
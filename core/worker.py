@@ -0,0 +1,178 @@
+# core/worker.py
+# Worker stateless untuk mode terdistribusi: mengambil task asr / evaluate dari broker
+# (core.jobqueue), memperpanjang lease lewat heartbeat selama task berjalan, lalu
+# menulis hasil ke broker. Model Whisper dimuat sekali per proses worker.
+#
+#   python -m core.worker                          # asr + evaluate
+#   python -m core.worker --queues asr --threads 1 # node GPU khusus ASR
+#
+# Skala naik dengan menambah proses / node; semua membaca config yang sama
+# (distributed.broker, distributed.artifact_root).
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Dict, Any, Optional, Sequence
+
+from core.jobqueue import get_broker, get_artifact_store
+from core.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+QUEUES = ("asr", "evaluate")
+
+
+def _handle_asr(cfg: dict, payload: Dict[str, Any], state: dict) -> Dict[str, Any]:
+    from core.stt import load_whisper_model, transcribe
+
+    wav = get_artifact_store(cfg).path(payload["artifact"])
+    with state["model_lock"]:
+        if state.get("model") is None:
+            state["model"] = load_whisper_model(cfg)
+    text, segments, meta = transcribe(wav, cfg, state["model"], languages=payload.get("languages"))
+    return {"text": text, "segments": segments, "meta": meta}
+
+
+def _handle_evaluate(cfg: dict, payload: Dict[str, Any], state: dict) -> Dict[str, Any]:
+    from core.evaluator import evaluate_answer
+
+    return evaluate_answer(payload["text"], payload["qspec"], payload["meta"], cfg)
+
+
+HANDLERS = {"asr": _handle_asr, "evaluate": _handle_evaluate}
+
+
+def new_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+
+
+class Worker:
+    def __init__(self, cfg: dict, queues: Sequence[str] = QUEUES, worker_id: Optional[str] = None, broker=None):
+        dcfg = (cfg or {}).get("distributed", {}) or {}
+        self.cfg = cfg
+        self.queues = list(queues)
+        self.worker_id = worker_id or new_worker_id()
+        self.broker = broker or get_broker(cfg)
+        self.lease_s = float(dcfg.get("lease_seconds", 60))
+        self.poll_s = float(dcfg.get("poll_seconds", 0.5))
+        self.purge_every_s = float(dcfg.get("purge_interval_seconds", 3600))
+        self.retention_s = float(dcfg.get("task_retention_days", 7)) * 86400
+        self._last_purge = 0.0
+        self.state = {"model": None, "model_lock": threading.Lock()}
+
+    def _heartbeat(self, task_id: str, done: threading.Event, lost: threading.Event):
+        # perpanjang lease tiap 1/3 durasi; gagal → lease sudah diambil alih
+        while not done.wait(self.lease_s / 3):
+            if not self.broker.heartbeat(task_id, self.worker_id, self.lease_s):
+                logger.warning("Lease task %s hilang", task_id)
+                lost.set()
+                return
+
+    def run_one(self) -> bool:
+        task = self.broker.lease(self.queues, self.worker_id, self.lease_s)
+        if task is None:
+            return False
+        queue = task["queue"]
+        done, lost = threading.Event(), threading.Event()
+        hb = threading.Thread(target=self._heartbeat, args=(task["id"], done, lost), daemon=True)
+        hb.start()
+        try:
+            with REGISTRY.span("worker_task", queue=queue):
+                result = HANDLERS[queue](self.cfg, task["payload"], self.state)
+        except Exception as e:
+            done.set()
+            logger.exception("Task %s (%s) gagal, percobaan %d/%d", task["id"], queue, task["attempts"], task["max_attempts"])
+            # artefak hilang / input tidak valid tidak akan berhasil di worker lain juga
+            retry = not isinstance(e, (FileNotFoundError, KeyError, ValueError))
+            self.broker.fail(task["id"], self.worker_id, f"{type(e).__name__}: {e}"[:500], retry=retry)
+            REGISTRY.inc("worker_tasks_total", queue=queue, outcome="error")
+            return True
+        done.set()
+        hb.join()
+        if lost.is_set() or not self.broker.complete(task["id"], self.worker_id, result):
+            # task sudah diberikan ke worker lain; hasil ini dibuang
+            REGISTRY.inc("worker_tasks_total", queue=queue, outcome="lost")
+        else:
+            REGISTRY.inc("worker_tasks_total", queue=queue, outcome="ok")
+        return True
+
+    def _maybe_purge(self):
+        # task done / dead lama dibuang berkala; beberapa worker bersamaan aman (DELETE idempoten)
+        if self.purge_every_s <= 0 or time.time() - self._last_purge < self.purge_every_s:
+            return
+        self._last_purge = time.time()
+        n = self.broker.purge(self.retention_s)
+        if n:
+            logger.info("Worker %s: %d task lama dibersihkan", self.worker_id, n)
+            REGISTRY.inc("tasks_purged_total", n)
+
+    def run(self, stop: Optional[threading.Event] = None, max_tasks: Optional[int] = None):
+        stop = stop or threading.Event()
+        n = 0
+        logger.info("Worker %s mendengarkan antrian %s", self.worker_id, ", ".join(self.queues))
+        while not stop.is_set():
+            try:
+                self.broker.requeue_expired()
+                self._maybe_purge()
+                ran = self.run_one()
+            except Exception as e:
+                # broker tidak terjangkau sementara → coba lagi
+                logger.warning("Worker %s: %s", self.worker_id, e)
+                ran = False
+            if ran:
+                n += 1
+                if max_tasks and n >= max_tasks:
+                    break
+            else:
+                stop.wait(self.poll_s)
+        return n
+
+
+_local_workers = []
+_local_lock = threading.Lock()
+
+
+def start_local_workers(cfg: dict) -> list:
+    # distributed.local_workers > 0 → worker thread di proses ini (broker memory / dev)
+    dcfg = (cfg or {}).get("distributed", {}) or {}
+    n = int(dcfg.get("local_workers", 0) or 0)
+    with _local_lock:
+        while len(_local_workers) < n:
+            worker = Worker(cfg, worker_id=f"local-{os.getpid()}-{len(_local_workers)}")
+            t = threading.Thread(target=worker.run, name=f"assespro-worker-{len(_local_workers)}", daemon=True)
+            t.start()
+            _local_workers.append(t)
+    return list(_local_workers)
+
+
+if __name__ == "__main__":
+    import argparse
+    import signal
+
+    from core.config import load_config
+
+    ap = argparse.ArgumentParser(description="Worker antrian ASR / evaluasi")
+    ap.add_argument("--config", default="config.yaml")
+    ap.add_argument("--queues", nargs="+", default=list(QUEUES), choices=list(QUEUES))
+    ap.add_argument("--threads", type=int, default=1, help="task paralel per proses (model dibagi; decode openai-whisper tetap satu per model)")
+    ap.add_argument("--max-tasks", type=int, help="berhenti setelah N task (per thread)")
+    args = ap.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    cfg = load_config(args.config)
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    base = new_worker_id()
+    workers = [Worker(cfg, args.queues, worker_id=f"{base}-{i}") for i in range(args.threads)]
+    state = workers[0].state
+    for w in workers[1:]:
+        w.state = state
+    threads = [threading.Thread(target=w.run, args=(stop, args.max_tasks), daemon=True) for w in workers]
+    for t in threads:
+        t.start()
+    while any(t.is_alive() for t in threads):
+        time.sleep(0.5)
@@ -0,0 +1,64 @@
+# core/workspace.py
+# Workspace per job (satu submission kandidat). Semua artefak per jawaban (unggahan,
+# unduhan, WAV) ditulis ke folder milik job sendiri, sehingga sesi Streamlit / worker
+# yang berjalan paralel tidak pernah menulis ke nama file yang sama.
+#
+#   <paths.videos>/<shard>/<job_id>/<qid>_<nama upload>
+#   <paths.tmp_videos>/<shard>/<job_id>/<qid>_remote.mp4
+#   <paths.audio>/<shard>/<job_id>/<stem>.16k.wav
+#
+# Root per jenis artefak tetap sama, jadi core.lifecycle (retensi/kuota) tidak berubah.
+import re
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from core.utils import sharded_path
+
+_SAFE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+DEFAULT_ROOTS = {
+    "videos": "data/videos",
+    "tmp_videos": "data/tmp_videos",
+    "audio": "data/audio",
+}
+
+
+def safe_filename(value: str, max_len: int = 120) -> str:
+    name = _SAFE.sub("_", str(value)).strip("._") or "_"
+    if len(name) <= max_len:
+        return name
+    stem, dot, ext = name.rpartition(".")
+    if not dot or len(ext) > 8:
+        return name[:max_len]
+    return stem[: max_len - len(ext) - 1] + "." + ext
+
+
+def new_job_id(candidate_id: Optional[str] = None) -> str:
+    # <candidate>-<waktu>-<acak>: unik antar proses, tetap terbaca saat debugging
+    prefix = safe_filename(candidate_id or "job", max_len=40)
+    return f"{prefix}-{datetime.now():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+
+
+class Workspace:
+    def __init__(self, cfg: Optional[dict], job_id: str):
+        self.cfg = cfg or {}
+        self.job_id = job_id
+
+    def dir(self, kind: str) -> Path:
+        paths = self.cfg.get("paths", {}) or {}
+        root = Path(paths.get(kind) or DEFAULT_ROOTS.get(kind) or f"data/{kind}")
+        folder = sharded_path(root, self.job_id)
+        folder.mkdir(parents=True, exist_ok=True)
+        return folder
+
+    def path(self, kind: str, name: str) -> Path:
+        return self.dir(kind) / safe_filename(name)
+
+    def __repr__(self):
+        return f"Workspace({self.job_id!r})"
+
+
+def new_workspace(cfg: Optional[dict], candidate_id: Optional[str] = None) -> Workspace:
+    return Workspace(cfg, new_job_id(candidate_id))
@@ -0,0 +1,62 @@
+import pytest
+
+from core.analytics import AnalyticsStore, flatten_result
+
+
+def _item(qid, point=None, logprob=-0.3, error_stage=None):
+    item = {"qid": qid, "asr": {"avg_logprob": logprob, "duration_sec": 20.0}}
+    if point is not None:
+        item["rubric"] = {"predicted_point": point}
+    if error_stage:
+        item["error"] = {"stage": error_stage}
+    return item
+
+
+def test_flatten_result_maps_result_and_meta():
+    row = flatten_result("C1", _item("q1", 3, -0.7), {"timings": {"asr_s": 1.5}}, "2026-01-01")
+    assert row["candidate_id"] == "C1"
+    assert row["rubric_point"] == 3.0
+    assert row["asr_s"] == 1.5
+    assert row["asr_quality"] == "fair"
+    assert row["error_stage"] is None
+
+
+def test_question_rollup_numbers(tmp_path):
+    store = AnalyticsStore(tmp_path / "a.sqlite")
+    store.upsert_rows([
+        flatten_result("C1", _item("q1", 2, -0.2)),
+        flatten_result("C2", _item("q1", 4, -0.8)),
+        flatten_result("C3", _item("q1", error_stage="asr", logprob=None)),
+    ])
+    (r,) = store.question_rollups()
+    assert (r["qid"], r["n"], r["n_scored"], r["n_errors"]) == ("q1", 3, 2, 1)
+    assert r["mean_point"] == pytest.approx(3.0)
+    assert r["std_point"] == pytest.approx(1.0)
+    assert (r["p2"], r["p4"], r["p0"]) == (1, 1, 0)
+    quality = {q["asr_quality"]: q["n"] for q in store.asr_quality_rollups()}
+    assert quality == {"good": 1, "fair": 1}
+
+
+def test_resubmitted_answer_replaces_row(tmp_path):
+    store = AnalyticsStore(tmp_path / "a.sqlite")
+    store.upsert_rows([flatten_result("C1", _item("q1", 1))])
+    store.upsert_rows([flatten_result("C1", _item("q1", 3))])
+    (r,) = store.question_rollups()
+    assert (r["n"], r["mean_point"]) == (1, 3.0)
+
+
+def test_resubmission_drops_missing_qids(tmp_path):
+    store = AnalyticsStore(tmp_path / "a.sqlite")
+    store.upsert_rows([flatten_result("C1", _item("q1", 2)), flatten_result("C1", _item("q2", 3)),
+                       flatten_result("C2", _item("q2", 1))])
+    store.upsert_rows([flatten_result("C1", _item("q1", 4))])
+    rows = store.query("SELECT candidate_id, qid, rubric_point FROM answers ORDER BY candidate_id, qid")
+    assert [(r["candidate_id"], r["qid"], r["rubric_point"]) for r in rows] == [("C1", "q1", 4.0), ("C2", "q2", 1.0)]
+    rollups = {r["qid"]: (r["n"], r["mean_point"]) for r in store.question_rollups()}
+    assert rollups == {"q1": (1, 4.0), "q2": (1, 1.0)}
+
+
+def test_rebuild_without_store_is_a_noop(tmp_path):
+    from core.analytics import rebuild
+
+    assert rebuild({"analytics": {"enabled": False}}, tmp_path) == 0
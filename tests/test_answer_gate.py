@@ -0,0 +1,34 @@
+from core.answer_gate import check_answer
+
+CFG = {"answer_gate": {"enabled": True, "min_words": 5, "min_duration_sec": 3.0, "max_no_speech_prob": 0.9,
+                       "off_topic": {"enabled": True, "use_similarity": False}}}
+QSPEC = {"qid": "q1", "question_text": {"en": "Explain transfer learning"}}
+META = {"no_speech_prob": 0.1, "duration_sec": 30.0}
+
+
+def test_disabled_gate_passes_everything():
+    assert check_answer("", QSPEC, META, {"answer_gate": {"enabled": False}}, "en") is None
+
+
+def test_empty_transcript_scores_zero():
+    out = check_answer("   ", QSPEC, META, CFG, "en")
+    assert out["rule"] == "empty_transcript"
+    assert out["score"] == 0
+
+
+def test_silence_and_short_recordings():
+    assert check_answer("some words here ok fine", QSPEC, {"no_speech_prob": 0.95, "duration_sec": 30}, CFG, "en")["rule"] == "no_speech"
+    out = check_answer("some words here ok fine", QSPEC, {"no_speech_prob": 0.1, "duration_sec": 1.5}, CFG, "en")
+    assert out["rule"] == "too_short"
+    assert "1.5 seconds" in out["reason"]
+
+
+def test_too_few_words_scores_one():
+    out = check_answer("yes I think so", QSPEC, META, CFG, "en")
+    assert (out["rule"], out["score"]) == ("too_few_words", 1)
+
+
+def test_off_topic_only_without_must_keywords():
+    text = "I really enjoy cooking pasta on the weekend with my family"
+    assert check_answer(text, QSPEC, META, CFG, "en", {"keyword_must_coverage": 0})["rule"] == "off_topic"
+    assert check_answer(text, QSPEC, META, CFG, "en", {"keyword_must_coverage": 0.5}) is None
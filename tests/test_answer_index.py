@@ -0,0 +1,82 @@
+import hashlib
+
+import numpy as np
+import pytest
+
+from core.answer_index import AnswerIndex, index_candidate_results
+
+
+def _fake_encode(self, texts):
+    # embedding deterministik per teks (tanpa SBERT); teks sama -> vektor sama
+    self.encoded.extend(texts)
+    rows = []
+    for t in texts:
+        seed = int(hashlib.sha1(t.encode("utf-8")).hexdigest()[:8], 16)
+        v = np.random.default_rng(seed).standard_normal(16).astype(np.float32)
+        rows.append(v / np.linalg.norm(v))
+    return np.vstack(rows)
+
+
+@pytest.fixture
+def make_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(AnswerIndex, "_encode", _fake_encode)
+
+    def make(name="idx", **ann):
+        index = AnswerIndex(tmp_path / name, model_name="stub", ann_cfg=ann)
+        index.encoded = []
+        return index
+
+    return make
+
+
+def test_upsert_only_encodes_new_or_changed_text(make_index):
+    index = make_index()
+    assert index.upsert("q1", {"A": "jawaban a", "B": "jawaban b"}) == 2
+    assert index.upsert("q1", {"A": "jawaban a", "B": "jawaban b"}) == 0
+    assert index.upsert("q1", {"A": "jawaban a", "B": "jawaban b diubah"}) == 1
+    assert index.encoded == ["jawaban a", "jawaban b", "jawaban b diubah"]
+
+    vectors, meta = index.load("q1")
+    assert meta["ids"] == ["A", "B"] and vectors.shape == (2, 16)
+    np.testing.assert_allclose(vectors[1], _fake_encode(make_index("tmp"), ["jawaban b diubah"])[0])
+
+
+def test_lsh_and_exact_search_agree_on_copied_answer(make_index):
+    answers = {f"C{i:03}": f"jawaban unik nomor {i}" for i in range(60)}
+    answers["COPY"] = answers["C007"]
+    exact = make_index("exact", min_size=10_000)
+    lsh = make_index("lsh", min_size=10, n_tables=8, n_bits=4)
+    exact.upsert("q1", answers)
+    lsh.upsert("q1", answers)
+
+    top_exact = exact.most_similar("q1", "COPY", k=3)
+    top_lsh = lsh.most_similar("q1", "COPY", k=3)
+    assert top_exact[0] == {"candidate_id": "C007", "similarity": 1.0}
+    assert top_lsh[0] == top_exact[0]
+    assert all(r["candidate_id"] != "COPY" for r in top_lsh)
+
+
+def test_delete_candidate_removes_vectors_from_every_qid(make_index):
+    index = make_index()
+    index.upsert("q1", {"A": "a1", "B": "b1"})
+    index.upsert("q2", {"A": "a2"})
+
+    assert index.delete_candidate("A") == 2
+    _, meta = index.load("q1")
+    assert meta["ids"] == ["B"]
+    assert index.load("q2") == (None, None)
+    assert index.most_similar("q1", "A") == []
+
+
+def test_empty_or_failed_answer_drops_stale_vector(make_index, monkeypatch):
+    index = make_index()
+    monkeypatch.setattr("core.answer_index.get_answer_index", lambda cfg: index)
+    index_candidate_results({}, "A", [{"qid": "q1", "transcript": "a1"}, {"qid": "q2", "transcript": "a2"}])
+    index_candidate_results({}, "B", [{"qid": "q1", "transcript": "b1"}])
+
+    index_candidate_results({}, "A", [
+        {"qid": "q1", "transcript": "  "},
+        {"qid": "q2", "error": {"stage": "asr", "message": "x"}},
+    ])
+    assert index.load("q1")[1]["ids"] == ["B"]
+    assert index.load("q2") == (None, None)
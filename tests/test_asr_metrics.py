@@ -0,0 +1,34 @@
+from core.asr_metrics import compute_accuracy, corpus_accuracy, normalize_text
+
+
+def test_normalize_strips_punctuation_and_case():
+    assert normalize_text("Hello,   World!") == "hello world"
+
+
+def test_identical_text_is_perfect():
+    out = compute_accuracy("Transfer learning is useful.", "transfer learning is useful")
+    assert out["WER"] == 0.0
+    assert out["CER"] == 0.0
+    assert out["word_accuracy"] == 1.0
+    assert out["ref_words"] == 4
+
+
+def test_one_substitution():
+    out = compute_accuracy("the cat sat down", "the bat sat down")
+    assert out["WER"] == 0.25
+    assert out["word_accuracy"] == 0.75
+
+
+def test_corpus_wer_weights_by_reference_words():
+    pairs = [
+        {"reference": "a b c d", "hypothesis": "a b c d"},
+        {"reference": "e f", "hypothesis": "e x"},
+    ]
+    out = corpus_accuracy(pairs)
+    assert out["ref_words"] == 6
+    assert out["WER"] == round(1 / 6, 4)
+
+
+def test_empty_reference():
+    assert compute_accuracy("", "")["WER"] == 0.0
+    assert compute_accuracy("", "noise")["WER"] == 1.0
@@ -0,0 +1,83 @@
+import wave
+
+import numpy as np
+import pytest
+
+import core.stt as stt
+
+
+class StubModel:
+    # segmen 1 detik; avg_logprob per segmen diatur lewat `logprobs`
+    def __init__(self, name, logprobs):
+        self.name = name
+        self.logprobs = logprobs
+        self.calls = []
+
+    def transcribe(self, audio, **options):
+        self.calls.append(len(audio))
+        n = len(self.logprobs) if len(self.calls) == 1 else 1
+        segments = [
+            {"start": float(i), "end": float(i + 1), "text": f" {self.name}{i}", "avg_logprob": lp,
+             "no_speech_prob": 0.0, "compression_ratio": 1.2}
+            for i, lp in enumerate(self.logprobs[:n])
+        ]
+        return {"text": "".join(s["text"] for s in segments), "segments": segments}
+
+
+@pytest.fixture
+def wav(tmp_path):
+    path = tmp_path / "a.wav"
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(stt.SAMPLE_RATE)
+        w.writeframes(np.zeros(4 * stt.SAMPLE_RATE, dtype="<i2").tobytes())
+    return path
+
+
+CFG = {
+    "models": {"whisper_size": "base"},
+    "whisper": {"cascade": {"fast_size": "tiny", "min_avg_logprob": -0.7, "escalate_answer_ratio": 0.5}},
+}
+
+
+def _run(monkeypatch, wav, fast, full):
+    monkeypatch.setattr(stt, "load_whisper_model", lambda cfg: fast)
+    return stt._decode_cascade(full, wav, {}, CFG)
+
+
+def test_few_uncertain_segments_are_redecoded_individually(monkeypatch, wav):
+    fast = StubModel("fast", [-0.2, -1.5, -0.3, -0.1])
+    full = StubModel("full", [-0.1])
+    result, info = _run(monkeypatch, wav, fast, full)
+
+    assert info["escalated"] == "segments" and info["answer_escalated"] is False
+    assert info["segments_total"] == 4
+    assert info["segments_redecoded"] == info["segments_escalated"] == 1
+    assert info["redecode_ratio"] == 0.25
+    assert [s["tier"] for s in result["segments"]] == ["tiny", "base", "tiny", "tiny"]
+    assert result["text"] == "fast0 full0 fast2 fast3"
+
+
+def test_mostly_uncertain_answer_is_escalated_whole(monkeypatch, wav):
+    fast = StubModel("fast", [-1.5, -1.5, -1.5, -0.1])
+    full = StubModel("full", [-0.1, -0.2, -0.1])
+    result, info = _run(monkeypatch, wav, fast, full)
+
+    assert info["escalated"] == "answer" and info["answer_escalated"] is True
+    assert info["segments_escalated"] == 3
+    # transkrip model besar menggantikan seluruh jawaban: semua segmen keluaran dihitung di-decode ulang
+    assert info["segments_total"] == info["segments_redecoded"] == info["segments_from_full"] == 3
+    assert info["redecode_ratio"] == 1.0
+    assert full.calls == [4 * stt.SAMPLE_RATE]
+    assert all(s["tier"] == "base" for s in result["segments"])
+
+
+def test_confident_answer_stays_on_fast_model(monkeypatch, wav):
+    fast = StubModel("fast", [-0.2, -0.3])
+    full = StubModel("full", [-0.1])
+    _, info = _run(monkeypatch, wav, fast, full)
+
+    assert info["escalated"] is None
+    assert info["segments_redecoded"] == 0 and info["redecode_ratio"] == 0.0
+    assert full.calls == []
@@ -0,0 +1,56 @@
+import pytest
+
+from core.checkpoint import CheckpointStore, StageFailed, config_hash, hash_value, run_stage
+
+CFG = {"models": {"whisper_size": "base"}, "whisper": {"beam_size": 5}, "evaluator": {}}
+
+
+def test_second_run_reuses_checkpoint(tmp_path):
+    store = CheckpointStore(tmp_path)
+    calls = []
+    fn = lambda: calls.append(1) or {"path": "x"}
+    assert run_stage(store, "c1", "q1", "asr", "in", CFG, fn) == {"path": "x"}
+    assert run_stage(store, "c1", "q1", "asr", "in", CFG, fn) == {"path": "x"}
+    assert len(calls) == 1
+
+
+def test_input_or_config_change_reruns(tmp_path):
+    store = CheckpointStore(tmp_path)
+    calls = []
+    fn = lambda: calls.append(1) or len(calls)
+    run_stage(store, "c1", "q1", "asr", "in", CFG, fn)
+    run_stage(store, "c1", "q1", "asr", "other", CFG, fn)
+    run_stage(store, "c1", "q1", "asr", "other", {**CFG, "whisper": {"beam_size": 1}}, fn)
+    assert len(calls) == 3
+
+
+def test_config_hash_only_covers_stage_sections():
+    assert config_hash(CFG, "asr") == config_hash({**CFG, "evaluator": {"x": 1}}, "asr")
+    assert config_hash(CFG, "asr") != config_hash({**CFG, "ingest": {"streaming": {"window_sec": 10}}}, "asr")
+    assert config_hash(CFG, "download") == config_hash({}, "download")
+
+
+def test_failed_validation_reruns(tmp_path):
+    store = CheckpointStore(tmp_path)
+    calls = []
+    fn = lambda: calls.append(1) or {"n": len(calls)}
+    run_stage(store, "c1", "q1", "extract", "in", CFG, fn)
+    out = run_stage(store, "c1", "q1", "extract", "in", CFG, fn, validate=lambda o: False)
+    assert out == {"n": 2}
+
+
+def test_errors_are_recorded_and_wrapped(tmp_path):
+    store = CheckpointStore(tmp_path)
+
+    def boom():
+        raise ValueError("bad audio")
+
+    with pytest.raises(StageFailed) as exc:
+        run_stage(store, "c1", "q1", "extract", "in", CFG, boom)
+    assert exc.value.stage == "extract"
+    assert store.status("c1", "q1") == {"extract": "error"}
+    assert store.lookup("c1", "q1", "extract", "in", config_hash(CFG, "extract")) is None
+
+
+def test_hash_value_is_key_order_independent():
+    assert hash_value({"a": 1, "b": 2}) == hash_value({"b": 2, "a": 1})
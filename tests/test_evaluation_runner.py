@@ -0,0 +1,57 @@
+import threading
+
+import pytest
+
+pytest.importorskip("streamlit")
+
+from app.components.evaluation_runner import _run_streaming  # noqa: E402
+
+
+def _drain(gen):
+    events = []
+
+    def consume():
+        result = yield from gen
+        events.append(("return", result))
+
+    for ev in consume():
+        events.append(ev)
+    return events
+
+
+def test_events_are_forwarded_in_order_then_result_returned():
+    def work(x, on_event=None):
+        for stage in ("download", "extract", "asr"):
+            on_event({"type": "stage", "stage": stage})
+        return x * 2
+
+    events = _drain(_run_streaming(work, 21))
+    assert [e["stage"] for e in events[:-1]] == ["download", "extract", "asr"]
+    assert events[-1] == ("return", 42)
+
+
+def test_events_arrive_while_work_is_still_running():
+    release = threading.Event()
+
+    def work(on_event=None):
+        on_event({"type": "segment", "text": "partial"})
+        assert release.wait(5)
+        return "done"
+
+    gen = _run_streaming(work)
+    assert next(gen) == {"type": "segment", "text": "partial"}
+    release.set()
+    with pytest.raises(StopIteration) as stop:
+        next(gen)
+    assert stop.value.value == "done"
+
+
+def test_error_is_raised_after_earlier_events():
+    def work(on_event=None):
+        on_event({"type": "stage", "stage": "asr"})
+        raise ValueError("decode failed")
+
+    gen = _run_streaming(work)
+    assert next(gen)["stage"] == "asr"
+    with pytest.raises(ValueError, match="decode failed"):
+        next(gen)
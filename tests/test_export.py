@@ -0,0 +1,65 @@
+import csv
+import json
+
+import pytest
+
+from core.export import COLUMN_NAMES, export_answers
+
+
+@pytest.fixture
+def answers(tmp_path):
+    folder = tmp_path / "answers"
+    folder.mkdir()
+    data = {
+        "candidateId": "C1",
+        "savedAt": "2026-01-01T10:00:00",
+        "results": [
+            {
+                "qid": "q1",
+                "question_text": "Explain, briefly",
+                "language_selected": "en",
+                "rubric": {"predicted_point": "3", "reason": "ok"},
+                "keywords": {"must_coverage": 0.5, "hits": {"must": ["cnn", "dropout"]}},
+                "asr": {"avg_logprob": -0.4, "duration_sec": 12},
+                "transcript": "line one\nline two",
+            },
+            {"qid": "q2", "error": {"stage": "asr", "message": "bad audio"}},
+        ],
+    }
+    (folder / "C1.json").write_text(json.dumps(data), encoding="utf-8")
+    return folder
+
+
+def test_csv_has_fixed_header_and_one_row_per_question(tmp_path, answers):
+    out = tmp_path / "out.csv"
+    assert export_answers(out, "csv", answers) == 2
+    with open(out, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        rows = list(reader)
+    assert reader.fieldnames == COLUMN_NAMES
+    assert [r["question_index"] for r in rows] == ["1", "2"]
+    assert rows[0]["rubric_point"] == "3"
+    assert rows[0]["keyword_hits_must"] == "cnn; dropout"
+    assert rows[0]["transcript"] == "line one\nline two"
+    assert rows[1]["error_stage"] == "asr"
+    assert rows[1]["rubric_point"] == ""
+
+
+def test_jsonl_rows_are_typed(tmp_path, answers):
+    out = tmp_path / "out.jsonl"
+    export_answers(out, "jsonl", answers)
+    rows = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert len(rows) == 2
+    assert set(rows[0]) == set(COLUMN_NAMES)
+    assert rows[0]["candidate_id"] == "C1"
+    assert rows[0]["rubric_point"] == 3
+    assert rows[0]["duration_sec"] == 12.0
+    assert rows[1]["error_message"] == "bad audio"
+    assert rows[1]["rubric_point"] is None
+    assert not (tmp_path / "out.jsonl.tmp").exists()
+
+
+def test_candidate_filter_and_unknown_format(tmp_path, answers):
+    assert export_answers(tmp_path / "none.csv", "csv", answers, ["C404"]) == 0
+    with pytest.raises(ValueError):
+        export_answers(tmp_path / "x.xml", "xml", answers)
@@ -0,0 +1,89 @@
+import time
+
+import pytest
+
+from core.jobqueue import DEAD, DONE, LEASED, QUEUED, InMemoryBroker, SQLiteBroker
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def broker(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryBroker()
+    return SQLiteBroker(tmp_path / "queue.sqlite")
+
+
+def test_lease_complete_roundtrip(broker):
+    tid = broker.enqueue("asr", {"qid": "q1"})
+    assert broker.get(tid)["status"] == QUEUED
+    task = broker.lease(["asr"], "w1", lease_s=30)
+    assert task["id"] == tid
+    assert task["payload"] == {"qid": "q1"}
+    assert task["attempts"] == 1
+    assert broker.lease(["asr"], "w2", lease_s=30) is None
+    assert broker.heartbeat(tid, "w1", 30)
+    assert broker.complete(tid, "w1", {"text": "ok"})
+    assert broker.get(tid)["status"] == DONE
+    assert broker.wait(tid, timeout=1) == {"text": "ok"}
+
+
+def test_only_lease_owner_can_finish(broker):
+    tid = broker.enqueue("asr", {})
+    broker.lease(["asr"], "w1", lease_s=30)
+    assert not broker.heartbeat(tid, "w2", 30)
+    assert not broker.complete(tid, "w2", None)
+    assert broker.get(tid)["status"] == LEASED
+
+
+def test_lease_respects_queue_names_and_order(broker):
+    first = broker.enqueue("asr", {"n": 1})
+    broker.enqueue("evaluate", {"n": 2})
+    broker.enqueue("asr", {"n": 3})
+    assert broker.lease(["asr"], "w1", 30)["id"] == first
+    assert broker.lease(["evaluate"], "w1", 30)["payload"] == {"n": 2}
+
+
+def test_fail_retries_until_max_attempts(broker):
+    tid = broker.enqueue("asr", {}, max_attempts=2)
+    broker.lease(["asr"], "w1", 30)
+    assert broker.fail(tid, "w1", "boom")
+    assert broker.get(tid)["status"] == QUEUED
+    broker.lease(["asr"], "w1", 30)
+    broker.fail(tid, "w1", "boom again")
+    task = broker.get(tid)
+    assert task["status"] == DEAD
+    assert task["error"] == "boom again"
+
+
+def test_expired_lease_is_requeued(broker):
+    tid = broker.enqueue("asr", {}, max_attempts=3)
+    broker.lease(["asr"], "w1", lease_s=0.01)
+    time.sleep(0.05)
+    assert broker.requeue_expired() == 1
+    assert broker.get(tid)["status"] == QUEUED
+    assert not broker.complete(tid, "w1", None)
+    assert broker.lease(["asr"], "w2", 30)["attempts"] == 2
+
+
+def test_worker_purges_finished_tasks(tmp_path):
+    from core.worker import Worker
+
+    broker = SQLiteBroker(tmp_path / "queue.sqlite")
+    done_id = broker.enqueue("asr", {})
+    broker.lease(["asr"], "w1", lease_s=30)
+    broker.complete(done_id, "w1", {})
+    queued_id = broker.enqueue("asr", {})
+
+    cfg = {"distributed": {"purge_interval_seconds": 3600, "task_retention_days": 0}}
+    worker = Worker(cfg, queues=["evaluate"], broker=broker)
+    time.sleep(0.01)
+    worker._maybe_purge()
+    assert broker.get(done_id) is None
+    assert broker.get(queued_id)["status"] == QUEUED
+
+    # interval belum lewat → tidak dibersihkan lagi
+    again = broker.enqueue("asr", {})
+    broker.lease(["asr"], "w1", lease_s=30)
+    broker.fail(queued_id, "w1", "boom", retry=False)
+    worker._maybe_purge()
+    assert broker.get(queued_id)["status"] == DEAD
+    assert broker.get(again)["status"] == QUEUED
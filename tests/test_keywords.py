@@ -0,0 +1,31 @@
+from core.keywords import KeywordMatcher, stem, tokenize
+
+
+def test_stem_is_idempotent():
+    for word in ["learnings", "learning", "cases", "case", "boxes", "studies", "processes", "managed"]:
+        once = stem(word)
+        assert stem(once) == once
+
+
+def test_stem_plural_and_gerund_share_root():
+    assert stem("learnings") == stem("learning") == stem("learn")
+    assert stem("cases") == stem("case")
+    assert stem("boxes") == stem("box")
+
+
+def test_plural_gerund_matches_keyword():
+    m = KeywordMatcher(["transfer learning"], [])
+    out = m.match("we applied transfer learnings on the dataset")
+    assert out["hits"]["must"] == ["transfer learning"]
+    assert out["keyword_must_coverage"] == 1.0
+    assert out["fuzzy_hits"] == []
+
+
+def test_split_compound_matches_exactly():
+    out = KeywordMatcher(["MobileNet"], []).match("a mobile net backbone")
+    assert out["hits"]["must"] == ["MobileNet"]
+    assert out["fuzzy_hits"] == []
+
+
+def test_tokenize_lowercases():
+    assert tokenize("CNN Models") == ["cnn", stem("model")]
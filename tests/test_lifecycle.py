@@ -0,0 +1,60 @@
+import os
+import time
+
+from core.lifecycle import plan
+
+DAY = 86400
+
+
+def _file(path, size=1000, age_days=0.0):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    ts = time.time() - age_days * DAY
+    os.utime(path, (ts, ts))
+    return path
+
+
+def _cfg(tmp_path, quota_gb=None, **artifacts):
+    return {
+        "paths": {name: str(tmp_path / name) for name in artifacts},
+        "lifecycle": {"quota_gb": quota_gb, "artifacts": artifacts},
+    }
+
+
+def test_retention_deletes_old_files_only(tmp_path):
+    old = _file(tmp_path / "tmp_videos" / "old.mp4", age_days=10)
+    _file(tmp_path / "tmp_videos" / "new.mp4", age_days=1)
+    actions = plan(_cfg(tmp_path, tmp_videos={"retention_days": 7}))
+    assert [(a["action"], a["path"]) for a in actions] == [("delete", str(old))]
+
+
+def test_wav_compaction_after_grace_period(tmp_path):
+    wav = _file(tmp_path / "audio" / "a.16k.wav", age_days=1)
+    _file(tmp_path / "audio" / "b.16k.wav", age_days=0)
+    actions = plan(_cfg(tmp_path, audio={"compact": "flac", "compact_after_hours": 2}))
+    assert [(a["action"], a["path"]) for a in actions] == [("compact", str(wav))]
+
+
+def test_quota_evicts_least_recently_used(tmp_path):
+    oldest = _file(tmp_path / "cache" / "a.json", size=2000, age_days=3)
+    _file(tmp_path / "cache" / "b.json", size=2000, age_days=1)
+    quota_gb = 3000 / 1024 ** 3
+    actions = plan(_cfg(tmp_path, quota_gb=quota_gb, cache={"evictable": True}))
+    assert [a["path"] for a in actions] == [str(oldest)]
+
+
+def test_in_progress_files_are_untouched(tmp_path):
+    _file(tmp_path / "cache" / "x.json.part", age_days=90)
+    _file(tmp_path / "cache" / "y.json.lock", age_days=90)
+    stale = _file(tmp_path / "cache" / "checkpoints" / "c" / "q" / "asr.json", age_days=90)
+    cfg = _cfg(tmp_path, cache={"retention_days": 30, "evictable": True})
+    assert [a["path"] for a in plan(cfg)] == [str(stale)]
+
+
+def test_excluded_subdirs_are_never_deleted(tmp_path):
+    _file(tmp_path / "cache" / "answer_index" / "Q1" / "vectors.npy", age_days=90)
+    _file(tmp_path / "cache" / "language" / "abc.json", age_days=90)
+    stale = _file(tmp_path / "cache" / "checkpoints" / "c" / "q" / "asr.json", age_days=90)
+    cfg = _cfg(tmp_path, quota_gb=1e-9,
+               cache={"retention_days": 30, "evictable": True, "exclude": ["answer_index", "language"]})
+    assert [a["path"] for a in plan(cfg)] == [str(stale)]
@@ -0,0 +1,83 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from core import llm_evaluator
+from core.llm_evaluator import LLMEvaluatorError, _call_groq_chat, _retry_delay
+
+OK_BODY = {"choices": [{"message": {"content": json.dumps({"score": 3, "reason": "fine"})}}]}
+
+
+@pytest.fixture
+def server():
+    # balasan berurutan: (status, headers); setelah habis → 200
+    state = {"script": [], "hits": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            state["hits"] += 1
+            status, headers = state["script"].pop(0) if state["script"] else (200, {})
+            body = json.dumps(OK_BODY if status == 200 else {"error": "busy"}).encode()
+            self.send_response(status)
+            for k, v in headers.items():
+                self.send_header(k, v)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    httpd = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    state["url"] = f"http://127.0.0.1:{httpd.server_address[1]}/v1/chat/completions"
+    yield state
+    httpd.shutdown()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    calls = []
+    monkeypatch.setattr(llm_evaluator.time, "sleep", calls.append)
+    return calls
+
+
+def test_429_is_retried_honouring_retry_after(server, sleeps):
+    server["script"] = [(429, {"Retry-After": "7"}), (503, {})]
+    data = _call_groq_chat("p", api_key="k", api_url=server["url"], max_retries=3, backoff_base_s=1.0, backoff_max_s=30.0)
+    assert data == OK_BODY
+    assert server["hits"] == 3
+    assert sleeps[0] == 7.0
+    assert 1.0 <= sleeps[1] <= 2.0  # backoff attempt 1: base * 2 dengan jitter 0.5-1.0
+
+
+def test_retry_after_is_capped(server, sleeps):
+    server["script"] = [(429, {"Retry-After": "120"})]
+    _call_groq_chat("p", api_key="k", api_url=server["url"], backoff_max_s=5.0)
+    assert sleeps == [5.0]
+
+
+def test_gives_up_after_max_retries(server, sleeps):
+    server["script"] = [(429, {"Retry-After": "0"})] * 3
+    with pytest.raises(LLMEvaluatorError, match="429"):
+        _call_groq_chat("p", api_key="k", api_url=server["url"], max_retries=2)
+    assert server["hits"] == 3
+    assert len(sleeps) == 2
+
+
+def test_client_errors_are_not_retried(server, sleeps):
+    server["script"] = [(400, {})]
+    with pytest.raises(LLMEvaluatorError, match="400"):
+        _call_groq_chat("p", api_key="k", api_url=server["url"])
+    assert server["hits"] == 1
+    assert sleeps == []
+
+
+def test_backoff_grows_exponentially_and_is_capped():
+    for attempt in range(6):
+        delay = _retry_delay(attempt, 0.5, 4.0)
+        assert min(4.0, 0.5 * 2 ** attempt) * 0.5 <= delay <= min(4.0, 0.5 * 2 ** attempt)
+    assert _retry_delay(0, 1.0, 30.0, "not-a-number") <= 1.0
@@ -0,0 +1,52 @@
+import threading
+
+import pytest
+
+from core.locks import LockTimeout, atomic_write_bytes, file_lock
+
+
+def test_atomic_write_replaces_without_leftovers(tmp_path):
+    path = tmp_path / "out.json"
+    atomic_write_bytes(path, b"first")
+    atomic_write_bytes(path, b"second")
+    assert path.read_bytes() == b"second"
+    assert [p.name for p in tmp_path.iterdir()] == ["out.json"]
+
+
+def test_file_lock_serializes_threads(tmp_path):
+    path = tmp_path / "counter.txt"
+    path.write_text("0")
+
+    def bump():
+        for _ in range(20):
+            with file_lock(path):
+                path.write_text(str(int(path.read_text()) + 1))
+
+    threads = [threading.Thread(target=bump) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert path.read_text() == "80"
+
+
+def test_file_lock_times_out(tmp_path):
+    path = tmp_path / "busy.json"
+    held = threading.Event()
+    release = threading.Event()
+
+    def holder():
+        with file_lock(path):
+            held.set()
+            release.wait(5)
+
+    t = threading.Thread(target=holder)
+    t.start()
+    held.wait(5)
+    try:
+        with pytest.raises(LockTimeout):
+            with file_lock(path, timeout=0.1, poll=0.01):
+                pass
+    finally:
+        release.set()
+        t.join()
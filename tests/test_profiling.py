@@ -0,0 +1,70 @@
+import cProfile
+import io
+import json
+import pstats
+import tracemalloc
+
+from core.profiling import StageProfiler, list_profiles, top_functions
+
+
+def _busy(n=20000):
+    return sum(i * i for i in range(n))
+
+
+def _light():
+    return 1
+
+
+def test_top_functions_sorted_and_truncated():
+    profiler = cProfile.Profile()
+    profiler.enable()
+    for _ in range(3):
+        _busy()
+    _light()
+    profiler.disable()
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+
+    rows = top_functions(stats, n=3, sort="cumulative")
+    assert len(rows) == 3
+    assert [r["cumtime_s"] for r in rows] == sorted((r["cumtime_s"] for r in rows), reverse=True)
+
+    by_calls = top_functions(stats, n=50, sort="ncalls")
+    busy = next(r for r in by_calls if r["function"].startswith("_busy (test_profiling.py:"))
+    assert busy["ncalls"] == 3
+    assert set(busy) == {"function", "ncalls", "tottime_s", "cumtime_s"}
+
+
+def test_stages_are_merged_into_one_summary(tmp_path):
+    assert not tracemalloc.is_tracing()
+    prof = StageProfiler(tmp_path, "C1", "q1", {"top_n": 5})
+    with prof.stage("extract"):
+        _busy()
+    with prof.stage("asr"):
+        _busy()
+    # profiler baru untuk pertanyaan yang sama menambah stage, tidak menimpa summary
+    with StageProfiler(tmp_path, "C1", "q1").stage("evaluate"):
+        _light()
+    # stage yang memulai tracemalloc juga menghentikannya
+    assert not tracemalloc.is_tracing()
+
+    summary = json.loads((tmp_path / "C1" / "q1" / "summary.json").read_text(encoding="utf-8"))
+    assert set(summary["stages"]) == {"extract", "asr", "evaluate"}
+    asr = summary["stages"]["asr"]
+    assert len(asr["top"]) <= 5 and asr["prof"] == "asr.prof"
+    assert (tmp_path / "C1" / "q1" / "asr.prof").exists()
+    assert asr["tracemalloc_peak_mb"] >= 0 and asr["cpu_s"] >= 0
+
+    rows = list_profiles({"paths": {"profiles": str(tmp_path)}}, "C1")
+    assert [(r["candidate_id"], r["qid"]) for r in rows] == [("C1", "q1")]
+    assert rows[0]["slowest_stage"] in ("extract", "asr")
+
+
+def test_nested_stage_skips_tracemalloc_and_profiler(tmp_path):
+    prof = StageProfiler(tmp_path, "C1", "q1")
+    with prof.stage("outer"):
+        with prof.stage("inner"):
+            _light()
+    stages = json.loads((tmp_path / "C1" / "q1" / "summary.json").read_text(encoding="utf-8"))["stages"]
+    assert "tracemalloc_peak_mb" in stages["outer"] and "prof" in stages["outer"]
+    assert "tracemalloc_peak_mb" not in stages["inner"] and "prof" not in stages["inner"]
+    assert not tracemalloc.is_tracing()
@@ -0,0 +1,20 @@
+from core.search_index import build_match
+
+
+def test_words_are_quoted_and_joined():
+    assert build_match("transfer learning") == '"transfer" AND "learning"'
+
+
+def test_phrase_and_prefix():
+    assert build_match('"transfer learning" mobile*') == '"transfer learning" AND "mobile"*'
+
+
+def test_operators_and_columns_are_not_passed_through():
+    out = build_match('text:drop OR NOT "a"-b')
+    assert ":" not in out
+    assert out == '"text" AND "drop" AND "OR" AND "NOT" AND "a" AND "b"'
+
+
+def test_empty_query():
+    assert build_match("") is None
+    assert build_match('  "" *  ') is None
@@ -0,0 +1,56 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from core.stt import SegmentArrays, analyze_segments  # noqa: E402
+
+SEGMENTS = [
+    {"id": 0, "start": 0.0, "end": 2.0, "text": " hello there ", "avg_logprob": -0.2, "no_speech_prob": 0.1},
+    {"id": 1, "start": 3.0, "end": 5.0, "text": "general kenobi", "avg_logprob": None, "no_speech_prob": 0.3,
+     "tier": "large"},
+    {"id": 2, "start": 5.0, "end": 6.0, "text": "ok", "avg_logprob": -0.6, "no_speech_prob": 0.2},
+]
+
+
+def test_speech_stats():
+    stats = analyze_segments(SEGMENTS)
+    assert stats == {
+        "total_speech_time": 5.0,
+        "total_pause_time": 1.0,
+        "num_pauses": 1,
+        "avg_pause_duration": 1.0,
+        "speech_rate_wpm": 60.0,
+    }
+    assert analyze_segments(SegmentArrays.from_segments(SEGMENTS)) == stats
+
+
+def test_asr_metrics_treats_missing_logprob_as_minus_one():
+    m = SegmentArrays.from_segments(SEGMENTS).asr_metrics()
+    assert m["avg_logprob"] == pytest.approx((-0.2 - 1.0 - 0.6) / 3)
+    assert m["no_speech_prob"] == pytest.approx(0.2)
+    assert m["duration_sec"] == 6.0
+
+
+def test_empty_segments():
+    arrays = SegmentArrays.from_segments([])
+    assert len(arrays) == 0
+    assert arrays.asr_metrics() == {"avg_logprob": -1.0, "no_speech_prob": 1.0, "duration_sec": 0.0}
+    assert arrays.speech_stats()["num_pauses"] == 0
+
+
+def test_roundtrip_keeps_text_and_extra_columns():
+    out = SegmentArrays.from_segments(SEGMENTS).to_segments()
+    assert [s["text"] for s in out] == ["hello there", "general kenobi", "ok"]
+    assert out[1]["tier"] == "large"
+    assert "tier" not in out[0]
+    assert out[1]["avg_logprob"] == 0.0
+
+
+def test_from_columns_matches_from_segments():
+    from core.transcript_store import segments_to_columns
+
+    # transcript store menyimpan bentuk to_segments() (avg_logprob sudah terisi)
+    b = SegmentArrays.from_segments(SegmentArrays.from_segments(SEGMENTS).to_segments())
+    a = SegmentArrays.from_columns(segments_to_columns(b.to_segments()))
+    assert a.speech_stats() == b.speech_stats()
+    assert np.allclose(a.durations, b.durations)
@@ -0,0 +1,44 @@
+import json
+
+from core.storage import append_candidate_answer, merge_results, save_candidate_answers
+
+
+def _ok(qid, point=4):
+    return {"qid": qid, "final_score": {"point": point}}
+
+
+def _err(qid):
+    return {"qid": qid, "error": {"stage": "asr", "type": "RuntimeError", "message": "decode failed"}}
+
+
+def _results(folder, cid="C1"):
+    return json.loads((folder / f"{cid}.json").read_text(encoding="utf-8"))["results"]
+
+
+def test_merge_upserts_by_qid_and_keeps_order():
+    merged = merge_results([_ok("q1"), _ok("q2")], [_ok("q2", 1), _ok("q3")])
+    assert [(r["qid"], r["final_score"]["point"]) for r in merged] == [("q1", 4), ("q2", 1), ("q3", 4)]
+
+
+def test_failed_rerun_keeps_previous_success(tmp_path):
+    append_candidate_answer("C1", _ok("q1"), base_folder=str(tmp_path))
+    append_candidate_answer("C1", _err("q1"), base_folder=str(tmp_path))
+    assert _results(tmp_path) == [_ok("q1")]
+
+    # jalur simpan akhir (app.py) juga tidak menimpa hasil sukses dengan entri error
+    save_candidate_answers("C1", [_err("q1"), _err("q2")], base_folder=str(tmp_path))
+    assert _results(tmp_path) == [_ok("q1"), _err("q2")]
+
+
+def test_success_replaces_earlier_error(tmp_path):
+    append_candidate_answer("C1", _err("q1"), base_folder=str(tmp_path))
+    append_candidate_answer("C1", _ok("q1"), base_folder=str(tmp_path))
+    assert _results(tmp_path) == [_ok("q1")]
+
+
+def test_corrupt_aggregate_is_moved_aside(tmp_path):
+    (tmp_path / "C1.json").write_text("{not json", encoding="utf-8")
+    append_candidate_answer("C1", _ok("q1"), base_folder=str(tmp_path))
+    assert _results(tmp_path) == [_ok("q1")]
+    aside = list(tmp_path.glob("C1.json.corrupt-*"))
+    assert len(aside) == 1 and aside[0].read_text(encoding="utf-8") == "{not json"
@@ -0,0 +1,93 @@
+import sys
+import time
+
+import numpy as np
+import pytest
+
+import core.streaming as streaming
+from core.stt import SAMPLE_RATE
+from core.streaming import WindowedTranscriber, split_point
+
+CFG = {"whisper": {"language": "en"}, "ingest": {"streaming": {"window_sec": 1, "split_search_sec": 0.5}}}
+
+
+class StubModel:
+    # satu segmen per window, timestamp relatif terhadap window
+    def __init__(self):
+        self.lengths = []
+        self.prompts = []
+
+    def transcribe(self, audio, **options):
+        self.lengths.append(len(audio))
+        self.prompts.append(options.get("initial_prompt"))
+        n = len(self.lengths)
+        seg = {"start": 0.0, "end": len(audio) / SAMPLE_RATE, "text": f" w{n} ", "avg_logprob": -0.1}
+        return {"text": seg["text"], "segments": [seg]}
+
+
+def test_split_point_picks_quietest_frame_in_search_region():
+    rng = np.random.default_rng(0)
+    audio = rng.uniform(-0.5, 0.5, SAMPLE_RATE).astype(np.float32)
+    audio[12800:13120] = 0.0  # frame 20 ms yang sunyi, di dalam 0.5 s terakhir
+    audio[1600:1920] = 0.0  # lebih sunyi tapi di luar area pencarian
+    assert split_point(audio, SAMPLE_RATE // 2) == 12800 + 160
+
+
+def test_split_point_keeps_short_audio_whole():
+    audio = np.ones(100, dtype=np.float32)
+    assert split_point(audio, SAMPLE_RATE) == 100
+
+
+def test_windows_are_shifted_to_position_in_full_audio():
+    model = StubModel()
+    live = []
+    wt = WindowedTranscriber(model, CFG, on_segment=live.append)
+    audio = np.random.default_rng(1).uniform(-0.5, 0.5, int(2.5 * SAMPLE_RATE)).astype(np.float32)
+    for chunk in np.array_split(audio, 7):
+        wt.feed(chunk)
+    wt.flush()
+
+    assert sum(model.lengths) == len(audio) == wt.offset
+    starts = np.cumsum([0] + model.lengths[:-1]) / SAMPLE_RATE
+    assert [s["start"] for s in wt.segments] == pytest.approx(list(starts))
+    assert [s["end"] for s in wt.segments] == pytest.approx(list(np.cumsum(model.lengths) / SAMPLE_RATE))
+    assert [s["id"] for s in wt.segments] == list(range(wt.windows))
+    # segmen parsial dikirim dengan timestamp yang sama
+    assert [s["start"] for s in live] == pytest.approx(list(starts))
+    # teks window sebelumnya menjadi prompt window berikutnya
+    assert model.prompts[1] == "w1"
+    assert wt.result()["text"] == " ".join(f"w{i + 1}" for i in range(wt.windows))
+
+
+class SlowSource:
+    # file-like yang lambat; mencatat berapa chunk sudah dibaca
+    def __init__(self, chunks):
+        self.left = chunks
+        self.reads = 0
+
+    def read(self, n):
+        if not self.left:
+            return b""
+        self.left -= 1
+        self.reads += 1
+        time.sleep(0.002)
+        return b"\x01\x00" * (n // 2)
+
+
+def test_asr_failure_stops_the_download(tmp_path, monkeypatch):
+    # "ffmpeg" pengganti: salin stdin (PCM mentah) ke stdout
+    copy = "import os\nwhile True:\n    d = os.read(0, 65536)\n    if not d: break\n    os.write(1, d)\n"
+    monkeypatch.setattr(streaming, "_ffmpeg_cmd", lambda scfg: [sys.executable, "-c", copy])
+
+    class FailingModel:
+        def transcribe(self, audio, **options):
+            raise RuntimeError("decode failed")
+
+    source = SlowSource(chunks=2000)
+    cfg = {**CFG, "ingest": {"streaming": {"window_sec": 0.5, "chunk_kb": 1}}}
+    with pytest.raises(RuntimeError, match="decode failed"):
+        streaming.stream_transcribe(source, tmp_path / "v.bin", tmp_path / "a.wav", cfg, FailingModel())
+    time.sleep(0.1)
+    reads = source.reads
+    time.sleep(0.1)
+    assert source.reads == reads < 2000
@@ -0,0 +1,70 @@
+import wave
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from core.stt import TranscriptionPool, plan_core_slices  # noqa: E402
+
+# model stub: proses spawn mengimpor `whisper` dari sys.path parent (tmp_path lebih dulu)
+STUB_WHISPER = '''
+import os
+
+
+class StubModel:
+    def transcribe(self, audio, **options):
+        return {
+            "text": f" hello from {os.getpid()}",
+            "segments": [{"id": 0, "start": 0.0, "end": 1.0, "text": " hello", "avg_logprob": -0.1,
+                          "no_speech_prob": 0.0}],
+            "language": options.get("language"),
+        }
+
+
+def load_model(size):
+    return StubModel()
+'''
+
+
+@pytest.fixture
+def stub_whisper(tmp_path, monkeypatch):
+    pkg = tmp_path / "stubs" / "whisper"
+    pkg.mkdir(parents=True)
+    (pkg / "__init__.py").write_text(STUB_WHISPER)
+    monkeypatch.syspath_prepend(str(tmp_path / "stubs"))
+
+
+def _wav(path, seconds=1.0):
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        w.writeframes(b"\x00\x00" * int(16000 * seconds))
+    return path
+
+
+def test_plan_core_slices_do_not_overlap():
+    assert plan_core_slices(2, 2, cpus=[0, 1, 2, 3]) == [[0, 1], [2, 3]]
+    # core kurang → irisan dipakai bergiliran
+    assert plan_core_slices(3, 2, cpus=[0, 1, 2, 3]) == [[0, 1], [2, 3], [0, 1]]
+
+
+def test_pool_round_trip_with_stub_model(tmp_path, stub_whisper):
+    cfg = {
+        "models": {"whisper_backend": "whisper", "whisper_size": "stub"},
+        "whisper": {"decode_mode": "fixed", "language": "en"},
+        "paths": {"cache": str(tmp_path / "cache")},
+    }
+    wav = _wav(tmp_path / "a.wav")
+    pool = TranscriptionPool(cfg, processes=2, threads_per_process=1, cpus=[0])
+    try:
+        text, segments, meta = pool.transcribe(wav, languages=["en"])
+        results = pool.map([(wav, ["en"])] * 4)
+    finally:
+        pool.close()
+    assert text.startswith("hello from ")
+    assert segments[0]["text"] == "hello"
+    assert meta["decode"]["mode"] == "fixed"
+    assert meta["language"]["lang"] == "en"
+    assert len(results) == 4
+    assert all(r[0].startswith("hello from ") for r in results)
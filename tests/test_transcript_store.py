@@ -0,0 +1,37 @@
+import os
+
+from core.transcript_store import TranscriptStore, segments_to_columns
+
+SEGMENTS = [
+    {"id": 0, "start": 0.0, "end": 1.0, "text": "a", "avg_logprob": -0.2, "no_speech_prob": 0.1, "tier": "tiny"},
+    {"id": 1, "start": 1.0, "end": 2.0, "text": "b", "avg_logprob": -0.3, "no_speech_prob": 0.1},
+]
+
+
+def test_extra_column_kept_when_any_segment_has_it():
+    cols = segments_to_columns(SEGMENTS)
+    assert cols["tier"] == ["tiny", None]
+
+
+def test_get_without_hash_ignores_prefixed_qids(tmp_path):
+    store = TranscriptStore(tmp_path)
+    own = store.put("C1", "q1", "a" * 40, "jawaban q1", SEGMENTS, {})
+    other = store.put("C1", "q1_b", "b" * 40, "jawaban q1_b", SEGMENTS, {})
+    # record qid lain lebih baru: tidak boleh terpilih untuk q1
+    os.utime(own, ns=(1_000_000_000, 1_000_000_000))
+    os.utime(other, ns=(2_000_000_000, 2_000_000_000))
+
+    record = store.get("C1", "q1")
+    assert record.qid == "q1" and record.text == "jawaban q1"
+    assert [r.qid for r in store.iter_records("C1", "q1")] == ["q1"]
+    assert store.get("C1", "q2") is None
+
+
+def test_get_without_hash_returns_latest_record(tmp_path):
+    store = TranscriptStore(tmp_path)
+    old = store.put("C1", "q1", "a" * 40, "lama", SEGMENTS, {})
+    new = store.put("C1", "q1", "c" * 40, "baru", SEGMENTS, {})
+    os.utime(old, ns=(1_000_000_000, 1_000_000_000))
+    os.utime(new, ns=(2_000_000_000, 2_000_000_000))
+    assert store.get("C1", "q1").text == "baru"
+    assert store.get("C1", "q1", "a" * 40).text == "lama"